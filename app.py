@@ -6,30 +6,39 @@ try:
 except AttributeError:
     pass
 import asyncio
-import uuid
+import json
 import sys
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 # Import the wrapper
 from crawlers.wrapper import (
-    run_crawler_task, log_queues, get_log_queue, clear_log_queue,
-    get_crawl_result, clear_crawl_result, WConceptCrawler, set_stop_signal
+    run_crawler_task, get_log_queue, clear_log_queue,
+    get_crawl_result, clear_crawl_result, WConceptCrawler, set_stop_signal,
+    start_browser_pool, close_browser_pool, subscribe_logs, unsubscribe_logs,
+    task_registry, start_task_sweeper, stop_task_sweeper, set_task_status, FINAL_STATUSES,
+    job_queue, QueueFullError, WORKER_MODE, start_worker_pool, close_worker_pool, result_store,
+    seller_cache, submit_crawl, schedule_store, crawl_scheduler, start_scheduler, stop_scheduler, CronError
 )
+from crawlers.excel_export import write_excel, write_sheets
+from crawlers.crawl_diff import dropped_products, DROPPED_SHEET
 
 
 # Force Playwright install on Render
 import subprocess
-try:
-    print("Checking and installing Playwright browsers...", flush=True)
-    subprocess.run(["playwright", "install", "chromium"], check=True)
-    print("Playwright browsers installed.", flush=True)
-except Exception as e:
-    print(f"Error installing browsers: {e}", flush=True)
+import multiprocessing
+# (크롤링 워커 프로세스가 spawn으로 이 모듈을 다시 import할 때는 생략)
+if multiprocessing.parent_process() is None:
+    try:
+        print("Checking and installing Playwright browsers...", flush=True)
+        subprocess.run(["playwright", "install", "chromium"], check=True)
+        print("Playwright browsers installed.", flush=True)
+    except Exception as e:
+        print(f"Error installing browsers: {e}", flush=True)
 
 app = FastAPI(title="Lotte On Sourcing Helper")
 
@@ -60,18 +69,62 @@ if os.path.exists(STATIC_DIR):
 
 # Models
 class CrawlRequest(BaseModel):
-    crawler_type: str  # musinsa, wconcept, 29cm
+    crawler_type: str  # musinsa, wconcept, 29cm, unified (여러 사이트 통합)
     category: Optional[str] = None
     keyword: Optional[str] = None
     count: int = 10
     headless: bool = True
+    concurrency: Optional[int] = None  # 상세 페이지 동시 수집 수 (서버 상한 적용)
+    block_resources: bool = True  # 이미지/폰트/미디어/트래커 요청 차단
+    capture_json: bool = True  # 목록 API(JSON) 응답 파싱 우선, 실패 시 DOM 스크래핑
+    priority: int = 0  # 대기열 우선순위 (클수록 먼저 실행, 같으면 먼저 온 순서)
+    force_refresh: bool = False  # 판매자 정보 캐시를 무시하고 상세 페이지에서 다시 수집
+    brand_dedup: bool = True  # 같은 브랜드 상품은 첫 상품의 판매자 정보를 재사용
+    brand_verify_every: Optional[int] = None  # 브랜드 재사용 N번마다 1번 상세 페이지로 검증 (없으면 서버 기본값)
+    diff_mode: bool = False  # 같은 카테고리 직전 실행과 비교해 신규 상품만 상세 수집 + 순위 변동 표시
+    categories: Optional[List[str]] = None  # 여러 카테고리(또는 ["all"])를 브라우저 하나로 배치 실행, 결과는 카테고리별 요약 포함
+    sources: Optional[List[str]] = None  # unified: 함께 실행할 사이트 (없으면 전체)
+    source_params: Optional[Dict[str, dict]] = None  # unified: 사이트별 category/keyword/count/concurrency 등 덮어쓰기
 
 class CrawlResponse(BaseModel):
     request_id: str
     message: str
+    queue_position: int = 0  # 0이면 바로 실행, 1 이상이면 대기 순번
 
 # Global State
-active_tasks = {} # request_id -> task_info
+# 작업 정보(상태/시각/소요 시간)는 wrapper의 task_registry에 로그·결과와 함께 보관 (TTL/LRU 정리)
+# 상태 전이(queued → running → succeeded/failed/cancelled)는 run_crawler_task가 담당
+
+# 유휴 스트림 연결 유지용 주석 전송 간격
+SSE_KEEPALIVE_SEC = 15
+
+@app.on_event("startup")
+async def warm_browser_pool():
+    if WORKER_MODE == "process":
+        # 크롤링은 워커 프로세스에서 실행되므로 API 프로세스에는 브라우저를 띄우지 않음
+        start_worker_pool()
+        print("Crawler worker pool started.", flush=True)
+        start_task_sweeper()
+        start_scheduler()
+        return
+    # 첫 요청에서 브라우저 실행 비용을 내지 않도록 미리 띄워둠
+    try:
+        await start_browser_pool()
+        print("Browser pool warmed up.", flush=True)
+    except Exception as e:
+        print(f"Error warming browser pool: {e}", flush=True)
+    start_task_sweeper()
+    start_scheduler()
+
+@app.on_event("shutdown")
+async def shutdown_browser_pool():
+    stop_task_sweeper()
+    stop_scheduler()
+    await job_queue.close()
+    close_worker_pool()
+    await close_browser_pool()
+    result_store.close()
+    seller_cache.close()
 
 @app.get("/")
 async def read_root():
@@ -81,30 +134,21 @@ async def read_root():
     return {"message": "System is running. UI not found."}
 
 @app.post("/api/crawl", response_model=CrawlResponse)
-async def start_crawl(req: CrawlRequest, background_tasks: BackgroundTasks):
-    request_id = str(uuid.uuid4())
-    
-    # Store task info (could be expanded)
-    active_tasks[request_id] = {
-        "type": req.crawler_type,
-        "status": "running"
-    }
-    
-    # Init log queue
-    get_log_queue(request_id)
-    
-    # Add background task
-    background_tasks.add_task(
-        run_crawler_task, 
-        req.crawler_type, 
-        req.dict(), 
-        request_id
-    )
+async def start_crawl(req: CrawlRequest):
+    # 대기열에 넣고 동시 실행 상한 안에서 실행 (대기열이 가득 차면 429)
+    try:
+        request_id, position = submit_crawl(req.crawler_type, req.dict(), priority=req.priority)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     
+    if position:
+        return CrawlResponse(request_id=request_id, message=f"Crawler queued (position {position})", queue_position=position)
     return CrawlResponse(request_id=request_id, message="Crawler started")
 
 @app.get("/api/status/{request_id}")
 async def get_status(request_id: str):
+    if not task_registry.exists(request_id):
+        return {"logs": [], "status": "unknown"}
     q = get_log_queue(request_id)
     logs = []
     while not q.empty():
@@ -113,7 +157,211 @@ async def get_status(request_id: str):
         except:
             break
             
-    return {"logs": logs, "status": active_tasks.get(request_id, {}).get("status", "unknown")}
+    task = task_registry.info(request_id)
+    return {
+        "logs": logs,
+        "status": task.get("status", "unknown"),
+        "queue_position": job_queue.position(request_id),
+        "task": task
+    }
+
+# 부분 결과 한 번에 내려줄 최대 개수
+RESULTS_PAGE_LIMIT = 500
+
+async def _load_stored_run(request_id):
+    # 결과 저장소(SQLite) 조회는 이벤트 루프를 막지 않도록 스레드에서
+    return await asyncio.get_running_loop().run_in_executor(None, result_store.load_run, request_id)
+
+@app.get("/api/results/{request_id}")
+async def get_results(request_id: str, cursor: int = 0, limit: int = 100):
+    """지금까지 수집된 상품을 커서 기반으로 페이지 조회 (수집 완료 순서)
+
+    응답의 next_cursor를 다음 요청의 cursor로 넘기면 새로 수집된 상품만 받는다.
+    레지스트리에서 정리됐거나 재시작 전에 끝난 작업은 결과 저장소의 상품을 순위 순서로 내려준다.
+    """
+    limit = max(1, min(limit, RESULTS_PAGE_LIMIT))
+    if not task_registry.exists(request_id):
+        stored = await _load_stored_run(request_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Unknown request_id")
+        products = stored["data"]["products"]
+        start = max(0, cursor)
+        items = products[start:start + limit]
+        next_cursor = start + len(items)
+        return {
+            "items": items,
+            "next_cursor": next_cursor,
+            "total": len(products),
+            "status": stored.get("status") or "unknown",
+            "done": next_cursor >= len(products)
+        }
+    status = task_registry.info(request_id).get("status", "unknown")
+    items, total = task_registry.get_items(request_id, cursor, limit)
+    next_cursor = max(0, cursor) + len(items)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": total,
+        "status": status,
+        "done": status in FINAL_STATUSES and next_cursor >= total
+    }
+
+@app.get("/api/results/{request_id}/stream")
+async def stream_results(request_id: str, request: Request, cursor: int = 0):
+    """수집되는 상품을 NDJSON(한 줄에 상품 하나)으로 계속 내려줌, 작업이 끝나면 종료
+
+    레지스트리에서 정리됐거나 재시작 전에 끝난 작업은 결과 저장소의 상품을 내려주고 바로 종료한다.
+    """
+    if not task_registry.exists(request_id):
+        stored = await _load_stored_run(request_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Unknown request_id")
+
+        async def stored_stream():
+            for item in stored["data"]["products"][max(0, cursor):]:
+                yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+
+        return StreamingResponse(stored_stream(), media_type="application/x-ndjson")
+
+    async def item_stream():
+        events = subscribe_logs(request_id, kinds=("item", "status"))
+        position = max(0, cursor)
+        try:
+            while True:
+                # 상태를 먼저 보고 상품을 읽어야 종료 직전에 추가된 상품을 놓치지 않음
+                status = task_registry.info(request_id).get("status", "unknown")
+                items, _ = task_registry.get_items(request_id, position)
+                for item in items:
+                    yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+                position += len(items)
+                if status in FINAL_STATUSES or status == "unknown":
+                    break
+                try:
+                    await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+        finally:
+            unsubscribe_logs(request_id, events)
+
+    return StreamingResponse(item_stream(), media_type="application/x-ndjson")
+
+@app.get("/api/tasks/stats")
+async def task_stats():
+    """작업 레지스트리 / 대기열 현황 (보관 중인 작업 수, 결과 용량, 정리된 개수, 실행·대기 작업 수)"""
+    stats = task_registry.stats()
+    stats["queue"] = job_queue.stats()
+    stats["worker_mode"] = WORKER_MODE
+    stats["result_store"] = result_store.stats()
+    stats["seller_cache"] = seller_cache.stats()
+    return stats
+
+@app.get("/api/runs")
+async def list_runs(limit: int = 20, source: Optional[str] = None):
+    """SQLite에 저장된 최근 크롤링 실행 목록 (재시작 전 결과 포함)"""
+    limit = max(1, min(limit, RESULTS_PAGE_LIMIT))
+    runs = await asyncio.get_running_loop().run_in_executor(None, result_store.list_runs, limit, source)
+    return {"runs": runs}
+
+@app.get("/api/products/lookup")
+async def lookup_products(product_url: Optional[str] = None, business_number: Optional[str] = None, limit: int = 50):
+    """상품 URL 또는 사업자등록번호로 과거 수집 이력 조회"""
+    if not product_url and not business_number:
+        raise HTTPException(status_code=400, detail="product_url or business_number is required")
+    limit = max(1, min(limit, RESULTS_PAGE_LIMIT))
+    rows = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: result_store.find_products(product_url, business_number, limit)
+    )
+    return {"products": rows}
+
+class ScheduleRequest(BaseModel):
+    cron: str  # 분 시 일 월 요일 (예: "0 9 * * *", "@daily")
+    crawler_type: str
+    params: dict = {}  # CrawlRequest와 같은 항목 (category, keyword, count, categories, ...)
+    enabled: bool = True
+
+@app.get("/api/schedules")
+async def list_schedules():
+    """예약 크롤링 목록 (다음 실행 시각, 마지막 실행/건너뜀 기록 포함)"""
+    schedules = await asyncio.get_running_loop().run_in_executor(None, schedule_store.list)
+    return {"schedules": schedules, "running": crawl_scheduler.running}
+
+@app.put("/api/schedules/{name}")
+async def upsert_schedule(name: str, req: ScheduleRequest):
+    """예약 추가/수정 (같은 이름이면 덮어씀)"""
+    try:
+        schedule = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: schedule_store.upsert(name, req.cron, req.crawler_type, req.params, req.enabled)
+        )
+    except CronError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schedule
+
+@app.delete("/api/schedules/{name}")
+async def delete_schedule(name: str):
+    if not await asyncio.get_running_loop().run_in_executor(None, schedule_store.remove, name):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {"message": "Schedule deleted"}
+
+@app.post("/api/schedules/{name}/run")
+async def run_schedule_now(name: str):
+    """예약을 지금 한 번 실행 (직전 실행이 진행 중이면 건너뜀, 다음 예약 시각은 다시 계산)"""
+    loop = asyncio.get_running_loop()
+    schedule = await loop.run_in_executor(None, schedule_store.get, name)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    request_id = await crawl_scheduler.fire(schedule)
+    if request_id is None:
+        schedule = await loop.run_in_executor(None, schedule_store.get, name)
+        raise HTTPException(status_code=409, detail=schedule["last_status"])
+    return {"request_id": request_id}
+
+def _sse(event, data):
+    # 여러 줄 로그(트레이스백, TSV 등)는 줄마다 data: 로 나눠 보냄
+    lines = "\n".join(f"data: {line}" for line in str(data).split("\n"))
+    return f"event: {event}\n{lines}\n\n"
+
+@app.get("/api/stream/{request_id}")
+async def stream_status(request_id: str, request: Request):
+    """로그와 상태 변화를 Server-Sent Events로 실시간 전달 (폴링 대체)"""
+    async def event_stream():
+        if not task_registry.exists(request_id):
+            yield _sse("status", "unknown")
+            return
+        # 먼저 구독한 뒤 쌓여 있던 로그를 비워야 그 사이 로그가 빠지지 않음
+        events = subscribe_logs(request_id)
+        try:
+            backlog = get_log_queue(request_id)
+            while not backlog.empty():
+                try:
+                    yield _sse("log", backlog.get_nowait())
+                except:
+                    break
+
+            status = task_registry.info(request_id).get("status", "unknown")
+            yield _sse("status", status)
+            if status in FINAL_STATUSES or status == "unknown":
+                return
+
+            while True:
+                try:
+                    kind, data = await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(kind, data)
+                if kind == "status" and data in FINAL_STATUSES:
+                    break
+        finally:
+            unsubscribe_logs(request_id, events)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/files")
 async def list_files():
@@ -145,9 +393,12 @@ async def download_file(filename: str):
 @app.post("/api/stop/{request_id}")
 async def stop_crawl(request_id: str):
     # Wrapper의 전역 중지 신호 설정
-    set_stop_signal(request_id)
-    if request_id in active_tasks:
-        active_tasks[request_id]["status"] = "stopping"
+    if task_registry.exists(request_id):
+        set_stop_signal(request_id)
+        job_queue.cancel(request_id)
+        # 실행 중이면 stopping, 아직 대기 중이면 바로 cancelled
+        if not set_task_status(request_id, "stopping"):
+            set_task_status(request_id, "cancelled")
     return {"message": "중지 요청이 전송되었습니다. 현재 진행 중인 작업만 정지됩니다."}
 
 class SaveRequest(BaseModel):
@@ -155,6 +406,20 @@ class SaveRequest(BaseModel):
     save_path: str
     filename: str
 
+def _write_excel(products, filepath, sellers=None, dropped=None):
+    # DataFrame 없이 write-only 워크북에 바로 기록, 모든 값은 텍스트 셀 (Excel 자동 변환 방지)
+    if not sellers and not dropped:
+        write_excel(filepath, products)
+        return
+    sheets = {'상품': products}
+    # 통합 실행 결과는 판매자(사업자등록번호 기준 중복 제거) 시트를 함께 저장
+    if sellers:
+        sheets['판매자'] = sellers
+    # diff 모드 결과는 이전 실행 대비 이탈한 상품 시트를 함께 저장
+    if dropped:
+        sheets[DROPPED_SHEET] = dropped
+    write_sheets(filepath, sheets)
+
 @app.post("/api/save_result")
 async def save_result(req: SaveRequest):
     """크롤링 결과를 사용자 지정 경로에 저장"""
@@ -183,15 +448,14 @@ async def save_result(req: SaveRequest):
         filepath = os.path.join(save_dir, filename)
         
         # 크롤러 타입에 따라 저장
-        import pandas as pd
         products = data.get("products", [])
         if not products:
              raise HTTPException(status_code=400, detail="No data found in result")
              
-        df = pd.DataFrame(products)
-        # 모든 값을 텍스트로 처리 (Excel 자동 변환 방지)
-        df = df.astype(str)
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        # 엑셀 저장(openpyxl)은 이벤트 루프를 막지 않도록 스레드에서 실행
+        await asyncio.get_running_loop().run_in_executor(
+            None, _write_excel, products, filepath, data.get("sellers"), dropped_products(data)
+        )
         
         return {"message": "File saved successfully", "filepath": filepath}
         
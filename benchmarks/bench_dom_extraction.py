@@ -0,0 +1,173 @@
+"""
+DOM 추출 마이크로 벤치마크
+저장된 HTML 픽스처를 page.set_content로 띄운 뒤,
+요소별 query_selector/inner_text 왕복(기존 방식)과 한 번의 evaluate(현재 방식)를 비교
+
+사용법:
+    python benchmarks/bench_dom_extraction.py --repeat 20
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import statistics
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+sys.path.append(os.path.join(BASE_DIR, "musinsa best new"))
+from musinsa_crawler import LIST_EXTRACT_JS as MUSINSA_LIST_EXTRACT_JS
+
+
+def _load_29cm_module():
+    # crawlers/29cm/crawler.py는 패키지가 아니므로 파일 경로로 로드
+    path = os.path.join(BASE_DIR, "crawlers", "29cm", "crawler.py")
+    spec = importlib.util.spec_from_file_location("crawler_29cm", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+DETAIL_EXTRACT_JS_29CM = _load_29cm_module().DETAIL_EXTRACT_JS
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+# --- 기존 방식 (요소별 왕복) ---
+
+async def legacy_musinsa_list(page, limit):
+    """기존 _extract_basic_info_from_dom의 정보 컨테이너 경로를 그대로 재현 (왕복 횟수 함께 반환)"""
+    calls = 1
+    items = await page.query_selector_all('div.UIProductColumn__InfoItem-sc-1t5ihy5-7')
+    records = []
+    for item in items[:limit]:
+        brand = ""
+        brand_link = await item.query_selector('a.gtm-click-brand')
+        calls += 1
+        if brand_link:
+            brand_p = await brand_link.query_selector('p')
+            calls += 1
+            if brand_p:
+                brand = (await brand_p.inner_text()).strip()
+                calls += 1
+
+        name, url = "", ""
+        link = await item.query_selector('a.gtm-select-item')
+        calls += 1
+        if link:
+            name_p = await link.query_selector('p')
+            calls += 1
+            if name_p:
+                name = (await name_p.inner_text()).strip()
+                calls += 1
+            href = await link.get_attribute('href') or ""
+            calls += 1
+            url = href if href.startswith('http') or not href else f"https://www.musinsa.com{href}"
+
+        discount, price = "", ""
+        price_div = await item.query_selector('div.UIProductColumn__Price-sc-1t5ihy5-10')
+        calls += 1
+        if price_div:
+            discount_el = await price_div.query_selector('span.text-red')
+            calls += 1
+            if discount_el:
+                discount = (await discount_el.inner_text()).strip()
+                calls += 1
+            price_el = await price_div.query_selector('span.text-black')
+            calls += 1
+            if price_el:
+                price = (await price_el.inner_text()).strip()
+                calls += 1
+
+        records.append({'brand': brand, 'name': name, 'url': url, 'discount': discount, 'price': price})
+    return records, calls
+
+
+async def legacy_29cm_detail(page):
+    """기존 _fetch_detail의 상품명/브랜드/가격/판매자 테이블 수집을 그대로 재현"""
+    calls = 0
+    values = {}
+    for key, selector in (('name', '#pdp_product_name'), ('brand', 'a[href*="/brand/"] h3'), ('price', '#pdp_product_price')):
+        el = await page.query_selector(selector)
+        calls += 1
+        values[key] = await el.inner_text() if el else None
+        calls += 1 if el else 0
+
+    rows = []
+    row_els = await page.query_selector_all('table tr')
+    calls += 1
+    for row in row_els:
+        th_el = await row.query_selector('th')
+        td_el = await row.query_selector('td')
+        calls += 2
+        if th_el and td_el:
+            rows.append([await th_el.inner_text(), await td_el.inner_text()])
+            calls += 2
+    values['rows'] = rows
+    return values, calls
+
+
+# --- 현재 방식 (evaluate 1회) ---
+
+async def batched_musinsa_list(page, limit):
+    result = await page.evaluate(MUSINSA_LIST_EXTRACT_JS, limit)
+    return result['records'], 1
+
+
+async def batched_29cm_detail(page):
+    return await page.evaluate(DETAIL_EXTRACT_JS_29CM), 1
+
+
+async def measure(page, fn, repeat):
+    timings = []
+    result, calls = None, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result, calls = await fn(page)
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, calls, timings
+
+
+def report(label, calls, timings):
+    print(f"  {label:<8} CDP 호출 {calls:>5}회  "
+          f"중앙값 {statistics.median(timings):8.2f}ms  최소 {min(timings):8.2f}ms")
+
+
+async def main(repeat, limit):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+
+        cases = [
+            ("무신사 랭킹 목록", "musinsa_ranking.html",
+             lambda pg: legacy_musinsa_list(pg, limit), lambda pg: batched_musinsa_list(pg, limit)),
+            ("29CM 상품 상세", "29cm_detail.html", legacy_29cm_detail, batched_29cm_detail),
+        ]
+        for title, fixture, legacy_fn, batched_fn in cases:
+            await page.set_content(read_fixture(fixture))
+            legacy_result, legacy_calls, legacy_times = await measure(page, legacy_fn, repeat)
+            batched_result, batched_calls, batched_times = await measure(page, batched_fn, repeat)
+
+            print(f"[{title}] ({fixture}, 반복 {repeat}회)")
+            report("기존", legacy_calls, legacy_times)
+            report("evaluate", batched_calls, batched_times)
+            speedup = statistics.median(legacy_times) / max(statistics.median(batched_times), 1e-6)
+            print(f"  → {speedup:.1f}배, 결과 일치: {legacy_result == batched_result}")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DOM 추출 방식 비교 벤치마크")
+    parser.add_argument("--repeat", type=int, default=10, help="측정 반복 횟수")
+    parser.add_argument("--limit", type=int, default=100, help="무신사 목록 추출 개수")
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat, args.limit))
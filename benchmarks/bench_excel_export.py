@@ -0,0 +1,119 @@
+"""
+엑셀 저장 벤치마크
+기존 방식(pd.DataFrame → astype(str) → to_excel(engine='openpyxl'))과
+스트리밍 방식(excel_export.write_excel, openpyxl write-only 워크북)을 같은 상품 행으로 비교
+
+사용법:
+    python benchmarks/bench_excel_export.py --rows 1000 5000 20000 --repeat 3
+
+측정 항목: 저장 시간(중앙값/최소), 최대 Python 메모리(tracemalloc, 별도 1회 측정), 파일 크기,
+두 파일의 셀 값 일치 여부 (텍스트 셀 서식 '@' 적용 여부 포함)
+- 두 방식 모두 숫자(순위 등)를 문자열로 저장하므로 셀 값은 타입까지 그대로 비교한다
+- 빈 값은 다르게 저장됨: 기존 방식은 'None' / 'nan', 스트리밍 방식은 빈 셀 (측정용 행에는 빈 값 없음)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from openpyxl import load_workbook
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, "crawlers"))
+from excel_export import write_excel, TEXT_FORMAT
+
+
+def make_products(count, seed=0):
+    """통합 실행 결과와 비슷한 모양의 상품 행 (연락처/사업자등록번호는 앞자리 0 포함)"""
+    rng = random.Random(seed)
+    products = []
+    for rank in range(1, count + 1):
+        products.append({
+            "사이트": rng.choice(("무신사", "W컨셉", "29CM")),
+            "카테고리": rng.choice(("전체", "상의", "아우터", "여성의류")),
+            "순위": rank,
+            "브랜드": f"브랜드{rng.randint(1, 400)}",
+            "상품명": f"테스트 상품 {rank} " + "옵션" * rng.randint(0, 5),
+            "가격": f"{rng.randint(10, 500) * 1000:,}원",
+            "할인율": f"{rng.randint(0, 70)}%",
+            "상호": f"(주)테스트{rng.randint(1, 300)}",
+            "사업자등록번호": f"0{rng.randint(10, 99)}-{rng.randint(10, 99)}-{rng.randint(10000, 99999)}",
+            "주소": "서울특별시 성동구 테스트로 " + str(rng.randint(1, 300)),
+            "연락처": f"0{rng.randint(2, 70)}-{rng.randint(100, 9999)}-{rng.randint(1000, 9999)}",
+            "상품URL": f"https://example.com/products/{rank}",
+        })
+    return products
+
+
+# --- 기존 방식 ---
+
+def pandas_write(products, filepath):
+    df = pd.DataFrame(products)
+    df = df.astype(str)
+    df.to_excel(filepath, index=False, engine='openpyxl')
+
+
+# --- 스트리밍 방식 ---
+
+def streaming_write(products, filepath):
+    write_excel(filepath, products)
+
+
+def measure(fn, products, filepath, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(products, filepath)
+        timings.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    fn(products, filepath)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak
+
+
+def read_cells(filepath):
+    sheet = load_workbook(filepath, read_only=True).active
+    return [tuple(row) for row in sheet.iter_rows(values_only=True)]
+
+
+def is_text_formatted(filepath):
+    sheet = load_workbook(filepath).active
+    return all(cell.number_format == TEXT_FORMAT for row in sheet.iter_rows(min_row=2, max_row=3) for cell in row)
+
+
+def report(label, timings, peak, filepath):
+    print(f"  {label:<10} 중앙값 {statistics.median(timings):9.1f}ms  최소 {min(timings):9.1f}ms  "
+          f"최대 메모리 {peak / 1024 / 1024:7.1f}MB  파일 {os.path.getsize(filepath) / 1024:8.1f}KB")
+
+
+def main(row_counts, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in row_counts:
+            products = make_products(count)
+            legacy_path = os.path.join(tmp, f"pandas_{count}.xlsx")
+            streaming_path = os.path.join(tmp, f"streaming_{count}.xlsx")
+
+            legacy_times, legacy_peak = measure(pandas_write, products, legacy_path, repeat)
+            streaming_times, streaming_peak = measure(streaming_write, products, streaming_path, repeat)
+
+            print(f"[{count}행] (반복 {repeat}회)")
+            report("pandas", legacy_times, legacy_peak, legacy_path)
+            report("streaming", streaming_times, streaming_peak, streaming_path)
+            speedup = statistics.median(legacy_times) / max(statistics.median(streaming_times), 1e-6)
+            print(f"  → {speedup:.1f}배, 셀 값 일치: {read_cells(legacy_path) == read_cells(streaming_path)}, "
+                  f"텍스트 서식: {is_text_formatted(streaming_path)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="엑셀 저장 방식 비교 벤치마크")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000], help="상품 행 수")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수")
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,278 @@
+"""
+크롤러 오프라인 재생 하네스 + 벤치마크
+실제 사이트에서 목록/상세 페이지를 HAR로 한 번 녹화해두고,
+이후에는 route_from_har로 네트워크 없이 세 크롤러를 재생하며 성능을 측정
+
+사용법:
+    # 1. 녹화 (네트워크 필요, 가장 큰 개수로 한 번만)
+    python benchmarks/replay_bench.py record --crawler musinsa --count 100
+
+    # 2. 단일 재생
+    python benchmarks/replay_bench.py replay --crawler musinsa --count 50
+
+    # 3. 벤치마크 (크롤러 x 개수별로 별도 프로세스에서 재생 → 최대 RSS 분리 측정)
+    python benchmarks/replay_bench.py bench --crawlers musinsa wconcept 29cm --counts 10 50 100
+
+측정 항목: 경과 시간, Playwright 프로토콜(CDP) 호출 수, 고정 대기(wait_for_timeout) 합계,
+열린 페이지 수, 수집 개수, 최대 RSS (Python / 브라우저 하위 프로세스)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "har")
+
+# 크롤러 모듈 로딩은 웹 서버와 동일하게 wrapper.py를 거침
+sys.path.append(BASE_DIR)
+from crawlers.wrapper import MockRoot, MusinsaCrawler, WConceptCrawler, CrawlerApp_29CM, RequestBlocker
+
+try:
+    import resource
+except ImportError:
+    # Windows에는 resource 모듈이 없으므로 RSS는 측정하지 않음
+    resource = None
+
+# 크롤러별 기본 카테고리 (녹화/재생이 같은 URL을 쓰도록 고정)
+DEFAULT_CATEGORIES = {
+    "musinsa": "전체",
+    "wconcept": "베스트탭 (메인)",
+    "29cm": "전체",
+}
+CRAWLERS = tuple(DEFAULT_CATEGORIES)
+
+
+def har_path(crawler_type):
+    return os.path.join(HAR_DIR, f"{crawler_type}.har.zip")
+
+
+# --- 계측 ---
+
+class ProtocolCounter:
+    """Playwright 클라이언트 → 드라이버 프로토콜 호출을 세는 계측기
+
+    공개 API에는 호출 수를 얻는 방법이 없어 내부 Channel.send를 감쌈.
+    버전에 따라 내부 구조가 다르면 조용히 비활성화 (결과에 None)
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.by_method = {}
+        self.fixed_wait_ms = 0
+        self.enabled = False
+        self._original = None
+        self._channel_cls = None
+
+    def install(self):
+        try:
+            from playwright._impl._connection import Channel
+        except ImportError:
+            return self
+        counter = self
+        original = Channel.send
+
+        async def send(channel, method, *args, **kwargs):
+            counter.calls += 1
+            counter.by_method[method] = counter.by_method.get(method, 0) + 1
+            if method == "waitForTimeout":
+                for arg in list(args) + list(kwargs.values()):
+                    if isinstance(arg, dict) and "timeout" in arg:
+                        counter.fixed_wait_ms += arg["timeout"] or 0
+            return await original(channel, method, *args, **kwargs)
+
+        Channel.send = send
+        self._original = original
+        self._channel_cls = Channel
+        self.enabled = True
+        return self
+
+    def uninstall(self):
+        if self._channel_cls and self._original:
+            self._channel_cls.send = self._original
+
+
+def peak_rss_mb():
+    """현재 프로세스 / 종료된 하위 프로세스(브라우저)의 최대 RSS (MB)"""
+    if resource is None:
+        return None, None
+    # 리눅스는 KB, macOS는 바이트 단위
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+
+# --- 크롤러 실행 ---
+
+async def run_crawler(crawler_type, context, count, concurrency, log):
+    """세 크롤러를 wrapper.py와 같은 방식(공유 컨텍스트 주입)으로 실행"""
+    category = DEFAULT_CATEGORIES[crawler_type]
+    if crawler_type == "musinsa":
+        crawler = MusinsaCrawler()
+        crawler.log_callback = log
+        return await crawler.crawl_products(
+            category, crawler.categories[category], count,
+            context=context, concurrency=concurrency, capture_json=True
+        )
+    if crawler_type == "wconcept":
+        crawler = WConceptCrawler()
+        crawler.log_callback = log
+        return await crawler.crawl_products(
+            category, count, True,
+            context=context, concurrency=concurrency, capture_json=True
+        )
+    if crawler_type == "29cm":
+        app = CrawlerApp_29CM(MockRoot())
+        app.log = log
+        return await app.crawl_29cm(
+            "", category=category, count=count,
+            context=context, concurrency=concurrency, capture_json=True
+        )
+    raise ValueError(f"Unknown crawler type: {crawler_type}")
+
+
+def context_options(crawler_type):
+    if crawler_type == "musinsa":
+        return dict(MusinsaCrawler.CONTEXT_OPTIONS)
+    if crawler_type == "wconcept":
+        return dict(WConceptCrawler.CONTEXT_OPTIONS)
+    return dict(CrawlerApp_29CM.CONTEXT_OPTIONS)
+
+
+def _make_logger(verbose):
+    def log(msg):
+        if verbose:
+            print(msg, flush=True)
+    return log
+
+
+async def record(crawler_type, count, concurrency, verbose):
+    """실제 사이트를 크롤링하면서 목록/상세 응답을 HAR로 저장"""
+    os.makedirs(HAR_DIR, exist_ok=True)
+    path = har_path(crawler_type)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        # 이미지/폰트 등은 운영과 동일하게 차단하여 HAR 크기를 줄임
+        context = await browser.new_context(
+            record_har_path=path, record_har_content="attach", **context_options(crawler_type)
+        )
+        await RequestBlocker().attach(context)
+        products = await run_crawler(crawler_type, context, count, concurrency, _make_logger(verbose))
+        await context.close()  # 컨텍스트를 닫아야 HAR가 기록됨
+        await browser.close()
+    print(f"[{crawler_type}] 녹화 완료: {len(products or [])}개 수집 → {path}")
+
+
+async def replay(crawler_type, count, concurrency, verbose):
+    """녹화된 HAR만으로 크롤러를 재생하고 측정값을 dict로 반환 (HAR에 없는 요청은 차단)"""
+    path = har_path(crawler_type)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"HAR 파일이 없습니다. 먼저 record를 실행하세요: {path}")
+
+    counter = ProtocolCounter().install()
+    pages_opened = 0
+
+    def on_page(_page):
+        nonlocal pages_opened
+        pages_opened += 1
+
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context(**context_options(crawler_type))
+            await context.route_from_har(path, not_found="abort")
+            # 운영과 같은 차단 규칙 (RequestBlocker가 먼저 처리 후 HAR 라우트로 fallback)
+            await RequestBlocker().attach(context)
+            context.on("page", on_page)
+
+            started = time.perf_counter()
+            products = await run_crawler(crawler_type, context, count, concurrency, _make_logger(verbose))
+            elapsed = time.perf_counter() - started
+
+            await context.close()
+            await browser.close()
+    finally:
+        counter.uninstall()
+
+    own_rss, browser_rss = peak_rss_mb()
+    return {
+        "crawler": crawler_type,
+        "count": count,
+        "collected": len(products or []),
+        "wall_s": round(elapsed, 2),
+        "cdp_calls": counter.calls if counter.enabled else None,
+        "fixed_wait_ms": counter.fixed_wait_ms if counter.enabled else None,
+        "pages_opened": pages_opened,
+        "peak_rss_mb": own_rss,
+        "browser_peak_rss_mb": browser_rss,
+    }
+
+
+def bench(crawlers, counts, concurrency, as_json):
+    """크롤러 x 개수 조합마다 별도 프로세스에서 replay를 실행해 결과를 표로 출력"""
+    rows = []
+    for crawler_type in crawlers:
+        for count in counts:
+            cmd = [sys.executable, os.path.abspath(__file__), "replay",
+                   "--crawler", crawler_type, "--count", str(count),
+                   "--concurrency", str(concurrency), "--json"]
+            proc = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
+            if proc.returncode != 0:
+                print(f"[{crawler_type} x {count}] 실패:\n{proc.stderr.strip()}", file=sys.stderr)
+                continue
+            rows.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if as_json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return rows
+
+    headers = ["crawler", "count", "collected", "wall_s", "cdp_calls", "fixed_wait_ms",
+               "pages_opened", "peak_rss_mb", "browser_peak_rss_mb"]
+    print("\t".join(headers))
+    for row in rows:
+        print("\t".join("-" if row.get(h) is None else str(row.get(h)) for h in headers))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤러 오프라인 재생 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_record = sub.add_parser("record", help="실제 사이트를 크롤링하며 HAR 녹화")
+    p_record.add_argument("--crawler", choices=CRAWLERS, required=True)
+    p_record.add_argument("--count", type=int, default=100, help="녹화할 상품 수 (벤치마크 최대 개수 이상)")
+
+    p_replay = sub.add_parser("replay", help="HAR로 단일 재생")
+    p_replay.add_argument("--crawler", choices=CRAWLERS, required=True)
+    p_replay.add_argument("--count", type=int, default=10)
+    p_replay.add_argument("--json", action="store_true", help="측정값을 JSON 한 줄로 출력")
+
+    p_bench = sub.add_parser("bench", help="크롤러 x 개수별 재생 벤치마크")
+    p_bench.add_argument("--crawlers", nargs="+", choices=CRAWLERS, default=list(CRAWLERS))
+    p_bench.add_argument("--counts", nargs="+", type=int, default=[10, 50, 100])
+    p_bench.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+
+    for p in (p_record, p_replay, p_bench):
+        p.add_argument("--concurrency", type=int, default=3, help="상세 페이지 동시 수집 수")
+    for p in (p_record, p_replay):
+        p.add_argument("--verbose", action="store_true", help="크롤러 로그 출력")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record(args.crawler, args.count, args.concurrency, args.verbose))
+    elif args.command == "replay":
+        result = asyncio.run(replay(args.crawler, args.count, args.concurrency, args.verbose))
+        print(json.dumps(result, ensure_ascii=False) if args.json else result)
+    else:
+        bench(args.crawlers, args.counts, args.concurrency, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,18 +24,96 @@ except ImportError:
     messagebox = MockTk()
     filedialog = MockTk()
 import asyncio
+from contextlib import asynccontextmanager
 from playwright.async_api import async_playwright
-import pandas as pd
 from datetime import datetime
 import os
 import sys
+import time
 try:
     sys.stdout.reconfigure(encoding='utf-8')
 except AttributeError:
     pass
 
+# 공용 페이지 유틸 (crawlers/page_utils.py)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from excel_export import write_excel
+from page_utils import (
+    CancelToken, CrawlCancelled, JsonCapture, RequestBlocker, StepTimer, counts_agree, format_price, pick_field,
+    record_url, wait_for_dom_quiet, wait_for_stable_count
+)
+
+# 베스트/검색 API 응답 캡처 설정 (베스트 상품 / 상품 검색 엔드포인트만, JSON 필드명 후보 - name 같은 일반 키는 제외)
+LIST_API_PATTERN_29CM = r"api\.29cm\.co\.kr/api/v\d+/(best-items|best/items|products/search)"
+ID_KEYS_29CM = ("itemNo", "itemId", "productNo")
+NAME_KEYS_29CM = ("itemName", "productName")
+BRAND_KEYS_29CM = ("frontBrandNameKor", "brandNameKor", "brandName")
+BRAND_ID_KEYS_29CM = ("frontBrandNo", "brandNo", "brandId")
+PRICE_KEYS_29CM = ("lastSalePrice", "salePrice", "sellPrice", "consumerPrice")
+
+# 카테고리별 베스트 URL
+CATEGORY_URLS_29CM = {
+    "전체": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30",
+    "여성의류": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=268100100",
+    "여성가방": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=269100100",
+    "여성슈즈": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=270100100",
+    "악세서리": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=271100100",
+    "주얼리": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=305100100",
+    "뷰티": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=266100100",
+    "레저": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=286100100",
+    "키즈": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=290100100",
+    "남성의류": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=272100100",
+    "남성가방": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=273100100",
+    "남성슈즈": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=274100100"
+}
+
+# 판매자 정보 캐시에 저장/복원하는 필드 (목록 API를 쓰면 상품명/가격 등은 매번 목록에서 가져옴)
+SELLER_FIELDS_29CM = ("판매자 상호", "판매자 주소", "연락처", "사업자등록번호")
+# DOM 링크 목록에는 상품 정보가 없으므로 판매자 정보와 함께 캐시해 두고 적중 시 상세 페이지 없이 결과를 만듦
+LISTING_FIELDS_29CM = ("브랜드명", "상품명", "가격")
+
+# 목록 페이지의 상품 링크 href를 한 번에 수집 (/product/ → /catalog/ 순, 없으면 전체 a[href]에서 필터)
+LINK_EXTRACT_JS = """
+() => {
+    const pick = (sel) => Array.from(document.querySelectorAll(sel)).map(a => a.getAttribute('href'));
+    let hrefs = pick('a[href*="/product/"]').concat(pick('a[href*="/catalog/"]'));
+    if (!hrefs.length) {
+        hrefs = pick('a[href]').filter(h => h && (h.includes('/product/') || h.includes('/catalog/')));
+    }
+    return hrefs.filter(Boolean);
+}
+"""
+
+# 상세 페이지의 상품명/브랜드/가격/판매자 테이블을 한 번에 추출 (요소별 inner_text 왕복 제거)
+DETAIL_EXTRACT_JS = """
+() => {
+    const text = (sel) => {
+        const el = document.querySelector(sel);
+        return el ? el.innerText : null;
+    };
+    const rows = [];
+    document.querySelectorAll('table tr').forEach(tr => {
+        const th = tr.querySelector('th');
+        const td = tr.querySelector('td');
+        if (th && td) rows.push([th.innerText, td.innerText]);
+    });
+    return {
+        name: text('#pdp_product_name'),
+        brand: text('a[href*="/brand/"] h3') ?? text('a[href*="/brand/"][translate="no"]'),
+        price: text('#pdp_product_price'),
+        rows: rows
+    };
+}
+"""
+
 
 class CrawlerApp:
+    # 브라우저 컨텍스트 옵션 (브라우저 풀에서 컨텍스트를 빌릴 때도 사용)
+    CONTEXT_OPTIONS = {
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'viewport': {'width': 1280, 'height': 800}
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("29cm 크롤러")
@@ -53,6 +131,7 @@ class CrawlerApp:
             self.search_keyword = MockVar("여성가방")
             
         self.is_crawling = False
+        self.timer = StepTimer()
         
         try:
             self.setup_ui()
@@ -127,45 +206,211 @@ class CrawlerApp:
         # 비동기 크롤링 실행
         asyncio.run(self.crawl_29cm(keyword))
         
-    async def crawl_29cm(self, keyword, category=None, count=50):
-        """29cm 크롤링 메인 함수 (상세 페이지 판매자 정보 수집 기능 추가)"""
+    @asynccontextmanager
+    async def _open_context(self, context=None):
+        """외부(브라우저 풀)에서 받은 컨텍스트를 쓰거나, 없으면 직접 브라우저 실행"""
+        if context is not None:
+            yield context
+            return
+        
+        async with async_playwright() as p:
+            # 브라우저 실행
+            browser = await p.chromium.launch(
+                headless=True,
+                args=["--no-sandbox", "--disable-dev-shm-usage"]
+            )
+            blocker = RequestBlocker()
+            try:
+                own_context = await browser.new_context(**self.CONTEXT_OPTIONS)
+                await blocker.attach(own_context)
+                yield own_context
+            finally:
+                self.log(blocker.summary())
+                await browser.close()
+        
+    async def _fetch_detail(self, context, rank, url, rate_limiter=None):
+        """상품 상세 페이지 하나를 열어 상품/판매자 정보 수집 (실패 시 None)"""
+        new_page = await context.new_page()
         try:
-            # 카테고리 URL 매핑
-            category_urls = {
-                "전체": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30",
-                "여성의류": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=268100100",
-                "여성가방": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=269100100",
-                "여성슈즈": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=270100100",
-                "악세서리": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=271100100",
-                "주얼리": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=305100100",
-                "뷰티": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=266100100",
-                "레저": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=286100100",
-                "키즈": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=290100100",
-                "남성의류": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=272100100",
-                "남성가방": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=273100100",
-                "남성슈즈": "https://home.29cm.co.kr/best-products?period=HOURLY&ranking=POPULARITY&gender=F&age=30&categoryLargeCode=274100100"
+            if rate_limiter:
+                await rate_limiter.wait(url)
+            await new_page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            # 상품명과 판매자 테이블이 그려질 때까지만 대기 (기존: 1~2초 고정 대기)
+            ready = await wait_for_stable_count(new_page, '#pdp_product_name, table tr', min_count=2, stable_ms=300, timeout=2000)
+            self.timer.note_wait("상세 로딩", ready, 1500, verbose=False)
+            
+            # 데이터 수집 (상품명/브랜드/가격/판매자 테이블을 한 번의 evaluate로)
+            detail = await new_page.evaluate(DETAIL_EXTRACT_JS)
+            product_name = detail.get('name') or "수집 실패"
+            product_brand = detail.get('brand') or "수집 실패"
+            product_price = detail.get('price') or "수집 실패"
+            
+            # 판매자 정보
+            seller_name = ""
+            seller_address = ""
+            contact = ""
+            business_number = ""
+            
+            try:
+                for th_text, td_text in detail.get('rows', []):
+                    header = th_text.replace(" ", "")
+                    value = td_text.strip()
+                    
+                    if "상호" in header or "판매자" in header:
+                        if not seller_name: seller_name = value
+                    elif "주소" in header or "소재지" in header:
+                        if not seller_address: seller_address = value
+                    elif "연락처" in header or "전화번호" in header:
+                        if not contact: contact = value
+                    elif "사업자" in header and "번호" in header:
+                        if not business_number: business_number = value
+            except Exception as e:
+                self.log(f"판매자 정보 파싱 오류: {e}")
+
+            return {
+                '순위': rank,
+                '브랜드명': product_brand,
+                '상품명': product_name,
+                '가격': product_price,
+                '판매자 상호': seller_name,
+                '판매자 주소': seller_address,
+                '연락처': contact,
+                '사업자등록번호': business_number,
+                '상세페이지URL': url
             }
+            
+        except Exception as e:
+            self.log(f"[{rank}] 상품 상세 실패: {e}")
+            return None
+        finally:
+            await new_page.close()
+        
+    def _items_from_json(self, capture, count, dom_items):
+        """캡처한 베스트/검색 API 응답에서 상품 상세 URL 목록 구성
+        
+        상품명/브랜드/가격도 함께 담아두어 판매자 캐시가 적중하면 상세 페이지 없이 결과를 만들 수 있게 함
+        DOM 링크 개수와 맞지 않거나 상세 URL을 확인하지 못하면 빈 리스트 반환 (DOM 링크 사용)
+        """
+        records = capture.records(ID_KEYS_29CM, NAME_KEYS_29CM)
+        if not records:
+            return []
+        if not counts_agree(len(records), len(dom_items), count):
+            self.log(f"목록 API 응답 상품 수({len(records)})가 페이지 상품 수({len(dom_items)})와 달라 사용하지 않음")
+            return []
+        dom_urls = [item['url'] for item in dom_items]
+        target_items = []
+        for record in records[:count]:
+            url = record_url(record, pick_field(record, ID_KEYS_29CM), dom_urls, "https://www.29cm.co.kr")
+            if not url:
+                self.log("목록 API 응답에서 상품 URL을 확인하지 못해 사용하지 않음")
+                return []
+            target_items.append({
+                'url': url,
+                'name': str(pick_field(record, NAME_KEYS_29CM)).strip(),
+                'brand': str(pick_field(record, BRAND_KEYS_29CM)).strip(),
+                'price': format_price(pick_field(record, PRICE_KEYS_29CM)),
+                'brand_id': str(pick_field(record, BRAND_ID_KEYS_29CM))
+            })
+        return target_items
+    
+    def _detail_from_cache(self, rank, item, seller):
+        """목록 API의 상품 정보(DOM 링크 목록이면 캐시된 상품 정보) + 캐시된 판매자 정보로 _fetch_detail과 같은 형태의 결과 구성"""
+        detail = {
+            '순위': rank,
+            '브랜드명': item.get('brand') or seller.get('브랜드명') or "수집 실패",
+            '상품명': item.get('name') or seller.get('상품명') or "수집 실패",
+            '가격': item.get('price') or seller.get('가격') or "수집 실패",
+        }
+        detail.update({key: seller.get(key, "") for key in SELLER_FIELDS_29CM})
+        detail['상세페이지URL'] = item['url']
+        return detail
+    
+    @staticmethod
+    def _seller_from_detail(detail, with_listing=False):
+        """상세 페이지 결과에서 판매자 캐시에 저장할 값 (with_listing: 상품명/브랜드/가격도 함께 - DOM 링크 목록용)"""
+        if not detail:
+            return {}
+        seller = {key: detail[key] for key in SELLER_FIELDS_29CM}
+        if with_listing and any(str(value).strip() for value in seller.values()):
+            seller.update((key, detail[key]) for key in LISTING_FIELDS_29CM)
+        return seller
+        
+    async def _collect_links_from_dom(self, page, count, link_selector):
+        """목록 페이지 DOM에서 상품 상세 링크 수집 (API 응답을 못 잡았을 때의 폴백)"""
+        # 상품 목록 추출 (개선된 선택자)
+        unique_urls = []
+        target_items = []
+        
+        # 재시도 로직
+        max_retries = 3
+        for attempt in range(max_retries):
+            self.log(f"상품 목록 요소를 찾는 중... (시도 {attempt+1}/{max_retries})")
+            
+            # 후보 링크의 href를 한 번의 evaluate로 모두 가져옴 (요소별 get_attribute 왕복 제거)
+            hrefs = await page.evaluate(LINK_EXTRACT_JS)
+            
+            if hrefs:
+                self.log(f"상품 링크 후보 {len(hrefs)}개 발견")
+                
+                for href in hrefs:
+                    if not href: continue
+                    
+                    # URL 정규화
+                    if href.startswith('//'):
+                        full_url = f"https:{href}"
+                    elif href.startswith('/'):
+                        full_url = f"https://www.29cm.co.kr{href}"
+                    else:
+                        full_url = href
+                        
+                    # 유효성 검사 (상품 페이지인지)
+                    if '/product/' in full_url or '/catalog/' in full_url:
+                        # 중복 제거
+                        clean_url = full_url.split('?')[0] # 파라미터 제외하고 비교
+                        if clean_url not in unique_urls:
+                            unique_urls.append(clean_url)
+                            target_items.append({'url': full_url})
+                            if len(target_items) >= count * 2: # 충분히 수집
+                                break
+                                
+                if len(target_items) > 0:
+                    break # 성공
+            
+            # 실패 시 스크롤 조금 더 하고 링크가 나타날 때까지 대기 후 재시도
+            await page.mouse.wheel(0, 500)
+            await wait_for_stable_count(page, link_selector, min_count=1, stable_ms=500, timeout=2000)
+        
+        return target_items
+        
+    async def crawl_29cm(self, keyword, category=None, count=50, context=None, concurrency=1, rate_limiter=None,
+                         capture_json=True, cancel_token=None, on_item=None, seller_cache=None, save_excel=True):
+        """29cm 크롤링 메인 함수 (상세 페이지 판매자 정보 수집 기능 추가)
+        
+        concurrency: 동시에 수집할 상세 페이지 수 (1이면 순차 수집)
+        rate_limiter: HostRateLimiter (호스트별 요청 간격 제한, 없으면 제한 없음)
+        capture_json: 목록 API 응답(JSON)에서 상품을 파싱 (응답이 없으면 DOM 스크래핑으로 폴백)
+        cancel_token: CancelToken (취소되면 진행 중인 이동을 끊고 그때까지 수집한 결과를 반환)
+        on_item: 상세 정보가 수집될 때마다 호출되는 콜백 (수집 완료 순서)
+        seller_cache: 판매자 정보 창구 (resolve - 캐시나 같은 브랜드 상품에서 찾으면 상세 페이지를 열지 않음,
+                      DOM 링크 목록이면 상품 정보까지 캐시된 URL만 생략)
+        save_excel: 결과를 카테고리별 엑셀 파일로 저장하고 TSV를 로그에 출력 (배치 실행에서는 끔)
+        """
+        token = cancel_token or CancelToken()
+        try:
 
             self.log(f"크롤링 시작: 키워드='{keyword}', 카테고리='{category}', 개수={count}")
+            self.timer = StepTimer(self.log)
             
-            async with async_playwright() as p:
-                # 브라우저 실행
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=["--no-sandbox", "--disable-dev-shm-usage"]
-                )
-                context = await browser.new_context(
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    viewport={'width': 1280, 'height': 800}
-                )
+            async with self._open_context(context) as context:
                 page = await context.new_page()
+                capture = JsonCapture(page, LIST_API_PATTERN_29CM) if capture_json else None
                 
                 target_url = ""
                 file_prefix = ""
                 
                 # URL 결정 로직
-                if category and category in category_urls:
-                    target_url = category_urls[category]
+                if category and category in CATEGORY_URLS_29CM:
+                    target_url = CATEGORY_URLS_29CM[category]
                     self.log(f"카테고리 베스트 접속: {category}")
                     file_prefix = f"29cm_{category}"
                 else:
@@ -176,159 +421,103 @@ class CrawlerApp:
                     self.log(f"키워드 검색 접속: {keyword}")
                     file_prefix = f"29cm_{keyword}"
 
-                await page.goto(target_url, wait_until='networkidle', timeout=60000)
-                await asyncio.sleep(2)
-                
-                # 스크롤
-                await page.mouse.wheel(0, 1000)
-                await asyncio.sleep(1)
+                link_selector = 'a[href*="/product/"], a[href*="/catalog/"]'
+                with self.timer.step("목록 페이지 로딩"):
+                    # networkidle + 고정 2초 대신 상품 링크 개수가 안정될 때까지 대기
+                    try:
+                        await token.run(page.goto(target_url, wait_until='domcontentloaded', timeout=60000))
+                        loaded = await token.run(wait_for_stable_count(page, link_selector, min_count=1, stable_ms=500, timeout=15000))
+                    except CrawlCancelled:
+                        self.log("크롤링 중지됨")
+                        await page.close()
+                        return []
+                    self.timer.note_wait("목록 로딩", loaded, 2000)
+                    
+                    # 스크롤
+                    await page.mouse.wheel(0, 1000)
+                    self.timer.note_wait("스크롤 로딩", await wait_for_dom_quiet(page, quiet_ms=300, timeout=1000), 1000)
 
-                # 상품 목록 추출 (개선된 선택자)
-                unique_urls = []
+                # 상품 목록 추출 - DOM 링크를 모은 뒤, 베스트/검색 API 응답(JSON)이 같은 목록이면
+                # 응답의 상품명/브랜드/가격을 함께 사용 (판매자 캐시 적중 시 상세 페이지 생략)
+                dom_items = await self._collect_links_from_dom(page, count, link_selector)
                 target_items = []
-                
-                # 재시도 로직
-                max_retries = 3
-                for attempt in range(max_retries):
-                    self.log(f"상품 목록 요소를 찾는 중... (시도 {attempt+1}/{max_retries})")
-                    
-                    product_elements = []
-                    
-                    # 1. /product/ 링크 포함 (일반적인 패턴)
-                    elements_product = await page.query_selector_all('a[href*="/product/"]')
-                    product_elements.extend(elements_product)
-                    
-                    # 2. /catalog/ 링크 포함 (기존 패턴)
-                    elements_catalog = await page.query_selector_all('a[href*="/catalog/"]')
-                    product_elements.extend(elements_catalog)
-                    
-                    # 3. 29cm 특정 클래스 패턴 (ewptmlp5 등 - 동적일 수 있으므로 href 위주로)
-                    # 베스트 페이지 구조: div > a (href에 숫자 포함)
-                    
-                    if not product_elements:
-                        # 더 넓은 범위로 검색 (숫자가 포함된 href)
-                        all_links = await page.query_selector_all('a[href]')
-                        for link in all_links:
-                            href = await link.get_attribute('href')
-                            if href and ('/product/' in href or '/catalog/' in href):
-                                product_elements.append(link)
-                    
-                    if product_elements:
-                        self.log(f"상품 링크 후보 {len(product_elements)}개 발견")
-                        
-                        for el in product_elements:
-                            href = await el.get_attribute('href')
-                            if not href: continue
-                            
-                            # URL 정규화
-                            if href.startswith('//'):
-                                full_url = f"https:{href}"
-                            elif href.startswith('/'):
-                                full_url = f"https://www.29cm.co.kr{href}"
-                            else:
-                                full_url = href
-                                
-                            # 유효성 검사 (상품 페이지인지)
-                            if '/product/' in full_url or '/catalog/' in full_url:
-                                # 중복 제거
-                                clean_url = full_url.split('?')[0] # 파라미터 제외하고 비교
-                                if clean_url not in unique_urls:
-                                    unique_urls.append(clean_url)
-                                    target_items.append({'url': full_url})
-                                    if len(target_items) >= count * 2: # 충분히 수집
-                                        break
-                                        
-                        if len(target_items) > 0:
-                            break # 성공
-                    
-                    # 실패 시 대기 후 재시도
-                    await asyncio.sleep(2)
-                    # 스크롤 조금 더
-                    await page.mouse.wheel(0, 500)
+                if capture:
+                    await capture.settle()
+                    target_items = self._items_from_json(capture, count, dom_items)
+                if target_items:
+                    self.log(f"목록 API 응답에서 상품 {len(target_items)}개 정보 확인")
+                else:
+                    if capture:
+                        self.log("목록 API 응답을 사용할 수 없어 DOM 링크로 진행")
+                    if seller_cache and seller_cache.brand_dedup:
+                        self.log("DOM 링크 목록에는 브랜드 정보가 없어 같은 브랜드 판매자 재사용은 하지 않음 (URL 기준 캐시만 사용)")
+                    target_items = dom_items
                 
                 # 요청한 개수만큼 자르기
                 target_items = target_items[:count]
                 self.log(f"상품 목록 추출 완료: {len(target_items)}개 (목표: {count}개)")
                 
-                results = []
-                import random
+                # 상세 페이지 병렬 수집 (동시에 열 페이지 수를 세마포어로 제한)
+                concurrency = max(1, min(int(concurrency or 1), len(target_items) or 1))
+                semaphore = asyncio.Semaphore(concurrency)
+                total = len(target_items)
                 
-                # 상세 페이지 순회
-                for rank, item in enumerate(target_items, start=1):
-                    url = item['url']
-                    self.log(f"[{rank}/{len(target_items)}] 상세 정보 수집 중... {url.split('/catalog/')[-1]}")
-                    
-                    new_page = await context.new_page()
+                async def visit(rank, item):
+                    async with semaphore:
+                        if token.cancelled:
+                            raise CrawlCancelled()
+                        self.log(f"[{rank}/{total}] 상세 정보 수집 중... {item['url'].split('/catalog/')[-1]}")
+                        # 취소되면 진행 중인 상세 페이지 이동을 바로 끊음 (페이지는 _fetch_detail에서 닫힘)
+                        return await token.run(self._fetch_detail(context, rank, item['url'], rate_limiter))
+                
+                async def fetch(rank, item):
+                    brand_id = item.get('brand_id') or None
                     try:
-                        await new_page.goto(url, wait_until='domcontentloaded', timeout=30000)
-                        await asyncio.sleep(random.uniform(1.0, 2.0))
-                        
-                        # 데이터 수집
-                        # 1. 상품명
-                        name_elem = await new_page.query_selector('#pdp_product_name')
-                        product_name = await name_elem.inner_text() if name_elem else "수집 실패"
-                        
-                        # 2. 브랜드
-                        brand_elem = await new_page.query_selector('a[href*="/brand/"] h3')
-                        if not brand_elem:
-                             brand_elem = await new_page.query_selector('a[href*="/brand/"][translate="no"]')
-                        product_brand = await brand_elem.inner_text() if brand_elem else "수집 실패"
-                        
-                        # 3. 가격
-                        price_elem = await new_page.query_selector('#pdp_product_price')
-                        product_price = await price_elem.inner_text() if price_elem else "수집 실패"
-                        
-                        # 4. 판매자 정보
-                        seller_name = ""
-                        seller_address = ""
-                        contact = ""
-                        business_number = ""
-                        
-                        try:
-                            rows = await new_page.query_selector_all('table tr')
-                            for row in rows:
-                                th_el = await row.query_selector('th')
-                                td_el = await row.query_selector('td')
-                                if th_el and td_el:
-                                    header = (await th_el.inner_text()).replace(" ", "")
-                                    value = (await td_el.inner_text()).strip()
-                                    
-                                    if "상호" in header or "판매자" in header:
-                                        if not seller_name: seller_name = value
-                                    elif "주소" in header or "소재지" in header:
-                                        if not seller_address: seller_address = value
-                                    elif "연락처" in header or "전화번호" in header:
-                                        if not contact: contact = value
-                                    elif "사업자" in header and "번호" in header:
-                                        if not business_number: business_number = value
-                        except Exception as e:
-                            self.log(f"판매자 정보 파싱 오류: {e}")
-
-                        results.append({
-                            '순위': rank,
-                            '브랜드명': product_brand,
-                            '상품명': product_name,
-                            '가격': product_price,
-                            '판매자 상호': seller_name,
-                            '판매자 주소': seller_address,
-                            '판매자 주소': seller_address,
-                            '연락처': contact,
-                            '사업자등록번호': business_number,
-                            '상세페이지URL': url
-                        })
-                        
-                    except Exception as e:
-                        self.log(f"상품 상세 실패: {e}")
-                    finally:
-                        await new_page.close()
-                    
-                    # 진행 상황 업데이트 (GUI가 있다면)
-                    # if rank % 5 == 0: self.log(f"진행 중... {rank}개 완료")
+                        if seller_cache:
+                            # 판매자 캐시(URL) → 같은 브랜드의 앞 상품 → 상세 페이지 순으로 확보
+                            listed = bool(item.get('name'))
+                            visited = {}
+                            
+                            async def visit_seller():
+                                visited['detail'] = await visit(rank, item)
+                                return self._seller_from_detail(visited['detail'], with_listing=not listed)
+                            
+                            seller = await seller_cache.resolve(item['url'], visit_seller, brand=item.get('brand'), brand_id=brand_id)
+                            if 'detail' in visited:
+                                detail = visited['detail']
+                            elif listed or seller.get('상품명'):
+                                detail = self._detail_from_cache(rank, item, seller)
+                            else:
+                                # 캐시에 판매자 정보만 있으면(목록 API 실행에서 저장) 상품 정보는 상세 페이지에서 수집하고
+                                # 다음 실행부터는 적중하도록 상품 정보와 함께 다시 저장
+                                detail = await visit(rank, item)
+                                if detail:
+                                    seller_cache.record_fetch(item['url'], self._seller_from_detail(detail, with_listing=True), brand_id)
+                        else:
+                            detail = await visit(rank, item)
+                    except CrawlCancelled:
+                        return None
+                    if detail and on_item:
+                        on_item(dict(detail))
+                    return detail
+                
+                self.log(f"상세 페이지 수집 시작 (동시 {concurrency}개)")
+                started = time.perf_counter()
+                with self.timer.step("상세 정보 수집"):
+                    fetched = await asyncio.gather(*(fetch(rank, item) for rank, item in enumerate(target_items, start=1)))
+                # gather는 입력 순서를 유지하므로 순위 순서가 보존됨
+                results = [item for item in fetched if item]
+                if token.cancelled:
+                    self.log("크롤링 중지됨 - 지금까지 수집한 결과만 반환")
+                elapsed = time.perf_counter() - started
+                throughput = len(results) / elapsed if elapsed > 0 else 0.0
+                self.log(f"상세 정보 수집 완료: {len(results)}/{total}개, {elapsed:.1f}초 ({throughput:.2f} items/s)")
+                self.log(self.timer.summary())
 
-                await browser.close()
+                await page.close()
                 
                 # 결과 처리
-                if results:
+                if results and save_excel:
                     # 1. Excel 저장
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     filename = f"{file_prefix}_{timestamp}.xlsx"
@@ -339,17 +528,8 @@ class CrawlerApp:
                     filepath = os.path.join(output_dir, filename)
                     
 
-                    # 엑셀 저장 전 데이터 포맷팅 (텍스트 강제 지정)
-                    for item in results:
-                        # 연락처: 앞자리 0 보존을 위해 ' 붙임
-                        if item['연락처'] and not item['연락처'].startswith("'"):
-                            item['연락처'] = "'" + str(item['연락처'])
-                        # 가격: 텍스트로 보존 (선택사항이나 안전을 위해)
-                        if item['가격'] and not item['가격'].startswith("'"):
-                            item['가격'] = "'" + str(item['가격'])
-
-                    df = pd.DataFrame(results)
-                    df.to_excel(filepath, index=False, engine='openpyxl')
+                    # 모든 셀을 텍스트 서식으로 저장하므로 연락처 앞자리 0 / 가격 문자열이 그대로 보존됨
+                    write_excel(filepath, results)
                     
                     self.log(f"\n[완료] 파일 저장됨: {filepath}")
                     
@@ -379,7 +559,7 @@ class CrawlerApp:
                     self.log("=========================================")
                     
                     messagebox.showinfo("완료", f"크롤링이 완료되었습니다.\n{len(results)}개 상품이 저장되었습니다.")
-                else:
+                elif not results:
                     self.log("수집된 상품이 없습니다.")
                 
                 return results
@@ -0,0 +1,86 @@
+"""
+이전 실행 대비 순위 변동 계산 (diff 모드)
+같은 source + category의 직전 실행 결과와 이번 목록을 상품 URL 기준으로 비교해
+신규 진입 / 이탈 / 상승 / 하락 / 유지를 표시한다.
+"""
+
+from result_store import PRODUCT_URL_KEYS, RANK_KEYS, CATEGORY_KEY
+from seller_cache import normalize_product_url
+
+RANK_CHANGE_COLUMN = "순위변동"
+PREVIOUS_RANK_COLUMN = "이전순위"
+DROPPED_SHEET = "이탈"  # 엑셀 저장 시 이탈 상품 시트 이름
+
+
+def _pick(item, keys, default=None):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def product_key(item):
+    return normalize_product_url(_pick(item, PRODUCT_URL_KEYS, ""))
+
+
+def product_rank(item):
+    try:
+        return int(_pick(item, RANK_KEYS))
+    except (TypeError, ValueError):
+        return None
+
+
+def rank_changes(products, previous_products):
+    """products에 순위변동/이전순위 컬럼을 채우고 변동 요약을 반환
+
+    순위변동: 신규 / ▲n (상승) / ▼n (하락) / - (유지)
+    요약: {"new", "up", "down", "same", "dropped": [이탈 상품 목록]}
+    """
+    previous = {}
+    for item in previous_products:
+        key = product_key(item)
+        if key and key not in previous:
+            previous[key] = item
+
+    summary = {"new": 0, "up": 0, "down": 0, "same": 0, "dropped": []}
+    seen = set()
+    for item in products:
+        key = product_key(item)
+        seen.add(key)
+        before = previous.get(key) if key else None
+        rank = product_rank(item)
+        previous_rank = product_rank(before) if before else None
+        if before is None:
+            change, kind = "신규", "new"
+        elif rank is None or previous_rank is None or rank == previous_rank:
+            change, kind = "-", "same"
+        elif rank < previous_rank:
+            change, kind = f"▲{previous_rank - rank}", "up"
+        else:
+            change, kind = f"▼{rank - previous_rank}", "down"
+        item[RANK_CHANGE_COLUMN] = change
+        item[PREVIOUS_RANK_COLUMN] = previous_rank or ""
+        summary[kind] += 1
+
+    for key, item in previous.items():
+        if key not in seen:
+            dropped = {k: v for k, v in item.items() if k not in (RANK_CHANGE_COLUMN, PREVIOUS_RANK_COLUMN)}
+            dropped[PREVIOUS_RANK_COLUMN] = product_rank(item) or ""
+            summary["dropped"].append(dropped)
+    summary["dropped"].sort(key=lambda item: item[PREVIOUS_RANK_COLUMN] or 0)
+    return summary
+
+
+def dropped_products(data):
+    """결과 데이터의 이탈 상품 목록 (배치 결과면 카테고리별 diff를 카테고리 컬럼과 함께 합침)"""
+    dropped = list((data.get("diff") or {}).get("dropped") or ())
+    for category, info in (data.get("categories") or {}).items():
+        for item in (info.get("diff") or {}).get("dropped") or ():
+            dropped.append({CATEGORY_KEY: category, **item})
+    return dropped
+
+
+def summary_line(summary):
+    return (f"이전 실행 대비: 신규 {summary['new']}개, 이탈 {len(summary['dropped'])}개, "
+            f"상승 {summary['up']}개, 하락 {summary['down']}개, 유지 {summary['same']}개")
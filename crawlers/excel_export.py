@@ -0,0 +1,66 @@
+"""
+스트리밍 엑셀 저장
+DataFrame을 거치지 않고 상품 dict 목록을 openpyxl write-only 워크북에 한 행씩 바로 기록한다.
+(일반 모드는 워크북 전체를 셀 객체로 메모리에 올려 수천 행 이상에서 느림)
+모든 값은 텍스트 셀(서식 '@')로 저장해 연락처 / 사업자등록번호 앞자리 0, 가격 문자열이 변환되지 않도록 한다.
+숫자도 기존 astype(str)처럼 문자열로 저장하고, None / 없는 컬럼은 'None' / 'nan' 대신 빈 셀로 남긴다.
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font
+
+DEFAULT_SHEET_NAME = "Sheet1"
+TEXT_FORMAT = "@"
+
+
+def collect_columns(rows):
+    """행들에 나오는 키를 처음 나온 순서대로 (DataFrame(rows)의 컬럼 순서와 같음)"""
+    columns = {}
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns[key] = None
+    return list(columns)
+
+
+def _text(value):
+    if value is None:
+        return ""
+    # 제어 문자가 섞이면 openpyxl이 IllegalCharacterError를 내므로 제거
+    return ILLEGAL_CHARACTERS_RE.sub("", str(value))
+
+
+def _write_sheet(workbook, name, rows, columns=None):
+    sheet = workbook.create_sheet(title=name[:31])  # 시트 이름은 31자 제한
+    columns = columns or collect_columns(rows)
+
+    def cell(value, bold=False):
+        item = WriteOnlyCell(sheet, value=_text(value))
+        item.number_format = TEXT_FORMAT
+        if bold:
+            item.font = Font(bold=True)
+        return item
+
+    sheet.append([cell(column, bold=True) for column in columns])
+    for row in rows:
+        sheet.append([cell(row.get(column)) for column in columns])
+    return len(rows)
+
+
+def write_sheets(filepath, sheets):
+    """여러 시트를 한 파일로 저장 - sheets: {시트 이름: 행 목록} (입력 순서대로 시트 생성)"""
+    workbook = Workbook(write_only=True)
+    for name, rows in sheets.items():
+        _write_sheet(workbook, name, rows)
+    workbook.save(filepath)
+    return filepath
+
+
+def write_excel(filepath, rows, columns=None, sheet_name=DEFAULT_SHEET_NAME):
+    """상품 dict 목록을 텍스트 셀 엑셀 파일로 저장 (columns를 주면 해당 순서/컬럼만)"""
+    workbook = Workbook(write_only=True)
+    _write_sheet(workbook, sheet_name, rows, columns)
+    workbook.save(filepath)
+    return filepath
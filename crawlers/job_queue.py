@@ -0,0 +1,134 @@
+"""
+크롤링 작업 대기열 (어드미션 컨트롤)
+요청을 바로 실행하지 않고 대기열에 넣은 뒤, 전역/크롤러 타입별 동시 실행 상한 안에서만 꺼내 실행한다.
+우선순위가 높은 작업부터, 같은 우선순위는 들어온 순서(FIFO)대로 실행한다.
+"""
+
+import asyncio
+import itertools
+import time
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차 새 작업을 받을 수 없음 (API에서는 429로 응답)"""
+
+
+class _Job:
+    def __init__(self, seq, request_id, crawler_type, params, priority):
+        self.seq = seq
+        self.request_id = request_id
+        self.crawler_type = crawler_type
+        self.params = params
+        self.priority = priority
+        self.submitted = time.monotonic()
+
+    def sort_key(self):
+        return (-self.priority, self.seq)
+
+
+class JobQueue:
+    """runner(crawler_type, params, request_id)를 동시 실행 상한 안에서 실행하는 대기열
+
+    - max_concurrent: 전체 동시 실행 수
+    - per_type_limits: {"musinsa": 1, ...} 크롤러 타입별 동시 실행 수 (없으면 전역 상한만 적용)
+    - max_queued: 대기 가능한 작업 수, 넘으면 QueueFullError
+    - coordinator_types: 직접 크롤링하지 않고 하위 작업을 이 대기열에 넣어 기다리기만 하는 타입
+      (슬롯을 차지하지 않고 바로 시작 - 하위 작업이 상한을 지키며, 부모가 슬롯을 잡고 기다리면 교착됨)
+    """
+
+    def __init__(self, runner, max_concurrent=2, per_type_limits=None, max_queued=20, coordinator_types=()):
+        self.runner = runner
+        self.max_concurrent = max_concurrent
+        self.per_type_limits = dict(per_type_limits or {})
+        self.max_queued = max_queued
+        self.coordinator_types = tuple(coordinator_types)
+        self._pending = []  # 우선순위 순으로 정렬된 대기 작업
+        self._running = {}  # request_id -> (_Job, asyncio.Task)
+        self._coordinating = {}  # request_id -> (_Job, asyncio.Task), 슬롯 없이 실행 중인 조정 작업
+        self._seq = itertools.count()
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, request_id, crawler_type, params, priority=0):
+        """작업을 대기열에 넣고 대기 순번(1부터, 바로 실행되면 0)을 반환"""
+        if len(self._pending) >= self.max_queued:
+            self.rejected += 1
+            raise QueueFullError(f"Crawl queue is full ({self.max_queued} jobs waiting)")
+        job = _Job(next(self._seq), request_id, crawler_type, params, priority)
+        if crawler_type in self.coordinator_types:
+            self._coordinating[request_id] = (job, asyncio.create_task(self._run(job)))
+            return 0
+        self._pending.append(job)
+        self._pending.sort(key=_Job.sort_key)
+        self._dispatch()
+        return self.position(request_id)
+
+    def cancel(self, request_id):
+        """아직 시작하지 않은 작업을 대기열에서 제거 (제거했으면 True)"""
+        for job in self._pending:
+            if job.request_id == request_id:
+                self._pending.remove(job)
+                return True
+        return False
+
+    def position(self, request_id):
+        """대기 순번 (1부터), 대기 중이 아니면 0"""
+        for index, job in enumerate(self._pending, start=1):
+            if job.request_id == request_id:
+                return index
+        return 0
+
+    def _running_count(self, crawler_type):
+        return sum(1 for job, _ in self._running.values() if job.crawler_type == crawler_type)
+
+    def _can_start(self, job):
+        if len(self._running) >= self.max_concurrent:
+            return False
+        limit = self.per_type_limits.get(job.crawler_type)
+        return limit is None or self._running_count(job.crawler_type) < limit
+
+    def _dispatch(self):
+        # 앞에서부터 실행 가능한 작업을 꺼냄 (타입 상한에 걸린 작업은 건너뛰고 다음 작업 시도)
+        for job in list(self._pending):
+            if len(self._running) >= self.max_concurrent:
+                break
+            if self._can_start(job):
+                self._pending.remove(job)
+                task = asyncio.create_task(self._run(job))
+                self._running[job.request_id] = (job, task)
+
+    async def _run(self, job):
+        try:
+            await self.runner(job.crawler_type, job.params, job.request_id)
+        except Exception as e:
+            print(f"Crawl job {job.request_id} failed: {e}", flush=True)
+        finally:
+            self._running.pop(job.request_id, None)
+            self._coordinating.pop(job.request_id, None)
+            self.completed += 1
+            self._dispatch()
+
+    async def close(self):
+        """대기 작업을 버리고 실행 중인 작업을 취소 (서버 종료 시)"""
+        self._pending.clear()
+        tasks = [task for _, task in list(self._running.values()) + list(self._coordinating.values())]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        running_by_type = {}
+        for job, _ in self._running.values():
+            running_by_type[job.crawler_type] = running_by_type.get(job.crawler_type, 0) + 1
+        return {
+            "running": len(self._running),
+            "running_by_type": running_by_type,
+            "queued": len(self._pending),
+            "coordinating": len(self._coordinating),
+            "max_concurrent": self.max_concurrent,
+            "per_type_limits": self.per_type_limits,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
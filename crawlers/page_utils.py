@@ -0,0 +1,437 @@
+"""
+크롤러 공용 페이지 유틸리티
+무신사 / W컨셉 / 29CM 크롤러가 함께 사용하는 비동기 헬퍼 모음
+"""
+
+import asyncio
+import re
+import time
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse
+
+
+class HostRateLimiter:
+    """호스트별로 페이지 이동 사이의 최소 간격을 보장하는 레이트 리미터
+
+    여러 페이지(또는 여러 크롤링 요청)가 같은 인스턴스를 공유하면
+    동시에 실행되더라도 한 호스트에는 min_interval 초에 한 번씩만 요청이 나간다.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._next_slot = {}  # host -> 다음 요청 가능 시각 (monotonic)
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        if self.min_interval <= 0:
+            return
+        host = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# --- 이벤트 기반 준비 상태 대기 ---
+# 고정 sleep 대신 구체적인 조건(요소 개수 안정화, DOM 변경 멈춤, 특정 XHR 응답)을 기다린다.
+# 모든 대기는 timeout(ms) 상한이 있어 느린 페이지도 기존처럼 진행되고, 빠른 페이지는 즉시 끝난다.
+
+_STABLE_COUNT_JS = """
+([selector, minCount, stableMs, timeout, pollMs]) => new Promise((resolve) => {
+    const started = performance.now();
+    let last = -1;
+    let lastChange = started;
+    const tick = () => {
+        const now = performance.now();
+        const count = document.querySelectorAll(selector).length;
+        if (count !== last) {
+            last = count;
+            lastChange = now;
+        }
+        const timedOut = now - started >= timeout;
+        if ((count >= minCount && now - lastChange >= stableMs) || timedOut) {
+            resolve({count: count, waited: now - started, timedOut: timedOut});
+            return;
+        }
+        setTimeout(tick, pollMs);
+    };
+    tick();
+})
+"""
+
+_DOM_QUIET_JS = """
+([quietMs, timeout]) => new Promise((resolve) => {
+    const started = performance.now();
+    let quietTimer = null;
+    let ceilingTimer = null;
+    let observer = null;
+    const done = (timedOut) => {
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(ceilingTimer);
+        resolve({waited: performance.now() - started, timedOut: timedOut});
+    };
+    observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(false), quietMs);
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    quietTimer = setTimeout(() => done(false), quietMs);
+    ceilingTimer = setTimeout(() => done(true), timeout);
+})
+"""
+
+
+async def wait_for_stable_count(page, selector, min_count=1, stable_ms=500, timeout=10000, poll_ms=100):
+    """selector에 맞는 요소가 min_count 이상이고 stable_ms 동안 개수 변화가 없을 때까지 대기
+
+    반환: {"count": 마지막 개수, "waited": 대기 ms, "timedOut": 상한 도달 여부}
+    """
+    try:
+        return await page.evaluate(_STABLE_COUNT_JS, [selector, min_count, stable_ms, timeout, poll_ms])
+    except Exception:
+        # 대기 중 페이지 이동 등으로 실행 컨텍스트가 사라진 경우
+        return {"count": 0, "waited": 0, "timedOut": True}
+
+
+async def wait_for_dom_quiet(page, quiet_ms=500, timeout=10000):
+    """quiet_ms 동안 DOM 변경(MutationObserver)이 없을 때까지 대기
+
+    반환: {"waited": 대기 ms, "timedOut": 상한 도달 여부}
+    """
+    try:
+        return await page.evaluate(_DOM_QUIET_JS, [quiet_ms, timeout])
+    except Exception:
+        return {"waited": 0, "timedOut": True}
+
+
+class ResponseWatcher:
+    """특정 URL 패턴의 응답(XHR/fetch)이 도착했는지 감시
+
+    페이지 이동 전에 생성해야 첫 응답을 놓치지 않는다.
+    """
+
+    def __init__(self, page, url_pattern):
+        self.pattern = re.compile(url_pattern)
+        self.count = 0
+        self._seen = asyncio.Event()
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if self.pattern.search(response.url):
+            self.count += 1
+            self._seen.set()
+
+    async def wait(self, timeout=10000):
+        """응답을 받으면 True, timeout(ms) 안에 못 받으면 False"""
+        try:
+            await asyncio.wait_for(self._seen.wait(), timeout / 1000)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class StepTimer:
+    """크롤링 단계별 소요 시간과 고정 대기 대비 절약 시간을 기록"""
+
+    def __init__(self, log=None):
+        self.log = log
+        self.steps = {}      # 단계명 -> 누적 초
+        self.saved_ms = 0.0  # 고정 대기 대비 절약한 시간 (ms)
+
+    @contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.steps[name] = self.steps.get(name, 0.0) + elapsed
+            if self.log:
+                self.log(f"⏱ {name}: {elapsed:.2f}s")
+
+    def note_wait(self, name, result, fixed_ms, verbose=True):
+        """준비 대기 결과를 기존 고정 대기 시간과 비교해 기록 (상세 페이지처럼 반복되는 대기는 verbose=False)"""
+        waited = (result or {}).get("waited", fixed_ms)
+        self.saved_ms += max(0.0, fixed_ms - waited)
+        if self.log and verbose:
+            flag = " (상한 도달)" if (result or {}).get("timedOut") else ""
+            self.log(f"⏱ {name}: {waited:.0f}ms 대기 (기존 고정 {fixed_ms}ms){flag}")
+
+    def summary(self):
+        parts = [f"{name} {seconds:.1f}s" for name, seconds in self.steps.items()]
+        return f"단계별 소요: {', '.join(parts)} | 고정 대기 대비 절약: {self.saved_ms / 1000:.1f}s"
+
+
+# --- 협력적 취소 ---
+# 중지 요청 시 항목 사이에서 루프를 빠져나오고, 진행 중인 페이지 이동/대기도 즉시 끊는다.
+
+class CrawlCancelled(Exception):
+    """취소 토큰이 취소되어 진행 중인 작업을 중단함"""
+
+
+class CancelToken:
+    """크롤러에 넘기는 취소 토큰
+
+    - cancelled: 루프에서 항목마다 확인
+    - run(awaitable): goto/대기 등을 감싸 실행, 도중에 취소되면 작업을 끊고 CrawlCancelled 발생
+    cancel()은 크롤러와 같은 이벤트 루프에서 호출해야 한다.
+    """
+
+    def __init__(self):
+        self._cancelled = False
+        self._running = set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        if self._cancelled:
+            return
+        self._cancelled = True
+        for task in list(self._running):
+            task.cancel()
+
+    def raise_if_cancelled(self):
+        if self._cancelled:
+            raise CrawlCancelled()
+
+    async def run(self, awaitable):
+        self.raise_if_cancelled()
+        task = asyncio.ensure_future(awaitable)
+        self._running.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self._cancelled:
+                raise CrawlCancelled()
+            raise
+        finally:
+            self._running.discard(task)
+
+
+# --- 네트워크 요청 차단 ---
+# 크롤러는 텍스트/DOM만 읽으므로 이미지·폰트·미디어·트래커 다운로드는 낭비다.
+# 이미지 요청을 abort해도 <img>의 src 속성은 DOM에 그대로 남는다 (W컨셉 URL 추출에 필요).
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+DEFAULT_BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "googleadservices.com", "facebook.net", "facebook.com",
+    "criteo.com", "criteo.net", "appsflyer.com", "braze.com", "hotjar.com",
+    "clarity.ms", "amplitude.com", "mixpanel.com", "branch.io", "adsrvr.org",
+    "analytics.kakao.com", "wcs.naver.net", "wcs.naver.com",
+)
+# 차단한 요청은 내려받지 않으므로 크기를 알 수 없다 - 리소스 타입별 평균 크기로 추정
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 40_000,
+    "stylesheet": 20_000,
+}
+ESTIMATED_OTHER_BYTES = 5_000
+
+
+def _host_matches(host, domains):
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class RequestBlocker:
+    """BrowserContext에 page.route 정책을 걸어 불필요한 요청을 차단하고 통계를 남긴다
+
+    block_types: 차단할 리소스 타입 (image, media, font, ...)
+    deny_hosts: 항상 차단할 호스트 (하위 도메인 포함)
+    allow_hosts: 지정하면 이 호스트(하위 도메인 포함) 외의 요청은 모두 차단
+    """
+
+    def __init__(self, block_types=DEFAULT_BLOCKED_RESOURCE_TYPES, deny_hosts=DEFAULT_BLOCKED_HOSTS,
+                 allow_hosts=None):
+        self.block_types = set(block_types or ())
+        self.deny_hosts = tuple(deny_hosts or ())
+        self.allow_hosts = tuple(allow_hosts or ())
+        self.blocked = {}         # 차단 사유 -> 건수
+        self.allowed_count = 0
+        self.bytes_saved = 0      # 추정치
+
+    async def attach(self, context):
+        await context.route("**/*", self._handle)
+
+    def _block_reason(self, request):
+        host = urlparse(request.url).hostname or ""
+        if self.allow_hosts and not _host_matches(host, self.allow_hosts):
+            return "host:not-allowed"
+        if _host_matches(host, self.deny_hosts):
+            return "host:denied"
+        if request.resource_type in self.block_types:
+            return f"type:{request.resource_type}"
+        return None
+
+    async def _handle(self, route):
+        request = route.request
+        reason = self._block_reason(request)
+        if reason is None:
+            self.allowed_count += 1
+            # continue_ 대신 fallback: 뒤에 등록된 라우트(HAR 재생 등)가 있으면 그쪽으로 넘김
+            await route.fallback()
+            return
+        self.blocked[reason] = self.blocked.get(reason, 0) + 1
+        self.bytes_saved += ESTIMATED_RESOURCE_BYTES.get(request.resource_type, ESTIMATED_OTHER_BYTES)
+        await route.abort()
+
+    @property
+    def blocked_count(self):
+        return sum(self.blocked.values())
+
+    def stats(self):
+        return {
+            "blocked": self.blocked_count,
+            "allowed": self.allowed_count,
+            "by_reason": dict(self.blocked),
+            "estimated_bytes_saved": self.bytes_saved,
+        }
+
+    def summary(self):
+        reasons = ", ".join(f"{k} {v}" for k, v in sorted(self.blocked.items()))
+        return (f"요청 차단: {self.blocked_count}건 / 허용 {self.allowed_count}건, "
+                f"절약 약 {self.bytes_saved / 1024 / 1024:.1f}MB (추정) [{reasons}]")
+
+
+# --- JSON 응답 캡처 ---
+# 랭킹/베스트 목록은 API(JSON)로 내려온 뒤 렌더링되므로, 응답을 가로채 바로 파싱하면
+# 요소마다 query_selector/evaluate를 반복하는 DOM 스크래핑을 통째로 건너뛸 수 있다.
+
+class JsonCapture:
+    """url_pattern에 맞는 JSON 응답 본문을 도착 순서대로 모아둔다
+
+    페이지 이동 전에 생성해야 첫 응답을 놓치지 않는다.
+    """
+
+    def __init__(self, page, url_pattern):
+        self.pattern = re.compile(url_pattern)
+        self.payloads = []  # (도착 순번, url, 본문)
+        self._seq = 0
+        self._pending = set()
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if not self.pattern.search(response.url):
+            return
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        seq = self._seq
+        self._seq += 1
+        task = asyncio.ensure_future(self._read(seq, response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _read(self, seq, response):
+        try:
+            self.payloads.append((seq, response.url, await response.json()))
+        except Exception:
+            pass
+
+    async def settle(self, timeout=5):
+        """읽는 중인 응답 본문이 모두 도착할 때까지 대기"""
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=timeout)
+
+    def records(self, id_keys, name_keys, min_items=3):
+        """캡처한 응답 하나에서 상품 레코드(평탄화된 dict)를 순서대로 추출, id 기준 중복 제거
+
+        응답마다 id와 이름 필드를 모두 가진 dict가 가장 많은 배열을 후보로 보고,
+        여러 응답이 맞으면 후보가 가장 큰 응답 하나만 사용한다 (같으면 먼저 도착한 것).
+        응답을 이어 붙이면 순위가 실제 랭킹과 어긋나므로 합치지 않는다.
+        """
+        best = []
+        for _, _, payload in sorted(self.payloads, key=lambda p: p[0]):
+            for items in _iter_dict_lists(payload):
+                flat = [flatten_record(item) for item in items]
+                hits = [r for r in flat if pick_field(r, id_keys) and pick_field(r, name_keys)]
+                if len(hits) > len(best):
+                    best = hits
+        if len(best) < min_items:
+            return []
+        results = []
+        seen = set()
+        for record in best:
+            key = str(pick_field(record, id_keys))
+            if key not in seen:
+                seen.add(key)
+                results.append(record)
+        return results
+
+
+# 목록 응답에서 상품 URL로 쓰는 필드 후보
+JSON_URL_KEYS = ("linkUrl", "landingUrl", "productUrl", "url", "link")
+
+
+def counts_agree(json_count, dom_count, limit):
+    """JSON 목록과 DOM 상품 개수가 (요청 개수 안에서) 같은지
+
+    다르면 랭킹이 아닌 다른 목록(카테고리 메뉴, 추천 위젯 등)을 잡은 것으로 보고 DOM을 사용한다.
+    """
+    return dom_count > 0 and min(json_count, limit) == min(dom_count, limit)
+
+
+def record_url(record, product_id, dom_urls, base_url):
+    """JSON 레코드의 상품 URL - 응답의 URL 필드 → 같은 상품 ID의 DOM 링크 순 (둘 다 없으면 "")
+
+    URL을 직접 조립하지 않고, 상품 ID가 경로에 들어 있는 URL만 사용한다.
+    """
+    if product_id in (None, ""):
+        return ""
+    pattern = re.compile(rf"/{re.escape(str(product_id))}(?:[/?#_.]|$)")
+    url = str(pick_field(record, JSON_URL_KEYS))
+    if url:
+        url = urljoin(base_url, url)
+        if pattern.search(url):
+            return url
+    for dom_url in dom_urls:
+        if dom_url and pattern.search(dom_url):
+            return dom_url
+    return ""
+
+
+def _iter_dict_lists(node, depth=0):
+    if depth > 8:
+        return
+    if isinstance(node, list):
+        if node and all(isinstance(item, dict) for item in node):
+            yield node
+        for item in node:
+            yield from _iter_dict_lists(item, depth + 1)
+    elif isinstance(node, dict):
+        for value in node.values():
+            yield from _iter_dict_lists(value, depth + 1)
+
+
+def flatten_record(record, depth=2):
+    """중첩 dict의 필드를 한 단계로 펼침 (같은 이름이면 바깥쪽 값 우선)"""
+    flat = {k: v for k, v in record.items() if not isinstance(v, (dict, list))}
+    if depth > 0:
+        for value in record.values():
+            if isinstance(value, dict):
+                for k, v in flatten_record(value, depth - 1).items():
+                    flat.setdefault(k, v)
+    return flat
+
+
+def pick_field(record, keys, default=""):
+    """keys 중 처음으로 값이 있는 필드 반환"""
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def format_price(value):
+    """숫자 가격은 DOM 표기와 같은 '12,345원' 형태로 변환"""
+    if isinstance(value, (int, float)):
+        return f"{int(value):,}원"
+    return str(value or "")
@@ -0,0 +1,231 @@
+"""
+크롤링 결과 영구 저장소 (SQLite)
+실행(run) 단위와 상품 행을 로컬 SQLite 파일에 저장해 컨테이너를 재시작해도 결과가 남도록 한다.
+WAL 모드 + 배치 insert, 상품 URL / 사업자등록번호 인덱스, 오래된 실행은 보관 기간이 지나면 삭제.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# 크롤러마다 컬럼명이 달라 후보 순서대로 확인
+PRODUCT_URL_KEYS = ("상품URL", "상세페이지URL")
+BUSINESS_NUMBER_KEYS = ("사업자등록번호", "사업자번호")
+RANK_KEYS = ("순위", "랭킹")
+CATEGORY_KEY = "카테고리"  # 배치 실행은 상품 행마다 카테고리를 기록
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    request_id   TEXT PRIMARY KEY,
+    source       TEXT NOT NULL,
+    category     TEXT,
+    params       TEXT,
+    status       TEXT,
+    item_count   INTEGER NOT NULL DEFAULT 0,
+    partial      INTEGER NOT NULL DEFAULT 0,
+    crawled_at   REAL NOT NULL,
+    finished_at  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_source_category ON runs (source, category, crawled_at);
+CREATE INDEX IF NOT EXISTS idx_runs_crawled_at ON runs (crawled_at);
+
+CREATE TABLE IF NOT EXISTS products (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id       TEXT NOT NULL REFERENCES runs (request_id) ON DELETE CASCADE,
+    source           TEXT NOT NULL,
+    category         TEXT,
+    crawled_at       REAL NOT NULL,
+    rank             INTEGER,
+    product_url      TEXT,
+    business_number  TEXT,
+    data             TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_request ON products (request_id, rank);
+CREATE INDEX IF NOT EXISTS idx_products_url ON products (product_url);
+CREATE INDEX IF NOT EXISTS idx_products_business_number ON products (business_number);
+"""
+
+
+def _first(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def normalize_business_number(value):
+    """사업자등록번호는 숫자만 남겨 저장/조회 (123-45-67890 → 1234567890)"""
+    digits = re.sub(r"\D", "", str(value or ""))
+    return digits or None
+
+
+def _rank(item, fallback):
+    value = _first(item, RANK_KEYS)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return fallback
+
+
+class ResultStore:
+    """요청(request_id)별 실행과 상품 행을 저장하는 SQLite 저장소 (스레드 안전)"""
+
+    def __init__(self, path, retention_days=30, batch_size=500):
+        self.path = path
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def _conn(self):
+        # 처음 사용할 때 연결 (워커 프로세스처럼 모듈만 import하는 쪽은 DB를 열지 않음)
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(_SCHEMA)
+            self._db = conn
+        return self._db
+
+    def save_run(self, request_id, source, category, products, params=None, partial=False):
+        """실행 하나와 상품 행들을 한 트랜잭션으로 저장 (같은 request_id는 덮어씀)"""
+        now = time.time()
+        rows = []
+        for index, item in enumerate(products, start=1):
+            rows.append((
+                request_id, source, item.get(CATEGORY_KEY) or category, now, _rank(item, index),
+                _first(item, PRODUCT_URL_KEYS),
+                normalize_business_number(_first(item, BUSINESS_NUMBER_KEYS)),
+                json.dumps(item, ensure_ascii=False, default=str),
+            ))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM products WHERE request_id = ?", (request_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO runs (request_id, source, category, params, status, item_count, partial, crawled_at) "
+                    "VALUES (?, ?, ?, ?, COALESCE((SELECT status FROM runs WHERE request_id = ?), 'running'), ?, ?, ?)",
+                    (request_id, source, category, json.dumps(params or {}, ensure_ascii=False, default=str),
+                     request_id, len(rows), int(bool(partial)), now)
+                )
+                for start in range(0, len(rows), self.batch_size):
+                    self._conn.executemany(
+                        "INSERT INTO products (request_id, source, category, crawled_at, rank, product_url, business_number, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows[start:start + self.batch_size]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def mark_status(self, request_id, status):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE request_id = ?",
+                (status, time.time(), request_id)
+            )
+
+    def load_run(self, request_id):
+        """저장된 실행을 get_crawl_result와 같은 형태로 반환 (없으면 None)"""
+        with self._lock:
+            run = self._conn.execute("SELECT * FROM runs WHERE request_id = ?", (request_id,)).fetchone()
+            if run is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT data FROM products WHERE request_id = ? ORDER BY rank, id", (request_id,)
+            ).fetchall()
+        products = [json.loads(row["data"]) for row in rows]
+        data = {"products": products, "category": run["category"], "count": len(products)}
+        if run["partial"]:
+            data["partial"] = True
+        return {
+            "crawler_type": run["source"],
+            "data": data,
+            "params": json.loads(run["params"] or "{}"),
+            "status": run["status"],
+        }
+
+    def find_previous_run(self, source, category, exclude=None):
+        """같은 source + category의 가장 최근 완료(부분 결과 아님) 실행 ID (없으면 None)
+
+        배치 실행처럼 해당 카테고리 상품 행을 포함한 실행도 찾는다.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT request_id FROM runs r WHERE source = ? AND status = 'succeeded' AND partial = 0 "
+                "AND request_id != ? AND (category IS ? OR EXISTS ("
+                "SELECT 1 FROM products p WHERE p.request_id = r.request_id AND p.category IS ?)) "
+                "ORDER BY crawled_at DESC LIMIT 1",
+                (source, exclude or "", category, category)
+            ).fetchone()
+        return row["request_id"] if row else None
+
+    def list_runs(self, limit=20, source=None):
+        query = "SELECT request_id, source, category, status, item_count, partial, crawled_at, finished_at FROM runs"
+        args = []
+        if source:
+            query += " WHERE source = ?"
+            args.append(source)
+        query += " ORDER BY crawled_at DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, args).fetchall()]
+
+    def find_products(self, product_url=None, business_number=None, limit=50):
+        """상품 URL 또는 사업자등록번호로 과거 수집 행 조회 (최신순)"""
+        if product_url:
+            where, value = "product_url = ?", product_url
+        elif business_number:
+            where, value = "business_number = ?", normalize_business_number(business_number)
+        else:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT request_id, source, category, crawled_at, rank, data FROM products "
+                f"WHERE {where} ORDER BY crawled_at DESC LIMIT ?", (value, limit)
+            ).fetchall()
+        return [dict(row, data=json.loads(row["data"])) for row in rows]
+
+    def purge(self, retention_days=None):
+        """보관 기간이 지난 실행과 상품 행 삭제, 삭제한 실행 수 반환"""
+        days = self.retention_days if retention_days is None else retention_days
+        if days is None or days <= 0:
+            return 0
+        cutoff = time.time() - days * 86400
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "DELETE FROM products WHERE request_id IN (SELECT request_id FROM runs WHERE crawled_at < ?)", (cutoff,)
+                )
+                removed = self._conn.execute("DELETE FROM runs WHERE crawled_at < ?", (cutoff,)).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def stats(self):
+        with self._lock:
+            runs = self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            products = self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {"path": self.path, "runs": runs, "products": products, "db_bytes": size,
+                "retention_days": self.retention_days}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
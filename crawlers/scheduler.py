@@ -0,0 +1,303 @@
+"""
+예약 크롤링 (cron 표현식)
+설정된 크롤링(source / category / count ...)을 cron 표현식에 맞춰 대기열에 넣는다.
+- 같은 시각에 여러 예약이 겹치면 stagger 간격으로 나눠 제출 (브라우저 부하 분산)
+- 직전 실행이 아직 진행 중이면 이번 회차는 건너뜀
+- 예약과 마지막 실행 / 다음 실행 시각은 SQLite에 저장되어 재시작 후에도 유지
+  (서버가 꺼져 있던 동안 놓친 회차는 재시작 후 한 번만 실행)
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+# --- cron 표현식 ---
+# 분 시 일 월 요일 (요일: 0/7=일요일), *, 목록(,), 범위(-), 간격(/) 지원
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+_CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+
+class CronError(ValueError):
+    """잘못된 cron 표현식"""
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        expr, _, step = part.partition("/")
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(value) for value in expr.split("-", 1))
+        else:
+            start = end = int(expr)
+            if step:
+                end = high
+        step = int(step) if step else 1
+        if start < low or end > high or start > end or step < 1:
+            raise CronError(f"범위를 벗어난 값: {part}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """5필드 cron 표현식 (분 시 일 월 요일)"""
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise CronError(f"cron 표현식은 5개 필드여야 합니다: '{expression}'")
+        try:
+            parsed = [_parse_field(text, low, high) for text, (_, low, high) in zip(fields, _CRON_FIELDS)]
+        except ValueError as e:
+            raise CronError(f"잘못된 cron 표현식 '{expression}': {e}")
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        # 일/요일이 둘 다 지정되면 둘 중 하나만 맞아도 실행 (표준 cron 동작)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, dt):
+        """dt 이후(dt 제외) 처음으로 맞는 시각 (분 단위), 4년 안에 없으면 None"""
+        current = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=366 * 4)
+        while current < limit:
+            if current.month not in self.months or not self._day_matches(current):
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+            elif current.hour not in self.hours:
+                current = (current + timedelta(hours=1)).replace(minute=0)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+        return None
+
+
+# --- 예약 저장소 ---
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    name             TEXT PRIMARY KEY,
+    cron             TEXT NOT NULL,
+    crawler_type     TEXT NOT NULL,
+    params           TEXT NOT NULL,
+    enabled          INTEGER NOT NULL DEFAULT 1,
+    next_run_at      REAL,
+    last_run_at      REAL,
+    last_request_id  TEXT,
+    last_status      TEXT,
+    run_count        INTEGER NOT NULL DEFAULT 0,
+    skip_count       INTEGER NOT NULL DEFAULT 0,
+    created_at       REAL NOT NULL
+);
+"""
+
+
+def _next_run_at(cron, after=None):
+    after = datetime.fromtimestamp(after) if after else datetime.now()
+    next_time = CronExpression(cron).next_after(after)
+    return next_time.timestamp() if next_time else None
+
+
+class ScheduleStore:
+    """예약 정의와 실행 상태를 저장하는 SQLite 저장소 (스레드 안전)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def _conn(self):
+        # 처음 사용할 때 연결 (워커 프로세스처럼 모듈만 import하는 쪽은 DB를 열지 않음)
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._db = conn
+        return self._db
+
+    @staticmethod
+    def _row(row):
+        data = dict(row)
+        data["params"] = json.loads(data["params"] or "{}")
+        data["enabled"] = bool(data["enabled"])
+        return data
+
+    def upsert(self, name, cron, crawler_type, params=None, enabled=True):
+        """예약 추가/수정 (cron이 바뀌면 다음 실행 시각을 다시 계산, 실행 기록은 유지)"""
+        next_run = _next_run_at(cron)  # 잘못된 표현식이면 CronError
+        if next_run is None:
+            # 문법은 맞지만 실제로 오지 않는 날짜 (예: 2월 30일)
+            raise CronError(f"실행 시각이 없는 cron 표현식입니다: '{cron}'")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO schedules (name, cron, crawler_type, params, enabled, next_run_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET "
+                "next_run_at = CASE WHEN cron != excluded.cron OR next_run_at IS NULL "
+                "THEN excluded.next_run_at ELSE next_run_at END, "
+                "cron = excluded.cron, crawler_type = excluded.crawler_type, "
+                "params = excluded.params, enabled = excluded.enabled",
+                (name, cron, crawler_type, json.dumps(params or {}, ensure_ascii=False), int(enabled),
+                 next_run, time.time())
+            )
+        return self.get(name)
+
+    def get(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM schedules WHERE name = ?", (name,)).fetchone()
+        return self._row(row) if row else None
+
+    def list(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM schedules ORDER BY next_run_at IS NULL, next_run_at").fetchall()
+        return [self._row(row) for row in rows]
+
+    def remove(self, name):
+        with self._lock:
+            return self._conn.execute("DELETE FROM schedules WHERE name = ?", (name,)).rowcount > 0
+
+    def due(self, now):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM schedules WHERE enabled = 1 AND next_run_at IS NOT NULL AND next_run_at <= ? "
+                "ORDER BY next_run_at, name", (now,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def record(self, name, next_run_at, request_id=None, status=None, skipped=False):
+        """회차 처리 결과 기록 (제출했으면 request_id, 건너뛰었으면 skipped)"""
+        with self._lock:
+            if skipped:
+                self._conn.execute(
+                    "UPDATE schedules SET next_run_at = ?, skip_count = skip_count + 1, last_status = ? WHERE name = ?",
+                    (next_run_at, status, name)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE schedules SET next_run_at = ?, last_run_at = ?, last_request_id = ?, last_status = ?, "
+                    "run_count = run_count + 1 WHERE name = ?",
+                    (next_run_at, time.time(), request_id, status, name)
+                )
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# --- 스케줄러 ---
+
+class CrawlScheduler:
+    """예약 시각이 된 크롤링을 대기열에 제출하는 백그라운드 루프
+
+    - submit(crawler_type, params) → request_id: 실제 제출 (대기열이 가득 차면 예외)
+    - is_active(request_id) → bool: 직전 실행이 아직 진행 중인지
+    - stagger: 제출 사이 최소 간격(초), 같은 시각에 몰린 예약은 이 간격으로 나눠 제출
+    - tick: 예약 확인 주기(초)
+    """
+
+    def __init__(self, store, submit, is_active, stagger=60, tick=15, log=print):
+        self.store = store
+        self.submit = submit
+        self.is_active = is_active
+        self.stagger = stagger
+        self.tick = tick
+        self.log = log
+        self._last_submit = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                due = await loop.run_in_executor(None, self.store.due, time.time())
+                for schedule in due:
+                    # 직전 제출과 stagger 간격을 두고 하나씩 제출
+                    wait = self._last_submit + self.stagger - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    await self.fire(schedule)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.log(f"Scheduler error: {e}")
+            await asyncio.sleep(self.tick)
+
+    async def fire(self, schedule):
+        """예약 한 회차 처리 - 진행 중이면 건너뛰고, 아니면 제출 (다음 실행 시각은 지금 기준으로 계산)
+
+        대기열 제출은 이벤트 루프 스레드에서, 저장소(SQLite) 기록은 executor 스레드에서 한다.
+        """
+        loop = asyncio.get_running_loop()
+
+        def record(*args, **kwargs):
+            return loop.run_in_executor(None, lambda: self.store.record(*args, **kwargs))
+
+        name = schedule["name"]
+        next_run = _next_run_at(schedule["cron"])
+        previous = schedule.get("last_request_id")
+        if previous and self.is_active(previous):
+            await record(name, next_run, status="skipped (previous run active)", skipped=True)
+            self.log(f"Schedule '{name}': previous run {previous} still in progress, skipped")
+            return None
+        try:
+            request_id = self.submit(schedule["crawler_type"], dict(schedule["params"], schedule=name))
+        except Exception as e:
+            await record(name, next_run, status=f"submit failed: {e}", skipped=True)
+            self.log(f"Schedule '{name}': submit failed: {e}")
+            return None
+        self._last_submit = time.monotonic()
+        await record(name, next_run, request_id=request_id, status="submitted")
+        self.log(f"Schedule '{name}': submitted {request_id}")
+        return request_id
+
+    def load_file(self, path):
+        """JSON 파일의 예약 목록을 저장소에 반영 (이름 기준 추가/수정)
+
+        [{"name": "musinsa-daily", "cron": "0 9 * * *", "crawler_type": "musinsa",
+          "params": {"category": "전체", "count": 100}, "enabled": true}, ...]
+        """
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        for entry in entries:
+            self.store.upsert(entry["name"], entry["cron"], entry["crawler_type"],
+                              entry.get("params"), entry.get("enabled", True))
+        return len(entries)
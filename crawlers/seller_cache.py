@@ -0,0 +1,364 @@
+"""
+판매자 정보 캐시 (SQLite, 실행 간 공유)
+판매자 정보(상호, 사업자번호, 연락처, 주소)는 거의 바뀌지 않으므로 상세 페이지에서 한 번 읽은 값을
+정규화한 상품 URL(및 브랜드/판매자 ID가 있으면 그 ID)로 저장해두고 TTL 동안 재사용한다.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seller_cache (
+    source      TEXT NOT NULL,
+    cache_key   TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (source, cache_key)
+);
+CREATE INDEX IF NOT EXISTS idx_seller_cache_updated ON seller_cache (updated_at);
+"""
+
+# 크롤러별 판매자 정보 컬럼 (이전 실행 결과에서 판매자 정보만 꺼낼 때 사용)
+SELLER_FIELDS = {
+    "musinsa": ("상호", "사업자번호", "연락처", "영업소재지"),
+    "wconcept": ("판매자명", "사업자등록번호", "통신판매업신고", "대표자명", "주소", "연락처", "이메일"),
+    "29cm": ("판매자 상호", "판매자 주소", "연락처", "사업자등록번호"),
+}
+# 목록에서 상품 정보를 못 얻을 수 있는 크롤러(29CM DOM 링크 목록)는 이전 실행의 상품 정보도 함께 재사용
+LISTING_FIELDS = {
+    "29cm": ("브랜드명", "상품명", "가격"),
+}
+
+# 무신사 구 상품 URL(/app/goods/123)은 현재 URL(/products/123)과 같은 상품
+_MUSINSA_GOODS = re.compile(r"^/app/goods/(\d+)")
+
+
+def normalize_product_url(url):
+    """캐시 키용 URL 정규화 (쿼리/프래그먼트, www., 끝 슬래시 제거)"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    if host.endswith("musinsa.com"):
+        path = _MUSINSA_GOODS.sub(r"/products/\1", path)
+    return f"{host}{path}"
+
+
+def same_seller(a, b):
+    """사업자번호가 둘 다 있으면 숫자만 비교, 없으면 전체 필드 비교"""
+    def number(info):
+        for key, value in info.items():
+            if "사업자" in key and "번호" in key:
+                return re.sub(r"\D", "", str(value or ""))
+        return ""
+    if number(a) and number(b):
+        return number(a) == number(b)
+    return {k: str(v).strip() for k, v in a.items()} == {k: str(v).strip() for k, v in b.items()}
+
+
+def has_seller_info(info):
+    """빈 값뿐인 결과(수집 실패)는 캐시하지 않음"""
+    return bool(info) and any(str(value).strip() for value in info.values())
+
+
+class SellerCache:
+    """source(musinsa / wconcept / 29cm)별 판매자 정보 캐시 (스레드 안전)
+
+    - ttl: 저장 후 ttl초가 지난 항목은 조회되지 않고 purge 때 삭제 (0 이하이면 캐시 사용 안 함)
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    @property
+    def _conn(self):
+        # 처음 사용할 때 연결 (result_store와 같은 방식)
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._db = conn
+        return self._db
+
+    def get(self, source, key):
+        if not self.enabled or not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM seller_cache WHERE source = ? AND cache_key = ? AND updated_at >= ?",
+                (source, key, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, source, keys, info):
+        if not self.enabled:
+            return
+        keys = [key for key in keys if key]
+        if not keys:
+            return
+        data = json.dumps(info, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO seller_cache (source, cache_key, data, updated_at) VALUES (?, ?, ?, ?)",
+                [(source, key, data, now) for key in keys]
+            )
+
+    def purge(self):
+        """TTL이 지난 항목 삭제, 삭제한 개수 반환"""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM seller_cache WHERE updated_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            rows = self._conn.execute("SELECT source, COUNT(*) FROM seller_cache GROUP BY source").fetchall()
+        return {"enabled": True, "path": self.path, "ttl_sec": self.ttl, "entries": dict(rows)}
+
+    def session(self, source, log=None, force_refresh=False, brand_dedup=True, verify_every=0):
+        return SellerCacheSession(self, source, log, force_refresh, brand_dedup, verify_every)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class SellerCacheSession:
+    """크롤링 한 번에서 쓰는 판매자 정보 창구 (캐시 적중/미스 + 브랜드 중복 제거 집계, 로그)
+
+    크롤러에는 이 객체를 seller_cache로 넘긴다.
+    - resolve(url, fetch, brand, brand_id): 캐시 → 같은 실행의 브랜드 → fetch() 순으로 판매자 정보를 구함
+    - lookup(url, brand_id) / store(url, info, brand_id): 영구 캐시 직접 조회/저장
+      (SQLite 접근은 executor 스레드에서 - 조회는 await, 저장은 대기열에 넣고 바로 반환)
+    - record_fetch(url, info, brand_id): resolve 없이 상세 페이지를 연 경우 집계 + 저장
+    - seed(products, url_keys): 이전 실행 결과의 판매자 정보를 상품 URL 기준으로 미리 채움 (diff 모드)
+    - force_refresh: 영구 캐시 조회는 항상 미스로 처리하고 새로 읽은 값으로 캐시를 갱신
+    - brand_dedup: 같은 실행에서 브랜드의 첫 상품 판매자 정보를 나머지 상품에 재사용
+      (끄면 영구 캐시도 상품 URL 키로만 조회/저장)
+    - verify_every: 브랜드 재사용 N번마다 한 번은 상세 페이지를 실제로 열어 비교 (0이면 검증 안 함)
+    """
+
+    def __init__(self, cache, source, log=None, force_refresh=False, brand_dedup=True, verify_every=0):
+        self.cache = cache
+        self.source = source
+        self.log = log or (lambda msg: None)
+        self.force_refresh = force_refresh
+        self.brand_dedup = brand_dedup
+        self.verify_every = max(0, int(verify_every or 0))
+        self.hits = 0
+        self.brand_hits = 0
+        self.misses = 0
+        self.fetched = 0
+        self.brand_reused = 0
+        self.brand_verified = 0
+        self.brand_mismatches = 0
+        self._brands = {}  # 브랜드 키 -> Future(판매자 정보, 첫 상품 수집이 끝나면 채워짐)
+        self._multi_seller = set()  # 검증에서 판매자가 달랐던 브랜드 (이후 재사용 안 함)
+        self._seeded = {}  # 정규화 URL -> 이전 실행의 판매자 정보
+        self.previous_hits = 0
+        self._pending = []  # 아직 DB에 쓰지 않은 (캐시 키 목록, 판매자 정보)
+        self._writer = None  # 대기열을 기록 중인 executor 작업
+
+    def _keys(self, url, brand_id=None):
+        keys = []
+        if url:
+            keys.append("url:" + normalize_product_url(url))
+        # 브랜드/판매자 ID 키는 다른 상품의 판매자 정보를 재사용하는 것이므로 brand_dedup일 때만 읽고 씀
+        if brand_id and self.brand_dedup:
+            keys.append(f"brand:{brand_id}")
+        return keys
+
+    @staticmethod
+    def _brand_key(brand=None, brand_id=None):
+        if brand_id:
+            return f"id:{brand_id}"
+        name = re.sub(r"\s+", "", str(brand or "")).lower()
+        return f"name:{name}" if name else None
+
+    def _get(self, url, brand_id):
+        # 상품 URL로 먼저 찾고, 없으면 같은 브랜드/판매자 ID로 저장된 값 사용 → (판매자 정보, 브랜드 ID로 찾았는지)
+        for key in self._keys(url, brand_id):
+            info = self.cache.get(self.source, key)
+            if info is not None:
+                return info, key.startswith("brand:")
+        return None, False
+
+    async def lookup(self, url, brand_id=None):
+        if not self.cache.enabled or self.force_refresh:
+            self.misses += 1
+            return None
+        info = None
+        try:
+            info, by_brand = await asyncio.get_running_loop().run_in_executor(None, self._get, url, brand_id)
+            if by_brand:
+                self.brand_hits += 1
+        except Exception as e:
+            self.log(f"판매자 캐시 조회 오류: {e}")
+        if info is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.log(f"  → 판매자 캐시 적중: {url}")
+        return info
+
+    def store(self, url, info, brand_id=None):
+        if not self.cache.enabled or not has_seller_info(info):
+            return
+        self._pending.append((self._keys(url, brand_id), info))
+        self._schedule_write()
+
+    def _schedule_write(self):
+        if self._writer is not None or not self._pending:
+            return  # 기록 중인 작업이 끝나면 _write_done에서 이어서 기록
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖에서 호출되면 바로 기록
+            self._write_pending()
+            return
+        self._writer = loop.run_in_executor(None, self._write_pending)
+        self._writer.add_done_callback(self._write_done)
+
+    def _write_pending(self):
+        while self._pending:
+            keys, info = self._pending.pop(0)
+            try:
+                self.cache.put(self.source, keys, info)
+            except Exception as e:
+                self.log(f"판매자 캐시 저장 오류: {e}")
+
+    def _write_done(self, future):
+        # 이벤트 루프 스레드에서 호출 - 기록 스레드가 끝난 뒤에 들어온 항목이 있으면 다시 기록
+        self._writer = None
+        self._schedule_write()
+
+    def record_fetch(self, url, info, brand_id=None):
+        """상세 페이지에서 새로 읽은 판매자 정보를 집계하고 캐시에 저장 (resolve를 거치지 않은 수집용)"""
+        self.fetched += 1
+        self.store(url, info, brand_id)
+
+    def seed(self, products, url_keys):
+        """이전 실행의 상품 행에서 판매자 정보(LISTING_FIELDS가 있으면 상품 정보도)를 꺼내 이번 실행에서 재사용 (force_refresh면 무시)"""
+        fields = SELLER_FIELDS.get(self.source, ())
+        listing = LISTING_FIELDS.get(self.source, ())
+        for item in products or ():
+            url = next((item[key] for key in url_keys if item.get(key)), None)
+            info = {key: item.get(key, "") for key in fields}
+            if url and has_seller_info(info):
+                info.update((key, item[key]) for key in listing if item.get(key))
+                self._seeded[normalize_product_url(url)] = info
+        return len(self._seeded)
+
+    async def _fetch(self, url, fetch, brand_id):
+        info = await fetch()
+        self.record_fetch(url, info, brand_id)
+        return info
+
+    async def resolve(self, url, fetch, brand=None, brand_id=None):
+        """판매자 정보 반환 (fetch: 상세 페이지를 열어 판매자 정보를 읽는 코루틴 함수)
+
+        같은 브랜드 상품이 동시에 들어오면 첫 상품의 수집이 끝날 때까지 기다렸다가 그 결과를 재사용한다.
+        첫 상품 수집이 실패/취소되면 기다리던 상품 중 하나가 다시 수집한다.
+        """
+        if self._seeded and not self.force_refresh:
+            previous = self._seeded.get(normalize_product_url(url))
+            if previous is not None:
+                self.previous_hits += 1
+                return dict(previous)
+        cached = await self.lookup(url, brand_id)
+        if cached is not None:
+            return cached
+        key = self._brand_key(brand, brand_id) if self.brand_dedup else None
+        if not key:
+            return await self._fetch(url, fetch, brand_id)
+
+        while key not in self._multi_seller:
+            pending = self._brands.get(key)
+            if pending is None:
+                # 이 브랜드의 첫 상품 - 직접 수집하고 결과를 공유
+                pending = asyncio.get_running_loop().create_future()
+                self._brands[key] = pending
+                info = None
+                try:
+                    info = await self._fetch(url, fetch, brand_id)
+                    return info
+                finally:
+                    if not has_seller_info(info):
+                        # 실패/취소된 결과는 공유하지 않고, 기다리던 상품 중 하나가 다시 첫 상품 역할을 함
+                        self._brands.pop(key, None)
+                        info = None
+                    pending.set_result(info)
+            shared = await pending
+            if shared is not None:
+                break
+        if key in self._multi_seller:
+            return await self._fetch(url, fetch, brand_id)
+
+        self.brand_reused += 1
+        if self.verify_every and self.brand_reused % self.verify_every == 0:
+            info = await self._fetch(url, fetch, brand_id)
+            self.brand_verified += 1
+            if has_seller_info(info) and not same_seller(shared, info):
+                self.brand_mismatches += 1
+                self._multi_seller.add(key)
+                self.log(f"  → 브랜드 '{brand or brand_id}' 판매자가 상품마다 다름, 이후 재사용 중단")
+            return info
+        self.log(f"  → 같은 브랜드 판매자 정보 재사용: {brand or brand_id}")
+        return dict(shared)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "brand_hits": self.brand_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "force_refresh": self.force_refresh,
+            "detail_fetches": self.fetched,
+            "brand_reused": self.brand_reused,
+            "brand_verified": self.brand_verified,
+            "brand_mismatches": self.brand_mismatches,
+            "previous_hits": self.previous_hits,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        if self.cache.enabled:
+            refresh = " (강제 갱신)" if self.force_refresh else ""
+            line = (f"판매자 캐시{refresh}: 적중 {stats['hits']}개 (브랜드 ID {stats['brand_hits']}개), "
+                    f"미스 {stats['misses']}개, 적중률 {stats['hit_rate'] * 100:.0f}%")
+        else:
+            line = "판매자 캐시: 사용 안 함"
+        if self.brand_dedup:
+            line += (f" / 브랜드 재사용 {stats['brand_reused']}개 (검증 {stats['brand_verified']}개, "
+                     f"불일치 {stats['brand_mismatches']}개)")
+        if self._seeded:
+            line += f" / 이전 실행 재사용 {stats['previous_hits']}개"
+        return line + f" / 상세 페이지 수집 {stats['detail_fetches']}개"
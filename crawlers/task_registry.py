@@ -0,0 +1,249 @@
+"""
+크롤링 작업 레지스트리
+요청(request_id)별 로그 큐 / 중지 신호 / 결과 / 작업 정보를 한 곳에서 관리하고,
+TTL 만료 · 최대 개수(LRU) · 결과 용량 상한으로 오래된 항목을 정리한다.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+# 작업 상태 전이: queued → running → (stopping →) succeeded / failed / cancelled
+TASK_TRANSITIONS = {
+    None: ("queued",),
+    "queued": ("running", "cancelled", "failed"),
+    "running": ("stopping", "succeeded", "failed", "cancelled"),
+    "stopping": ("succeeded", "failed", "cancelled"),
+}
+# 진행 중인 작업은 TTL/LRU 정리 대상에서 제외
+ACTIVE_STATUSES = ("queued", "running", "stopping")
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+def estimate_bytes(data):
+    """결과 데이터의 대략적인 크기 (UTF-8 JSON 직렬화 기준)"""
+    if data is None:
+        return 0
+    try:
+        return len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(data).encode("utf-8"))
+
+
+class TaskEntry:
+    def __init__(self):
+        self.log_queue = queue.Queue()
+        self.stopped = False
+        self.info = {}
+        self.result = None
+        self.result_bytes = 0
+        self.items = []  # 수집되는 대로 쌓이는 부분 결과 (도착 순서)
+        self.items_bytes = 0
+        self.created = time.time()
+        self.last_access = time.monotonic()
+
+    def is_active(self):
+        return self.info.get("status") in ACTIVE_STATUSES
+
+
+class TaskRegistry:
+    """요청별 작업 상태 저장소 (스레드 안전)
+
+    - ttl: 마지막 접근 후 ttl초가 지난 (진행 중이 아닌) 항목은 sweep 때 삭제
+    - max_entries: 초과 시 가장 오래 접근하지 않은 항목부터 삭제 (LRU)
+    - max_result_bytes: 보관 중인 결과(최종 + 부분 결과) 총 용량 상한, 초과 시 LRU 순으로 삭제
+    """
+
+    def __init__(self, ttl=3600, max_entries=200, max_result_bytes=200 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_result_bytes = max_result_bytes
+        self._entries = OrderedDict()  # request_id -> TaskEntry (앞쪽일수록 오래 접근 안 함)
+        self._lock = threading.Lock()
+        self.result_bytes = 0
+        self.evicted = {"ttl": 0, "lru": 0, "bytes": 0}
+
+    # --- 내부 ---
+
+    def _touch(self, request_id, create=True):
+        entry = self._entries.get(request_id)
+        if entry is None:
+            if not create:
+                return None
+            # 새 항목이 바로 밀려나지 않도록 한 자리 비워두고 추가
+            self._enforce_limits(reserve=1)
+            entry = TaskEntry()
+            self._entries[request_id] = entry
+        else:
+            self._entries.move_to_end(request_id)
+        entry.last_access = time.monotonic()
+        return entry
+
+    def _drop(self, request_id, reason=None):
+        entry = self._entries.pop(request_id, None)
+        if entry is None:
+            return
+        self.result_bytes -= entry.result_bytes + entry.items_bytes
+        if reason:
+            self.evicted[reason] += 1
+
+    def _lru_candidates(self):
+        return [rid for rid, entry in self._entries.items() if not entry.is_active()]
+
+    def _enforce_limits(self, reserve=0):
+        limit = max(self.max_entries - reserve, 0)
+        if len(self._entries) > limit:
+            for rid in self._lru_candidates():
+                if len(self._entries) <= limit:
+                    break
+                self._drop(rid, "lru")
+        if self.result_bytes > self.max_result_bytes:
+            for rid in self._lru_candidates():
+                if self.result_bytes <= self.max_result_bytes:
+                    break
+                if self._entries[rid].result_bytes or self._entries[rid].items_bytes:
+                    self._drop(rid, "bytes")
+
+    # --- 로그 큐 / 중지 신호 ---
+
+    def log_queue(self, request_id):
+        with self._lock:
+            return self._touch(request_id).log_queue
+
+    def set_stop(self, request_id):
+        with self._lock:
+            self._touch(request_id).stopped = True
+
+    def is_stopped(self, request_id):
+        with self._lock:
+            entry = self._entries.get(request_id)
+            return entry.stopped if entry else False
+
+    # --- 작업 정보 (app.py의 상태 표시용) ---
+
+    def set_info(self, request_id, **fields):
+        with self._lock:
+            self._touch(request_id).info.update(fields)
+
+    def transition(self, request_id, status, **fields):
+        """허용된 상태 전이만 반영하고 시각/소요 시간을 기록, 전이 여부 반환"""
+        with self._lock:
+            info = self._touch(request_id).info
+            current = info.get("status")
+            if status not in TASK_TRANSITIONS.get(current, ()):
+                return False
+            now = time.time()
+            info["status"] = status
+            if status == "queued":
+                info["queued_at"] = now
+            elif status == "running":
+                info["started_at"] = now
+                if "queued_at" in info:
+                    info["queue_wait_sec"] = round(now - info["queued_at"], 3)
+            elif status == "stopping":
+                info["stop_requested_at"] = now
+            elif status in FINAL_STATUSES:
+                info["finished_at"] = now
+                if "started_at" in info:
+                    info["duration_sec"] = round(now - info["started_at"], 3)
+            info.update(fields)
+            return True
+
+    def info(self, request_id):
+        with self._lock:
+            entry = self._touch(request_id, create=False)
+            return dict(entry.info) if entry else {}
+
+    def exists(self, request_id):
+        with self._lock:
+            return request_id in self._entries
+
+    # --- 결과 ---
+
+    def store_result(self, request_id, data):
+        size = estimate_bytes(data)
+        with self._lock:
+            entry = self._touch(request_id)
+            self.result_bytes += size - entry.result_bytes
+            entry.result = data
+            entry.result_bytes = size
+            self._enforce_limits()
+
+    def get_result(self, request_id):
+        with self._lock:
+            entry = self._touch(request_id, create=False)
+            return entry.result if entry else None
+
+    def clear_result(self, request_id):
+        with self._lock:
+            entry = self._entries.get(request_id)
+            if entry:
+                self.result_bytes -= entry.result_bytes
+                entry.result = None
+                entry.result_bytes = 0
+
+    # --- 부분 결과 (수집되는 대로 추가, 커서로 조회) ---
+
+    def append_item(self, request_id, item):
+        """부분 결과 하나를 추가하고 그 위치(커서)를 반환"""
+        size = estimate_bytes(item)
+        with self._lock:
+            entry = self._touch(request_id)
+            entry.items.append(item)
+            entry.items_bytes += size
+            self.result_bytes += size
+            return len(entry.items) - 1
+
+    def get_items(self, request_id, cursor=0, limit=None):
+        """cursor 위치부터 최대 limit개의 부분 결과와 지금까지의 총 개수 반환"""
+        with self._lock:
+            entry = self._touch(request_id, create=False)
+            if entry is None:
+                return [], 0
+            cursor = max(0, cursor)
+            end = len(entry.items) if limit is None else cursor + max(0, limit)
+            return entry.items[cursor:end], len(entry.items)
+
+    def remove(self, request_id):
+        with self._lock:
+            self._drop(request_id)
+
+    # --- 정리 ---
+
+    def sweep(self):
+        """TTL이 지난 항목 삭제 후 상한 재적용, 삭제한 개수 반환"""
+        with self._lock:
+            before = len(self._entries)
+            deadline = time.monotonic() - self.ttl
+            for rid in self._lru_candidates():
+                if self._entries[rid].last_access < deadline:
+                    self._drop(rid, "ttl")
+            self._enforce_limits()
+            return before - len(self._entries)
+
+    async def run_sweeper(self, interval=60):
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.sweep()
+            if removed:
+                print(f"Task registry: {removed} expired task(s) removed", flush=True)
+
+    def stats(self):
+        with self._lock:
+            active = sum(1 for entry in self._entries.values() if entry.is_active())
+            with_result = sum(1 for entry in self._entries.values() if entry.result is not None or entry.items)
+            pending_logs = sum(entry.log_queue.qsize() for entry in self._entries.values())
+            return {
+                "entries": len(self._entries),
+                "active": active,
+                "with_result": with_result,
+                "pending_log_lines": pending_logs,
+                "result_bytes": self.result_bytes,
+                "max_entries": self.max_entries,
+                "max_result_bytes": self.max_result_bytes,
+                "ttl_sec": self.ttl,
+                "evicted": dict(self.evicted),
+            }
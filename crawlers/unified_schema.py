@@ -0,0 +1,98 @@
+"""
+사이트 통합 크롤링 결과 정리
+무신사 / W컨셉 / 29CM은 컬럼명이 서로 달라(브랜드 vs 브랜드명, 사업자번호 vs 사업자등록번호,
+영업소재지 vs 주소 등) 하나의 컬럼 구성으로 맞추고, 판매자는 사업자등록번호 기준으로 사이트를 넘어 합친다.
+"""
+
+from result_store import normalize_business_number
+
+SOURCE_LABELS = {"musinsa": "무신사", "wconcept": "W컨셉", "29cm": "29CM"}
+
+# 통합 컬럼 → 사이트별 원래 컬럼 후보 (앞에서부터 값이 있는 것을 사용)
+COLUMN_ALIASES = {
+    "카테고리": ("카테고리",),
+    "순위": ("순위", "랭킹"),
+    "브랜드": ("브랜드", "브랜드명"),
+    "상품명": ("상품명",),
+    "가격": ("가격",),
+    "할인율": ("할인율",),
+    "리뷰수": ("리뷰수",),
+    "좋아요수": ("좋아요수",),
+    "상호": ("상호", "판매자명", "판매자 상호"),
+    "대표자명": ("대표자명",),
+    "사업자등록번호": ("사업자등록번호", "사업자번호"),
+    "통신판매업신고": ("통신판매업신고",),
+    "주소": ("주소", "영업소재지", "판매자 주소"),
+    "연락처": ("연락처",),
+    "이메일": ("이메일",),
+    "상품URL": ("상품URL", "상세페이지URL"),
+}
+UNIFIED_COLUMNS = ("사이트",) + tuple(COLUMN_ALIASES)
+
+# 판매자 목록에 합치는 필드
+SELLER_COLUMNS = ("상호", "대표자명", "통신판매업신고", "주소", "연락처", "이메일")
+
+# 스크래핑 실패 시 들어가는 자리표시 값은 빈 값으로 취급
+_EMPTY_VALUES = ("", "수집 실패", "URL 수집 실패", "정보 없음")
+
+
+def _pick(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if value is not None and str(value).strip() not in _EMPTY_VALUES:
+            return value
+    return ""
+
+
+def normalize_product(source, item):
+    """사이트별 상품 행을 통합 컬럼 구성으로 변환 (없는 컬럼은 빈 값)"""
+    row = {"사이트": SOURCE_LABELS.get(source, source)}
+    for column, keys in COLUMN_ALIASES.items():
+        row[column] = _pick(item, keys)
+    number = normalize_business_number(row["사업자등록번호"])
+    if number and len(number) == 10:
+        row["사업자등록번호"] = f"{number[:3]}-{number[3:5]}-{number[5:]}"
+    return row
+
+
+def dedupe_sellers(rows):
+    """사업자등록번호가 같은 판매자를 사이트를 넘어 하나로 합친 목록 (상품 수 많은 순)
+
+    필드는 먼저 나온 값을 쓰고 비어 있으면 다른 사이트 값으로 채운다.
+    사업자등록번호가 없는 행은 합칠 기준이 없어 제외한다.
+    """
+    sellers = {}
+    for row in rows:
+        number = normalize_business_number(row.get("사업자등록번호"))
+        if not number:
+            continue
+        seller = sellers.get(number)
+        if seller is None:
+            seller = sellers[number] = {"사업자등록번호": row["사업자등록번호"], "_sites": [], "_brands": [], "상품수": 0}
+            for column in SELLER_COLUMNS:
+                seller[column] = ""
+        for column in SELLER_COLUMNS:
+            if not seller[column] and row.get(column):
+                seller[column] = row[column]
+        if row["사이트"] not in seller["_sites"]:
+            seller["_sites"].append(row["사이트"])
+        if row.get("브랜드") and row["브랜드"] not in seller["_brands"]:
+            seller["_brands"].append(row["브랜드"])
+        seller["상품수"] += 1
+
+    merged = []
+    for seller in sellers.values():
+        row = {"사업자등록번호": seller["사업자등록번호"]}
+        row.update((column, seller[column]) for column in SELLER_COLUMNS)
+        row["브랜드"] = ", ".join(seller["_brands"])
+        row["사이트"] = ", ".join(seller["_sites"])
+        row["사이트수"] = len(seller["_sites"])
+        row["상품수"] = seller["상품수"]
+        merged.append(row)
+    merged.sort(key=lambda seller: (-seller["사이트수"], -seller["상품수"]))
+    return merged
+
+
+def summary_line(rows, sellers):
+    shared = sum(1 for seller in sellers if seller["사이트수"] > 1)
+    return f"통합 결과: 상품 {len(rows)}개, 판매자 {len(sellers)}곳 (여러 사이트 입점 {shared}곳)"
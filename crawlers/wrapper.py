@@ -10,51 +10,406 @@ import threading
 import queue
 import time
 import importlib.util
+from contextlib import asynccontextmanager
 from datetime import datetime
+from playwright.async_api import async_playwright
 
 # --- 경로 설정 ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MUSINSA_DIR = os.path.join(BASE_DIR, "musinsa best new")
 WCONCEPT_DIR = os.path.join(BASE_DIR, "w concept best")
 _29CM_DIR = os.path.join(BASE_DIR, "crawlers", "29cm")
+CRAWLERS_DIR = os.path.join(BASE_DIR, "crawlers")
 
+sys.path.append(CRAWLERS_DIR)
 sys.path.append(MUSINSA_DIR)
 sys.path.append(WCONCEPT_DIR)
 sys.path.append(_29CM_DIR)
 
+from page_utils import (
+    HostRateLimiter, RequestBlocker, CancelToken, DEFAULT_BLOCKED_RESOURCE_TYPES, DEFAULT_BLOCKED_HOSTS
+)
+from task_registry import TaskRegistry, ACTIVE_STATUSES, FINAL_STATUSES
+from job_queue import JobQueue, QueueFullError
+from result_store import ResultStore, PRODUCT_URL_KEYS, CATEGORY_KEY
+from seller_cache import SellerCache
+from crawl_diff import rank_changes, summary_line
+import unified_schema
+from scheduler import ScheduleStore, CrawlScheduler, CronError
+
 
 # --- Global State ---
-log_queues = {}
-stop_signals = {}
-log_queues_lock = threading.Lock()
-stop_signals_lock = threading.Lock()
+# 요청별 로그 큐 / 중지 신호 / 결과 / 작업 정보는 TTL·LRU로 정리되는 레지스트리 하나에 보관
+TASK_TTL = int(os.environ.get("CRAWLER_TASK_TTL", "3600"))  # 초
+TASK_MAX_ENTRIES = int(os.environ.get("CRAWLER_TASK_MAX_ENTRIES", "200"))
+TASK_MAX_RESULT_BYTES = int(os.environ.get("CRAWLER_TASK_MAX_RESULT_MB", "200")) * 1024 * 1024
+TASK_SWEEP_INTERVAL = int(os.environ.get("CRAWLER_TASK_SWEEP_INTERVAL", "60"))  # 초
+
+task_registry = TaskRegistry(ttl=TASK_TTL, max_entries=TASK_MAX_ENTRIES, max_result_bytes=TASK_MAX_RESULT_BYTES)
+
+# 완료된 결과는 SQLite에도 저장 (서버 재시작 후에도 조회 가능, 레지스트리는 최근 결과 캐시 역할)
+RESULT_DB_PATH = os.environ.get("CRAWLER_RESULT_DB", os.path.join(BASE_DIR, "results", "crawl_results.db"))
+RESULT_RETENTION_DAYS = int(os.environ.get("CRAWLER_RESULT_RETENTION_DAYS", "30"))  # 0이면 삭제하지 않음
+RESULT_PURGE_INTERVAL = int(os.environ.get("CRAWLER_RESULT_PURGE_INTERVAL", "3600"))  # 초
+
+result_store = ResultStore(RESULT_DB_PATH, retention_days=RESULT_RETENTION_DAYS)
+
+# 판매자 정보 캐시 (상품 URL / 브랜드 ID 기준, 실행 간 공유) - TTL 0이면 사용 안 함
+SELLER_CACHE_PATH = os.environ.get("CRAWLER_SELLER_CACHE_DB", os.path.join(BASE_DIR, "results", "seller_cache.db"))
+SELLER_CACHE_TTL = int(float(os.environ.get("CRAWLER_SELLER_CACHE_TTL_HOURS", "168")) * 3600)
+
+seller_cache = SellerCache(SELLER_CACHE_PATH, ttl=SELLER_CACHE_TTL)
+
+# 같은 실행 안에서 브랜드별 판매자 정보 재사용 시, 재사용 N번마다 1번은 상세 페이지로 검증 (0이면 검증 안 함)
+BRAND_VERIFY_EVERY = int(os.environ.get("CRAWLER_BRAND_VERIFY_EVERY", "0"))
+
+def _verify_every(value):
+    return BRAND_VERIFY_EVERY if value is None else max(0, int(value))
+
+# 프로세스 워커 모드용 채널 (부모: 중지 플래그 공유, 워커: 로그/상태/결과 전달) - 아래 워커 섹션 참고
+_worker_events = None
+_worker_stop_flags = None
 
 def get_log_queue(request_id):
-    with log_queues_lock:
-        if request_id not in log_queues:
-            log_queues[request_id] = queue.Queue()
-        return log_queues[request_id]
+    return task_registry.log_queue(request_id)
 
 def clear_log_queue(request_id):
-    with log_queues_lock:
-        if request_id in log_queues:
-            del log_queues[request_id]
+    task_registry.remove(request_id)
 
 def log_to_queue(request_id, msg):
     try:
-        q = get_log_queue(request_id)
         timestamp = datetime.now().strftime("%H:%M:%S")
-        q.put(f"[{timestamp}] {msg}")
+        line = f"[{timestamp}] {msg}"
+        # 워커 프로세스 안에서는 부모(API 프로세스)로 전달
+        if _worker_events is not None:
+            _worker_events.put(("log", request_id, line))
+            return
+        _deliver_log(request_id, line)
     except:
         pass
 
+# 통합 실행의 하위 작업 request_id -> (부모 request_id, 사이트) - 하위 작업 로그를 부모 스트림에도 전달
+_log_parents = {}
+
+def _deliver_log(request_id, line):
+    # 스트림 구독자가 있으면 바로 전달, 없으면 큐에 쌓아둠 (폴링/나중에 연결한 스트림용)
+    if not _publish(request_id, ("log", line)):
+        get_log_queue(request_id).put(line)
+    parent = _log_parents.get(request_id)
+    if parent:
+        parent_id, label = parent
+        _deliver_log(parent_id, f"[{label}] {line}")
+
+# --- 실시간 로그 스트림 (SSE) 구독 ---
+# 구독자마다 자신의 이벤트 루프와 asyncio.Queue를 등록하고,
+# log_to_queue / publish_status가 어느 스레드에서 호출되든 call_soon_threadsafe로 밀어준다.
+log_subscribers = {}  # request_id -> [(loop, asyncio.Queue, 받을 이벤트 종류)]
+log_subscribers_lock = threading.Lock()
+
+def subscribe_logs(request_id, kinds=("log", "status")):
+    """kinds: 받을 이벤트 종류 ("log", "status", "item")"""
+    loop = asyncio.get_running_loop()
+    q = asyncio.Queue()
+    with log_subscribers_lock:
+        log_subscribers.setdefault(request_id, []).append((loop, q, tuple(kinds)))
+    return q
+
+def unsubscribe_logs(request_id, q):
+    with log_subscribers_lock:
+        subscribers = [s for s in log_subscribers.get(request_id, []) if s[1] is not q]
+        if subscribers:
+            log_subscribers[request_id] = subscribers
+        else:
+            log_subscribers.pop(request_id, None)
+
+def _publish(request_id, event):
+    with log_subscribers_lock:
+        subscribers = list(log_subscribers.get(request_id, []))
+    delivered = False
+    for loop, q, kinds in subscribers:
+        if event[0] not in kinds:
+            continue
+        try:
+            loop.call_soon_threadsafe(q.put_nowait, event)
+            delivered = True
+        except RuntimeError:
+            # 구독자의 이벤트 루프가 이미 닫힘
+            pass
+    return delivered
+
+def publish_status(request_id, status):
+    """상태 변화(queued/running/succeeded 등)를 스트림 구독자에게 전달"""
+    _publish(request_id, ("status", status))
+
+def add_partial_result(request_id, item):
+    """크롤러가 상품 하나를 완성할 때마다 호출 - 부분 결과로 보관하고 결과 스트림 구독자에게 알림"""
+    if _worker_events is not None:
+        _worker_events.put(("item", request_id, item))
+        return
+    index = task_registry.append_item(request_id, item)
+    _publish(request_id, ("item", index))
+
+def _item_callback(request_id, sink=None):
+    """크롤러에 넘길 on_item 콜백 (sink 리스트에도 모아 크래시 시 부분 결과를 살림)"""
+    def on_item(item):
+        try:
+            if sink is not None:
+                sink.append(item)
+            add_partial_result(request_id, item)
+        except Exception as e:
+            print(f"Partial result error: {e}", flush=True)
+    return on_item
+
+def set_task_status(request_id, status, **fields):
+    """작업 상태 전이 (허용되지 않는 전이는 무시하고 False 반환)"""
+    changed = task_registry.transition(request_id, status, **fields)
+    if changed:
+        if _worker_events is not None:
+            _worker_events.put(("status", request_id, (status, fields)))
+        else:
+            publish_status(request_id, status)
+            if status in FINAL_STATUSES:
+                _clear_stop_flag(request_id)
+                try:
+                    result_store.mark_status(request_id, status)
+                except Exception as e:
+                    print(f"Result store error: {e}", flush=True)
+    return changed
+
+def _clear_stop_flag(request_id):
+    # 끝난 작업의 공유 중지 플래그 정리 (워커 프로세스 모드, 부모 쪽에서만 호출)
+    if _worker_stop_flags is not None:
+        try:
+            _worker_stop_flags.pop(request_id, None)
+        except Exception:
+            pass
+
 def set_stop_signal(request_id):
-    with stop_signals_lock:
-        stop_signals[request_id] = True
+    task_registry.set_stop(request_id)
+    if _worker_stop_flags is not None:
+        _worker_stop_flags[request_id] = True
 
 def is_stopped(request_id):
-    with stop_signals_lock:
-        return stop_signals.get(request_id, False)
+    if _worker_stop_flags is not None and _worker_stop_flags.get(request_id):
+        return True
+    return task_registry.is_stopped(request_id)
+
+# --- 취소 토큰 ---
+# 중지 신호(is_stopped)를 짧은 간격으로 확인해 크롤러에 넘긴 CancelToken을 취소한다.
+# 워커 프로세스 모드에서도 is_stopped가 공유 플래그를 보므로 같은 방식으로 동작한다.
+STOP_POLL_INTERVAL = 0.2  # 초
+
+async def _watch_stop(request_id, token):
+    while not token.cancelled:
+        if is_stopped(request_id):
+            log_to_queue(request_id, "시스템: 중지 요청 감지됨")
+            token.cancel()
+            break
+        await asyncio.sleep(STOP_POLL_INTERVAL)
+
+@asynccontextmanager
+async def cancellation(request_id):
+    """요청의 중지 신호에 연결된 CancelToken을 발급"""
+    token = CancelToken()
+    watcher = asyncio.create_task(_watch_stop(request_id, token))
+    try:
+        yield token
+    finally:
+        watcher.cancel()
+
+_task_sweeper = None
+_result_purger = None
+
+async def _run_result_purger(interval):
+    # 보관 기간이 지난 실행 / 만료된 판매자 캐시는 시작 시 한 번, 이후 interval마다 삭제
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            removed = await loop.run_in_executor(None, result_store.purge)
+            if removed:
+                print(f"Result store: {removed} old run(s) purged", flush=True)
+            expired = await loop.run_in_executor(None, seller_cache.purge)
+            if expired:
+                print(f"Seller cache: {expired} expired entr(ies) purged", flush=True)
+        except Exception as e:
+            print(f"Result store purge error: {e}", flush=True)
+        await asyncio.sleep(interval)
+
+def start_task_sweeper():
+    global _task_sweeper, _result_purger
+    if _task_sweeper is None:
+        _task_sweeper = asyncio.create_task(task_registry.run_sweeper(TASK_SWEEP_INTERVAL))
+    if _result_purger is None:
+        _result_purger = asyncio.create_task(_run_result_purger(RESULT_PURGE_INTERVAL))
+
+def stop_task_sweeper():
+    global _task_sweeper, _result_purger
+    for task in (_task_sweeper, _result_purger):
+        if task is not None:
+            task.cancel()
+    _task_sweeper = None
+    _result_purger = None
+
+# --- 상세 페이지 동시 수집 설정 ---
+# 요청별 concurrency 값은 전역 상한(CRAWLER_MAX_DETAIL_CONCURRENCY)을 넘을 수 없다.
+DEFAULT_DETAIL_CONCURRENCY = int(os.environ.get("CRAWLER_DETAIL_CONCURRENCY", "3"))
+MAX_DETAIL_CONCURRENCY = int(os.environ.get("CRAWLER_MAX_DETAIL_CONCURRENCY", "6"))
+
+def resolve_concurrency(value):
+    if value is None:
+        value = DEFAULT_DETAIL_CONCURRENCY
+    return max(1, min(int(value), MAX_DETAIL_CONCURRENCY))
+
+# 호스트별 요청 간격 제한 (모든 요청이 공유 - 동시 크롤링 시에도 봇 차단 회피)
+HOST_MIN_INTERVAL = float(os.environ.get("CRAWLER_HOST_MIN_INTERVAL", "1.0"))
+host_rate_limiter = HostRateLimiter(HOST_MIN_INTERVAL)
+
+
+# --- 요청 차단 정책 ---
+# 쉼표로 구분된 목록. CRAWLER_ALLOW_HOSTS를 지정하면 해당 호스트 외 요청은 모두 차단된다.
+def _env_list(name, default=()):
+    value = os.environ.get(name)
+    if value is None:
+        return tuple(default)
+    return tuple(v.strip() for v in value.split(",") if v.strip())
+
+BLOCKED_RESOURCE_TYPES = _env_list("CRAWLER_BLOCK_RESOURCE_TYPES", DEFAULT_BLOCKED_RESOURCE_TYPES)
+BLOCKED_HOSTS = _env_list("CRAWLER_BLOCK_HOSTS", DEFAULT_BLOCKED_HOSTS)
+ALLOWED_HOSTS = _env_list("CRAWLER_ALLOW_HOSTS")
+
+def make_request_blocker(enabled=True):
+    if not enabled:
+        return None
+    return RequestBlocker(BLOCKED_RESOURCE_TYPES, BLOCKED_HOSTS, ALLOWED_HOSTS)
+
+
+# --- Browser Pool ---
+# 요청마다 Chromium을 새로 띄우지 않도록 프로세스 전역에서 브라우저를 미리 띄워두고
+# 요청별로 격리된 BrowserContext만 발급한다.
+BROWSER_POOL_SIZE = int(os.environ.get("CRAWLER_BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_CONTEXTS = int(os.environ.get("CRAWLER_BROWSER_MAX_CONTEXTS", "20"))
+BROWSER_LAUNCH_ARGS = ["--no-sandbox", "--disable-dev-shm-usage"]
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0      # 지금까지 발급한 컨텍스트 수
+        self.active = 0    # 현재 열려 있는 컨텍스트 수
+        self.retired = False
+
+
+class BrowserPool:
+    """미리 띄워둔 브라우저 N개에서 요청별 BrowserContext를 발급하는 풀"""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_contexts=BROWSER_MAX_CONTEXTS):
+        self.size = max(1, size)
+        self.max_contexts = max(1, max_contexts)
+        self._playwright = None
+        self._slots = []
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """브라우저 예열 (앱 시작 시 호출)"""
+        async with self._lock:
+            await self._fill()
+
+    async def _fill(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        # 죽은 브라우저는 교체
+        for slot in [s for s in self._slots if not s.browser.is_connected()]:
+            self._slots.remove(slot)
+            await self._retire(slot)
+        while len(self._slots) < self.size:
+            browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+            self._slots.append(_PooledBrowser(browser))
+
+    async def _retire(self, slot):
+        slot.retired = True
+        if slot.active == 0:
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+
+    async def _checkout(self):
+        async with self._lock:
+            await self._fill()
+            slot = min(self._slots, key=lambda s: s.active)
+            if slot.uses >= self.max_contexts:
+                # 사용 횟수 초과 - 진행 중인 컨텍스트가 끝나면 닫고 새 브라우저로 교체
+                self._slots.remove(slot)
+                await self._retire(slot)
+                await self._fill()
+                slot = min(self._slots, key=lambda s: s.active)
+            slot.uses += 1
+            slot.active += 1
+            return slot
+
+    async def _release(self, slot):
+        async with self._lock:
+            slot.active -= 1
+            if slot.retired and slot.active == 0:
+                try:
+                    await slot.browser.close()
+                except Exception:
+                    pass
+
+    @asynccontextmanager
+    async def context(self, request_blocker=None, **context_options):
+        """격리된 BrowserContext를 빌려주고, 블록을 벗어나면 닫는다"""
+        slot = await self._checkout()
+        context = None
+        try:
+            context = await slot.browser.new_context(**context_options)
+            if request_blocker is not None:
+                await request_blocker.attach(context)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            await self._release(slot)
+
+    async def close(self):
+        async with self._lock:
+            for slot in self._slots:
+                try:
+                    await slot.browser.close()
+                except Exception:
+                    pass
+            self._slots = []
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "max_contexts": self.max_contexts,
+            "browsers": [{"uses": s.uses, "active": s.active} for s in self._slots],
+        }
+
+
+_browser_pool = None
+
+def get_browser_pool():
+    global _browser_pool
+    if _browser_pool is None:
+        _browser_pool = BrowserPool()
+    return _browser_pool
+
+async def start_browser_pool():
+    await get_browser_pool().start()
+
+async def close_browser_pool():
+    global _browser_pool
+    if _browser_pool is not None:
+        await _browser_pool.close()
+        _browser_pool = None
 
 # --- Imports ---
 
@@ -67,9 +422,10 @@ except ImportError:
 
 # W Concept
 try:
-    from w_concept_crawler import WConceptCrawler
+    from w_concept_crawler import WConceptCrawler, CATEGORY_URLS as WCONCEPT_CATEGORY_URLS
 except ImportError:
     WConceptCrawler = None
+    WCONCEPT_CATEGORY_URLS = {}
     print("Warning: Failed to import WConceptCrawler")
 
 # 29CM
@@ -100,17 +456,42 @@ class MockRoot:
     def mainloop(self): pass
 
 
+class CrawlScope:
+    """배치 실행에서 카테고리 사이에 공유하는 브라우저 컨텍스트 / 취소 토큰 / 판매자 정보 창구"""
+    def __init__(self, context, token, cache):
+        self.context = context
+        self.token = token
+        self.cache = cache
+
+@asynccontextmanager
+async def crawl_scope(request_id, blocker, context_options, shared=None):
+    """(token, context) 발급 - 배치 실행이면 공유 scope를 그대로 쓰고, 아니면 요청 단위로 새로 연다"""
+    if shared is not None:
+        yield shared.token, shared.context
+        return
+    async with cancellation(request_id) as token, \
+            get_browser_pool().context(blocker, **context_options) as context:
+        yield token, context
+
+
 class UnifiedMusinsaCrawler:
     def __init__(self, request_id):
         self.request_id = request_id
         self.crawler = MusinsaCrawler()
+        self.error = None
+        self.partial = []  # on_item으로 받은 부분 결과
         # 로그 콜백 오버라이드
         self.crawler.log_callback = self._log_callback
+
+    @property
+    def phases(self):
+        return dict(self.crawler.timer.steps)
     
     def _log_callback(self, msg):
         log_to_queue(self.request_id, msg)
         
-    async def run(self, category, count=100, headless=True):
+    async def run(self, category, count=100, headless=True, concurrency=None, block_resources=True, capture_json=True,
+                  force_refresh=False, brand_dedup=True, brand_verify_every=None, previous_products=None, shared=None):
         url = self.crawler.categories.get(category)
         if not url:
             log_to_queue(self.request_id, f"Error: Unknown category '{category}'")
@@ -118,26 +499,28 @@ class UnifiedMusinsaCrawler:
         
         log_to_queue(self.request_id, f"Starting Musinsa crawling for '{category}' (Limit: {count})")
         
-        # 중지 신호 전달
-        def check_stop():
-            if is_stopped(self.request_id):
-                self.crawler.stop_flag = True
-        
-        # 주기적으로 stop_flag 체크 상기 (원래 crawler가 루프에서 체크함)
-        # 래퍼에서 주기적으로 주입
-        async def stop_monitor():
-            while not is_stopped(self.request_id) and self.crawler.stop_flag == False:
-                await asyncio.sleep(0.5)
-                if is_stopped(self.request_id):
-                    self.crawler.stop_flag = True
-                    log_to_queue(self.request_id, "시스템: 중지 요청 감지됨")
-                    break
-
-        monitor_task = asyncio.create_task(stop_monitor())
+        blocker = make_request_blocker(block_resources) if shared is None else None
+        cache = shared.cache if shared else \
+            seller_cache.session("musinsa", self._log_callback, force_refresh, brand_dedup, _verify_every(brand_verify_every))
+        if previous_products:
+            cache.seed(previous_products, PRODUCT_URL_KEYS)
 
         try:
-            products = await self.crawler.crawl_products(category, url, count)
-            monitor_task.cancel()
+            # 중지 요청 시 토큰이 취소되어 진행 중인 이동을 끊고 부분 결과를 바로 반환
+            async with crawl_scope(self.request_id, blocker, MusinsaCrawler.CONTEXT_OPTIONS, shared) as (token, context):
+                products = await self.crawler.crawl_products(
+                    category, url, count, context=context,
+                    concurrency=resolve_concurrency(concurrency),
+                    rate_limiter=host_rate_limiter,
+                    capture_json=capture_json,
+                    cancel_token=token,
+                    on_item=_item_callback(self.request_id, self.partial),
+                    seller_cache=cache
+                )
+            if blocker:
+                log_to_queue(self.request_id, blocker.summary())
+            if shared is None:
+                log_to_queue(self.request_id, cache.summary())
             
             if products:
                 log_to_queue(self.request_id, f"✅ Crawling complete. {len(products)} items collected.")
@@ -150,7 +533,7 @@ class UnifiedMusinsaCrawler:
                 log_to_queue(self.request_id, "No products found.")
                 return None
         except Exception as e:
-            monitor_task.cancel()
+            self.error = str(e)
             log_to_queue(self.request_id, f"Crawling failed: {e}")
             return None
 
@@ -160,30 +543,45 @@ class UnifiedWConceptCrawler:
         if not WConceptCrawler:
             raise Exception("W Concept crawler module not loaded")
         self.crawler = WConceptCrawler()
+        self.error = None
+        self.partial = []  # on_item으로 받은 부분 결과
         self.crawler.log_callback = self._log_callback
+
+    @property
+    def phases(self):
+        return dict(self.crawler.timer.steps)
         
     def _log_callback(self, msg):
         log_to_queue(self.request_id, msg)
         
-    async def run(self, category, count=10, headless=True):
+    async def run(self, category, count=10, headless=True, concurrency=None, block_resources=True, capture_json=True,
+                  force_refresh=False, brand_dedup=True, brand_verify_every=None, previous_products=None, shared=None):
         log_to_queue(self.request_id, f"Starting W Concept crawling for '{category}' (Count: {count})")
         
         try:
-            # 중지 신호 체크를 위해 루프 내에서 처리하거나 크롤러에 넘겨야 함
-            # 여기서는 크롤러 인스턴스에 직접 flag 설정 (크롤러가 지원한다면)
-            if hasattr(self.crawler, 'stop_flag'):
-                # 주기적으로 체크하는 스레드가 필요할 수 있음
-                pass
-
-            import asyncio
-            loop = asyncio.get_event_loop()
-            products = await loop.run_in_executor(
-                None, 
-                self.crawler.crawl_products,
-                category,
-                count,
-                headless
-            )
+            # async 크롤러이므로 executor 스레드 없이 이벤트 루프에서 바로 실행
+            # 중지 요청 시 토큰이 취소되어 진행 중인 이동을 끊고 부분 결과를 바로 반환
+            blocker = make_request_blocker(block_resources) if shared is None else None
+            cache = shared.cache if shared else \
+                seller_cache.session("wconcept", self._log_callback, force_refresh, brand_dedup, _verify_every(brand_verify_every))
+            if previous_products:
+                cache.seed(previous_products, PRODUCT_URL_KEYS)
+            async with crawl_scope(self.request_id, blocker, WConceptCrawler.CONTEXT_OPTIONS, shared) as (token, context):
+                products = await self.crawler.crawl_products(
+                    category, count, headless,
+                    context=context,
+                    concurrency=resolve_concurrency(concurrency),
+                    rate_limiter=host_rate_limiter,
+                    capture_json=capture_json,
+                    cancel_token=token,
+                    on_item=_item_callback(self.request_id, self.partial),
+                    seller_cache=cache,
+                    shared_context=shared is not None
+                )
+            if blocker:
+                log_to_queue(self.request_id, blocker.summary())
+            if shared is None:
+                log_to_queue(self.request_id, cache.summary())
             
             if products:
                 log_to_queue(self.request_id, f"✅ Crawling complete. Collected {len(products)} products")
@@ -197,6 +595,7 @@ class UnifiedWConceptCrawler:
                 return None
                 
         except Exception as e:
+            self.error = str(e)
             log_to_queue(self.request_id, f"Error running W Concept crawler: {e}")
             import traceback
             log_to_queue(self.request_id, traceback.format_exc())
@@ -208,8 +607,17 @@ class UnifiedWConceptCrawler:
 class Unified29CMCrawler:
     def __init__(self, request_id):
         self.request_id = request_id
+        self.app = None
+        self.error = None
+        self.partial = []  # on_item으로 받은 부분 결과
+
+    @property
+    def phases(self):
+        return dict(self.app.timer.steps) if self.app else {}
         
-    async def run(self, keyword, category=None, count=50, headless=True):
+    async def run(self, keyword, category=None, count=50, headless=True, concurrency=None, block_resources=True, capture_json=True,
+                  force_refresh=False, brand_dedup=True, brand_verify_every=None, previous_products=None, shared=None,
+                  save_excel=True):
         if not CrawlerApp_29CM:
             log_to_queue(self.request_id, "29CM crawler module not loaded.")
             return
@@ -218,21 +626,37 @@ class Unified29CMCrawler:
         
         root = MockRoot()
         app = CrawlerApp_29CM(root)
+        self.app = app
         
         # Override log
         def custom_log(msg):
             log_to_queue(self.request_id, msg)
         app.log = custom_log
         
-        # Check stop signal (via monkeypatch or check in loop if supported)
-        # 29cm_bag_crawler.py doesn't seem to have a simple stop_flag yet
-        
         try:
-            # We need to capture the results. 29cm currently saves to excel.
-            # I should modify 29cm to return the results list instead of just saving.
-            # For now, let's assume it returns or we can find the data.
-            # (Requires modifying 29cm script too)
-            results = await app.crawl_29cm(keyword, category=category, count=count)
+            # crawl_29cm이 결과 목록을 반환 (엑셀 저장은 save_excel일 때만)
+            # 중지 요청 시 토큰이 취소되어 진행 중인 이동을 끊고 부분 결과를 바로 반환
+            blocker = make_request_blocker(block_resources) if shared is None else None
+            cache = shared.cache if shared else \
+                seller_cache.session("29cm", custom_log, force_refresh, brand_dedup, _verify_every(brand_verify_every))
+            if previous_products:
+                cache.seed(previous_products, PRODUCT_URL_KEYS)
+            async with crawl_scope(self.request_id, blocker, CrawlerApp_29CM.CONTEXT_OPTIONS, shared) as (token, context):
+                results = await app.crawl_29cm(
+                    keyword, category=category, count=count, context=context,
+                    concurrency=resolve_concurrency(concurrency),
+                    rate_limiter=host_rate_limiter,
+                    capture_json=capture_json,
+                    cancel_token=token,
+                    on_item=_item_callback(self.request_id, self.partial),
+                    seller_cache=cache,
+                    # 배치 / 통합 실행에서는 합친 결과만 내보내도록 카테고리별 엑셀/TSV를 쓰지 않음
+                    save_excel=save_excel and shared is None
+                )
+            if blocker:
+                log_to_queue(self.request_id, blocker.summary())
+            if shared is None:
+                log_to_queue(self.request_id, cache.summary())
             if results:
                 return {
                     "products": results,
@@ -241,71 +665,153 @@ class Unified29CMCrawler:
                 }
             return None
         except Exception as e:
+            self.error = str(e)
             log_to_queue(self.request_id, f"Error: {e}")
             return None
 
 
-# --- 크롤링 결과 저장소 ---
-crawl_results = {}  # request_id -> results data
-crawl_results_lock = threading.Lock()
+# --- 크롤링 결과 저장소 (task_registry = 최근 결과 캐시, result_store = SQLite 영구 저장) ---
+def run_category(crawler_type, params):
+    """결과에 기록되는 카테고리 (29CM 키워드 검색은 키워드) - 이전 실행 비교 기준"""
+    if crawler_type == UNIFIED_TYPE:
+        return unified_label(unified_sources(params))
+    if params.get('categories'):
+        return batch_label(batch_categories(crawler_type, params['categories']))
+    if crawler_type == '29cm':
+        category = params.get('category')
+        if category == '직접 검색 (키워드)':
+            category = None
+        return category or params.get('keyword') or params.get('category')
+    default = '베스트탭 (메인)' if crawler_type == 'wconcept' else '전체'
+    return params.get('category') or default
 
 def store_crawl_result(request_id, result_data):
-    with crawl_results_lock:
-        crawl_results[request_id] = result_data
+    if _worker_events is not None:
+        _worker_events.put(("result", request_id, result_data))
+        return
+    task_registry.store_result(request_id, result_data)
+    data = result_data.get("data") or {}
+    params = result_data.get("params") or {}
+    try:
+        result_store.save_run(
+            request_id, result_data.get("crawler_type"), run_category(result_data.get("crawler_type"), params),
+            data.get("products") or [], params=params, partial=data.get("partial", False)
+        )
+    except Exception as e:
+        # DB 저장 실패해도 메모리 결과로 엑셀 저장은 가능하도록 로그만 남김
+        log_to_queue(request_id, f"결과 DB 저장 실패: {e}")
 
 def get_crawl_result(request_id):
-    with crawl_results_lock:
-        return crawl_results.get(request_id)
+    result = task_registry.get_result(request_id)
+    if result is None:
+        # 레지스트리에서 정리됐거나 재시작 전에 수집한 결과
+        result = result_store.load_run(request_id)
+    return result
 
 def clear_crawl_result(request_id):
-    with crawl_results_lock:
-        if request_id in crawl_results:
-            del crawl_results[request_id]
+    task_registry.clear_result(request_id)
+
+def load_previous_run(crawler_type, params, request_id):
+    """diff 모드 기준이 되는 같은 source + category의 직전 완료 실행 (없으면 None, None)"""
+    category = run_category(crawler_type, params)
+    try:
+        previous_id = result_store.find_previous_run(crawler_type, category, exclude=request_id)
+        previous = result_store.load_run(previous_id) if previous_id else None
+    except Exception as e:
+        log_to_queue(request_id, f"이전 실행 조회 실패: {e}")
+        return None, None
+    if not previous:
+        log_to_queue(request_id, f"diff 모드: '{category}'의 이전 실행이 없어 전체를 수집합니다.")
+        return None, None
+    products = previous["data"].get("products") or []
+    log_to_queue(request_id, f"diff 모드: 이전 실행 {previous_id} ({len(products)}개)와 비교, 신규 상품만 상세 페이지 수집")
+    return previous_id, products
 
 # --- 메인 실행 함수 ---
 
+async def run_single(crawler_type, params, request_id, previous_products=None, shared=None):
+    """카테고리 하나 실행 → (crawler, result), 알 수 없는 crawler_type이면 (None, None)"""
+    options = dict(
+        count=int(params.get('count', 50 if crawler_type == '29cm' else 10)),
+        headless=params.get('headless', True),
+        concurrency=params.get('concurrency'),
+        block_resources=params.get('block_resources', True),
+        capture_json=params.get('capture_json', True),
+        force_refresh=params.get('force_refresh', False),
+        brand_dedup=params.get('brand_dedup', True),
+        brand_verify_every=params.get('brand_verify_every'),
+        previous_products=previous_products,
+        shared=shared
+    )
+    if crawler_type == 'musinsa':
+        crawler = UnifiedMusinsaCrawler(request_id)
+        return crawler, await crawler.run(category=params.get('category', '전체'), **options)
+
+    if crawler_type == 'wconcept':
+        crawler = UnifiedWConceptCrawler(request_id)
+        return crawler, await crawler.run(category=params.get('category', '베스트탭 (메인)'), **options)
+
+    if crawler_type == '29cm':
+        crawler = Unified29CMCrawler(request_id)
+        category_val = params.get('category')
+        if category_val == '직접 검색 (키워드)':
+            category_val = None
+        return crawler, await crawler.run(keyword=params.get('keyword', ''), category=category_val,
+                                          save_excel=params.get('save_excel', True), **options)
+
+    return None, None
+
+def salvage_partial(request_id, crawler, result):
+    # 최종 결과가 없어도(크래시 등) 그때까지 받은 부분 결과는 순위 순으로 살려서 저장
+    if not result and crawler and crawler.partial:
+        products = sorted(crawler.partial, key=lambda item: item.get("순위", item.get("랭킹", 0)))
+        log_to_queue(request_id, f"부분 결과 {len(products)}개를 저장합니다.")
+        result = {"products": products, "count": len(products), "partial": True}
+    return result
+
+def apply_diff(request_id, result, previous_id, previous_products):
+    # diff 모드: 직전 실행 대비 순위 변동 표시 (부분 결과는 이탈 판정이 틀리므로 제외)
+    if result and previous_products is not None and not result.get("partial"):
+        diff = rank_changes(result["products"], previous_products)
+        result["diff"] = dict(diff, previous_request_id=previous_id)
+        log_to_queue(request_id, summary_line(diff))
+
 async def run_crawler_task(crawler_type, params, request_id):
     """
     crawler_type: 'musinsa', 'wconcept', '29cm'
-    params: dict (category, keyword, count, headless)
+    params: dict (category, keyword, count, headless, concurrency, block_resources, capture_json, force_refresh, brand_dedup, brand_verify_every, diff_mode, categories)
+    categories가 있으면 배치 실행 (run_batch), crawler_type이 'unified'면 사이트 통합 실행 (run_unified)
+    상태: queued → running → succeeded / failed / cancelled
     """
+    if not task_registry.info(request_id).get("status"):
+        set_task_status(request_id, "queued", type=crawler_type)
+    if not set_task_status(request_id, "running"):
+        # 대기 중에 취소된 작업
+        log_to_queue(request_id, "Task cancelled before start.")
+        return
     log_to_queue(request_id, f"Task started: {crawler_type}")
     
+    crawler = None
+    result = None
+    error = None
+    phases = {}
     try:
-        result = None
-        
-        if crawler_type == 'musinsa':
-            crawler = UnifiedMusinsaCrawler(request_id)
-            result = await crawler.run(
-                category=params.get('category', '전체'), 
-                count=int(params.get('count', 10)),
-                headless=params.get('headless', True)
-            )
-            
-        elif crawler_type == 'wconcept':
-            crawler = UnifiedWConceptCrawler(request_id)
-            result = await crawler.run(
-                category=params.get('category', '베스트탭 (메인)'),
-                count=int(params.get('count', 10)),
-                headless=params.get('headless', True)
-            )
-            
-        elif crawler_type == '29cm':
-            crawler = Unified29CMCrawler(request_id)
-            
-            category_val = params.get('category')
-            if category_val == '직접 검색 (키워드)':
-                category_val = None
-                
-            result = await crawler.run(
-                keyword=params.get('keyword', ''),
-                category=category_val,
-                count=int(params.get('count', 50)),
-                headless=params.get('headless', True)
-            )
-            
+        if crawler_type == UNIFIED_TYPE:
+            result, phases, error = await run_unified(params, request_id)
+        elif params.get('categories'):
+            result, phases, error = await run_batch(crawler_type, params, request_id)
         else:
-            log_to_queue(request_id, "Unknown crawler type")
+            previous_id, previous_products = None, None
+            if params.get('diff_mode'):
+                previous_id, previous_products = load_previous_run(crawler_type, params, request_id)
+
+            crawler, result = await run_single(crawler_type, params, request_id, previous_products)
+            if crawler is None:
+                error = "Unknown crawler type"
+                log_to_queue(request_id, "Unknown crawler type")
+
+            result = salvage_partial(request_id, crawler, result)
+            apply_diff(request_id, result, previous_id, previous_products)
         
         # 결과 저장
         if result:
@@ -316,9 +822,439 @@ async def run_crawler_task(crawler_type, params, request_id):
             })
             
     except Exception as e:
+        error = str(e)
         log_to_queue(request_id, f"Critical Task Error: {e}")
         import traceback
         log_to_queue(request_id, traceback.format_exc())
     
+    # 최종 상태 결정 (중지 요청 > 결과 유무)
+    item_count = len(result.get("products", [])) if result else 0
+    if crawler:
+        phases = {name: round(seconds, 3) for name, seconds in crawler.phases.items()}
+    error = error or (crawler.error if crawler else None)
+    if is_stopped(request_id):
+        final_status = "cancelled"
+    elif result and not result.get("partial"):
+        final_status = "succeeded"
+    else:
+        # 부분 결과만 살린 경우도 실패로 기록 (결과는 저장되어 있음)
+        final_status = "failed"
+        error = error or "No products collected"
+    
     log_to_queue(request_id, "Task finished.")
+    set_task_status(request_id, final_status, item_count=item_count, phases=phases, error=error)
+
+
+# --- 배치 실행 (한 사이트의 여러 카테고리를 브라우저 컨텍스트 하나로) ---
+BATCH_ALL = "all"
+
+def batch_categories(crawler_type, categories):
+    """요청의 카테고리 목록 정리 ("all"이면 해당 사이트의 전체 카테고리, 중복 제거)"""
+    if isinstance(categories, str):
+        categories = [categories]
+    if any(str(name).lower() == BATCH_ALL for name in categories):
+        if crawler_type == 'musinsa' and MusinsaCrawler:
+            return list(MusinsaCrawler().categories)
+        if crawler_type == 'wconcept' and WConceptCrawler:
+            return list(WCONCEPT_CATEGORY_URLS)
+        if crawler_type == '29cm' and CrawlerApp_29CM:
+            return list(_29cm_module.CATEGORY_URLS_29CM)
+        return []
+    return list(dict.fromkeys(categories))
+
+def batch_label(categories):
+    return "배치: " + ", ".join(categories)
+
+def _crawler_class(crawler_type):
+    crawler_cls = {'musinsa': MusinsaCrawler, 'wconcept': WConceptCrawler, '29cm': CrawlerApp_29CM}.get(crawler_type)
+    if crawler_cls is None:
+        raise Exception(f"{crawler_type} crawler module not loaded")
+    return crawler_cls
+
+async def run_batch(crawler_type, params, request_id):
+    """카테고리 목록을 순서대로 실행 → (result, phases, error)
+
+    브라우저 컨텍스트 / 요청 차단기 / 판매자 정보 세션을 카테고리 사이에 공유해
+    같은 브랜드가 여러 카테고리에 나와도 상세 페이지는 한 번만 방문한다.
+    result["categories"]: {카테고리: {count, elapsed_sec, phases, partial, error, diff}}
+    phases: 카테고리별 소요 시간(초)
+    """
+    categories = batch_categories(crawler_type, params.get('categories'))
+    if not categories:
+        return None, {}, "No categories to crawl"
+    log_to_queue(request_id, f"배치 실행: {len(categories)}개 카테고리 ({', '.join(categories)})")
+
+    blocker = make_request_blocker(params.get('block_resources', True))
+    cache = seller_cache.session(
+        crawler_type, lambda msg: log_to_queue(request_id, msg), params.get('force_refresh', False),
+        params.get('brand_dedup', True), _verify_every(params.get('brand_verify_every'))
+    )
+    products, summary, phases, errors = [], {}, {}, []
+    crawler_cls = _crawler_class(crawler_type)
+    async with cancellation(request_id) as token, \
+            get_browser_pool().context(blocker, **crawler_cls.CONTEXT_OPTIONS) as context:
+        # 컨텍스트 공통 설정(init script 등)은 공유 컨텍스트를 만들 때 한 번만 등록
+        prepare = getattr(crawler_cls, "prepare_context", None)
+        if prepare is not None:
+            await prepare(context)
+        scope = CrawlScope(context, token, cache)
+        for category in categories:
+            if token.cancelled:
+                break
+            category_params = dict(params, category=category, categories=None)
+            previous_id, previous_products = None, None
+            if params.get('diff_mode'):
+                previous_id, previous_products = load_previous_run(crawler_type, category_params, request_id)
+                if previous_products is not None:
+                    # 배치 실행이 기준이면 해당 카테고리 상품만 비교
+                    previous_products = [item for item in previous_products
+                                         if item.get(CATEGORY_KEY, category) == category]
+
+            started = time.perf_counter()
+            crawler, result = await run_single(crawler_type, category_params, request_id, previous_products, scope)
+            result = salvage_partial(request_id, crawler, result)
+            apply_diff(request_id, result, previous_id, previous_products)
+            elapsed = time.perf_counter() - started
+
+            items = result["products"] if result else []
+            for item in items:
+                item.setdefault(CATEGORY_KEY, category)
+            products.extend(items)
+            error = crawler.error if crawler else None
+            if not items:
+                error = error or "No products collected"
+            if error:
+                errors.append(f"{category}: {error}")
+            summary[category] = {
+                "count": len(items),
+                "elapsed_sec": round(elapsed, 3),
+                "phases": {name: round(seconds, 3) for name, seconds in crawler.phases.items()} if crawler else {},
+                "partial": bool(result and result.get("partial")),
+                "error": error,
+            }
+            if result and result.get("diff"):
+                summary[category]["diff"] = result["diff"]
+            phases[category] = round(elapsed, 3)
+            log_to_queue(request_id, f"[{category}] {len(items)}개, {elapsed:.1f}초")
+
+    if blocker:
+        log_to_queue(request_id, blocker.summary())
+    log_to_queue(request_id, cache.summary())
+
+    skipped = [category for category in categories if category not in summary]
+    if not products:
+        return None, phases, "; ".join(errors) or None
+    result = {
+        "products": products,
+        "category": batch_label(categories),
+        "count": len(products),
+        "categories": summary,
+    }
+    # 실패/중단된 카테고리가 있으면 전체를 부분 결과로 표시
+    if skipped or any(info["partial"] or not info["count"] for info in summary.values()):
+        result["partial"] = True
+    log_to_queue(request_id, f"✅ 배치 완료: {len(summary)}/{len(categories)}개 카테고리, {len(products)}개 상품")
+    return result, phases, "; ".join(errors) or None
+
+
+# --- 사이트 통합 실행 (여러 사이트를 동시에, 결과는 하나의 컬럼 구성으로) ---
+UNIFIED_TYPE = "unified"
+UNIFIED_SOURCES = ("musinsa", "wconcept", "29cm")
+# 사이트 하위 작업 하나를 기다리는 최대 시간(초) - 넘으면 중지 신호를 보내고 그때까지의 결과만 사용
+UNIFIED_SOURCE_TIMEOUT = float(os.environ.get("CRAWLER_UNIFIED_SOURCE_TIMEOUT", "3600"))
+
+def unified_sources(params):
+    sources = params.get('sources') or UNIFIED_SOURCES
+    return [source for source in dict.fromkeys(sources) if source in UNIFIED_SOURCES]
+
+def unified_label(sources):
+    return "통합: " + ", ".join(sources)
+
+# 카테고리/키워드는 사이트마다 이름이 달라 공통 params에서 넘기지 않음 (source_params로만 지정)
+_SOURCE_ONLY_PARAMS = ('sources', 'source_params', 'category', 'keyword', 'categories')
+
+def unified_source_params(params, source):
+    source_params = {key: value for key, value in params.items() if key not in _SOURCE_ONLY_PARAMS}
+    source_params.update((params.get('source_params') or {}).get(source) or {})
+    if source == '29cm' and not (source_params.get('category') or source_params.get('keyword')):
+        source_params['category'] = '전체'
+    return source_params
+
+async def _run_source(parent_id, source, params):
+    """통합 실행의 사이트 하나를 하위 작업으로 대기열에 넣고 끝날 때까지 대기 → (result, info)
+
+    하위 작업도 일반 작업과 같은 전역/타입별 동시 실행 상한을 따른다 (프로세스 워커 모드 포함).
+    결과는 사이트별 실행으로 결과 저장소에도 남는다.
+    """
+    child_id = f"{parent_id}-{source}"
+    _log_parents[child_id] = (parent_id, source)
+    timed_out = False
+    try:
+        # 통합 결과만 내보내도록 사이트별 엑셀/TSV 저장은 끔
+        submit_crawl(source, dict(params, save_excel=False), priority=params.get('priority', 0), request_id=child_id)
+        deadline = time.monotonic() + UNIFIED_SOURCE_TIMEOUT
+        while True:
+            status = task_registry.info(child_id).get("status")
+            # 레지스트리에서 정리(TTL/LRU)된 작업은 끝난 것으로 보고 결과 저장소에서 확인
+            if status is None or status in FINAL_STATUSES:
+                break
+            if not timed_out and time.monotonic() > deadline:
+                timed_out = True
+                log_to_queue(parent_id, f"[{source}] {UNIFIED_SOURCE_TIMEOUT:.0f}초 초과, 중지 요청")
+            if (timed_out or is_stopped(parent_id)) and not is_stopped(child_id):
+                set_stop_signal(child_id)
+                if job_queue.cancel(child_id):
+                    set_task_status(child_id, "cancelled")
+            if timed_out and time.monotonic() > deadline + UNIFIED_SOURCE_TIMEOUT:
+                # 중지 요청 후에도 끝나지 않으면 더 기다리지 않음
+                break
+            await asyncio.sleep(STOP_POLL_INTERVAL)
+    except Exception as e:
+        # 한 사이트가 실패해도 나머지 사이트 결과는 살림
+        log_to_queue(parent_id, f"[{source}] 실패: {e}")
+        return None, {"error": str(e)}
+    finally:
+        _log_parents.pop(child_id, None)
+    result = get_crawl_result(child_id)
+    info = task_registry.info(child_id)
+    if not info:
+        status = (result or {}).get("status")
+        info = {"status": status, "error": None if status == "succeeded" else f"task {status or 'lost'}"}
+    if timed_out:
+        info = dict(info, error=info.get("error") or f"timed out after {UNIFIED_SOURCE_TIMEOUT:.0f}s")
+    return (result or {}).get("data"), info
+
+async def run_unified(params, request_id):
+    """여러 사이트를 하위 작업으로 동시에 실행해 하나의 결과로 합침 → (result, phases, error)
+
+    사이트마다 자기 작업(request_id-사이트)으로 대기열에 들어가 동시 실행 상한을 지키고,
+    사이트별 설정은 params['source_params'][사이트]가 공통 params를 덮어쓴다 (카테고리 없으면 사이트 기본값).
+    result["products"]: 통합 컬럼(unified_schema.UNIFIED_COLUMNS)으로 맞춘 상품 행
+    result["sellers"]: 사업자등록번호 기준으로 사이트를 넘어 합친 판매자 목록
+    result["sources"]: {사이트: {request_id, count, elapsed_sec, queue_wait_sec, phases, partial, error}}
+    """
+    sources = unified_sources(params)
+    if not sources:
+        return None, {}, "No sources to crawl"
+    log_to_queue(request_id, f"통합 실행: {', '.join(sources)}")
+
+    outcomes = await asyncio.gather(*(
+        _run_source(request_id, source, unified_source_params(params, source)) for source in sources
+    ))
+
+    rows, summary, phases, errors = [], {}, {}, []
+    for source, (result, info) in zip(sources, outcomes):
+        products = result["products"] if result else []
+        rows.extend(unified_schema.normalize_product(source, item) for item in products)
+        error = info.get("error")
+        if not products:
+            error = error or "No products collected"
+        if error:
+            errors.append(f"{source}: {error}")
+        elapsed = info.get("duration_sec") or 0.0
+        summary[source] = {
+            "request_id": f"{request_id}-{source}",
+            "count": len(products),
+            "elapsed_sec": elapsed,
+            "queue_wait_sec": info.get("queue_wait_sec", 0.0),
+            "phases": info.get("phases") or {},
+            "partial": bool(result and result.get("partial")),
+            "error": error,
+        }
+        phases[source] = elapsed
+        log_to_queue(request_id, f"[{source}] {len(products)}개, {elapsed:.1f}초")
+
+    if not rows:
+        return None, phases, "; ".join(errors) or None
+    sellers = unified_schema.dedupe_sellers(rows)
+    log_to_queue(request_id, unified_schema.summary_line(rows, sellers))
+    result = {
+        "products": rows,
+        "category": unified_label(sources),
+        "count": len(rows),
+        "sellers": sellers,
+        "sources": summary,
+    }
+    if any(info["partial"] or not info["count"] for info in summary.values()):
+        result["partial"] = True
+    return result, phases, "; ".join(errors) or None
+
+
+# --- 동시 크롤링 수 제한 ---
+# 작은 컨테이너에서 요청마다 Chromium이 늘어나 OOM 나지 않도록 run_crawler_task 앞에서 실행 수를 제한
+MAX_CONCURRENT_CRAWLS = int(os.environ.get("CRAWLER_MAX_CONCURRENT_CRAWLS", "2"))
+MAX_QUEUED_CRAWLS = int(os.environ.get("CRAWLER_MAX_QUEUED_CRAWLS", "20"))
+
+# --- 프로세스 워커 모드 ---
+# CRAWLER_WORKER_MODE=process 이면 run_crawler_task를 별도 프로세스(ProcessPoolExecutor)에서 실행한다.
+# Playwright 드라이버 통신/파싱이 API 이벤트 루프와 경쟁하지 않고, 여러 코어를 쓸 수 있다.
+# 워커의 로그/상태/결과는 multiprocessing Manager 큐로 부모에 전달되어
+# 기존 log_to_queue / set_task_status / store_crawl_result 경로로 그대로 들어간다.
+WORKER_MODE = os.environ.get("CRAWLER_WORKER_MODE", "inline").lower()  # inline | process
+
+_process_pool = None
+_worker_manager = None
+_worker_pump = None
+_worker_events_parent = None
+_worker_loop = None  # 워커 프로세스 안에서 작업 사이에 재사용하는 이벤트 루프 (브라우저 풀 유지)
+
+def _init_worker(events, stop_flags):
+    """워커 프로세스 초기화: 부모와의 채널 연결, 브라우저는 워커당 1개만 띄움"""
+    global _worker_events, _worker_stop_flags, _browser_pool
+    _worker_events = events
+    _worker_stop_flags = stop_flags
+    _browser_pool = BrowserPool(size=1)
+
+def _process_worker_main(crawler_type, params, request_id):
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    try:
+        _worker_loop.run_until_complete(run_crawler_task(crawler_type, params, request_id))
+    finally:
+        # 상태/결과는 부모가 보관하므로 워커 쪽 항목은 바로 정리
+        task_registry.remove(request_id)
+
+def _pump_worker_events(events):
+    """워커가 보낸 이벤트를 부모 프로세스의 기존 인터페이스로 전달 (데몬 스레드)"""
+    while True:
+        try:
+            item = events.get()
+        except (EOFError, OSError):
+            break
+        if item is None:
+            break
+        kind, request_id, payload = item
+        try:
+            if kind == "log":
+                _deliver_log(request_id, payload)
+            elif kind == "status":
+                status, fields = payload
+                set_task_status(request_id, status, **fields)
+            elif kind == "result":
+                store_crawl_result(request_id, payload)
+            elif kind == "item":
+                add_partial_result(request_id, payload)
+        except Exception as e:
+            print(f"Worker event error ({kind}): {e}", flush=True)
+
+def start_worker_pool(max_workers=None):
+    global _process_pool, _worker_manager, _worker_pump, _worker_events_parent, _worker_stop_flags
+    if _process_pool is not None:
+        return
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # fork는 스레드/Playwright와 함께 쓰기 위험하므로 spawn 사용
+    ctx = multiprocessing.get_context("spawn")
+    _worker_manager = ctx.Manager()
+    _worker_events_parent = _worker_manager.Queue()
+    _worker_stop_flags = _worker_manager.dict()
+    _process_pool = ProcessPoolExecutor(
+        max_workers=max_workers or MAX_CONCURRENT_CRAWLS,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(_worker_events_parent, _worker_stop_flags)
+    )
+    _worker_pump = threading.Thread(target=_pump_worker_events, args=(_worker_events_parent,), daemon=True)
+    _worker_pump.start()
+
+def close_worker_pool():
+    global _process_pool, _worker_manager, _worker_pump, _worker_events_parent, _worker_stop_flags
+    if _process_pool is None:
+        return
+    _process_pool.shutdown(wait=False, cancel_futures=True)
+    try:
+        _worker_events_parent.put(None)  # 펌프 스레드 종료
+        _worker_pump.join(timeout=5)
+    except Exception:
+        pass
+    _worker_manager.shutdown()
+    _process_pool = _worker_manager = _worker_pump = _worker_events_parent = _worker_stop_flags = None
+
+async def run_crawler_task_in_process(crawler_type, params, request_id):
+    """run_crawler_task와 같은 인터페이스로, 실제 실행은 워커 프로세스에 맡김"""
+    if crawler_type == UNIFIED_TYPE:
+        # 통합 실행은 하위 작업을 대기열에 넣고 기다리기만 하므로 API 프로세스에서 실행
+        return await run_crawler_task(crawler_type, params, request_id)
+    if _process_pool is None:
+        start_worker_pool()
+    if task_registry.info(request_id).get("status") == "cancelled":
+        log_to_queue(request_id, "Task cancelled before start.")
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(_process_pool, _process_worker_main, crawler_type, dict(params), request_id)
+    except Exception as e:
+        log_to_queue(request_id, f"Worker process error: {e}")
+        set_task_status(request_id, "failed", error=str(e))
+
+# --- 작업 대기열 (동시 크롤링 수 제한) ---
+
+def _env_type_limits(name):
+    # 예: CRAWLER_MAX_CONCURRENT_PER_TYPE="musinsa=1,wconcept=1,29cm=1"
+    limits = {}
+    for part in _env_list(name, ()):
+        crawler_type, _, value = part.partition("=")
+        if value.strip().isdigit():
+            limits[crawler_type.strip()] = int(value)
+    return limits
+
+job_queue = JobQueue(
+    run_crawler_task_in_process if WORKER_MODE == "process" else run_crawler_task,
+    max_concurrent=MAX_CONCURRENT_CRAWLS,
+    per_type_limits=_env_type_limits("CRAWLER_MAX_CONCURRENT_PER_TYPE"),
+    max_queued=MAX_QUEUED_CRAWLS,
+    coordinator_types=(UNIFIED_TYPE,)
+)
+
+def submit_crawl(crawler_type, params, priority=0, request_id=None):
+    """작업 등록 + 대기열 제출 → (request_id, 대기 순번), 대기열이 가득 차면 QueueFullError"""
+    import uuid
+    request_id = request_id or str(uuid.uuid4())
+    # 작업 정보 생성 (log queue도 함께 생성됨)
+    set_task_status(request_id, "queued", type=crawler_type)
+    try:
+        position = job_queue.submit(request_id, crawler_type, params, priority=priority)
+    except QueueFullError:
+        task_registry.remove(request_id)
+        raise
+    return request_id, position
+
+
+# --- 예약 크롤링 (cron) ---
+# API 프로세스에서만 실행 (워커 프로세스는 대기열 작업만 처리). 여러 인스턴스를 띄우면 한 곳에서만 켤 것
+SCHEDULER_ENABLED = os.environ.get("CRAWLER_SCHEDULER_ENABLED", "1") != "0"
+SCHEDULE_DB_PATH = os.environ.get("CRAWLER_SCHEDULE_DB", os.path.join(BASE_DIR, "results", "schedules.db"))
+SCHEDULE_FILE = os.environ.get("CRAWLER_SCHEDULE_FILE")  # 시작 시 반영할 예약 목록(JSON)
+SCHEDULE_STAGGER = float(os.environ.get("CRAWLER_SCHEDULE_STAGGER", "60"))  # 예약 제출 사이 최소 간격(초)
+SCHEDULE_TICK = float(os.environ.get("CRAWLER_SCHEDULE_TICK", "15"))  # 예약 확인 주기(초)
+
+schedule_store = ScheduleStore(SCHEDULE_DB_PATH)
+
+def _schedule_is_active(request_id):
+    return task_registry.info(request_id).get("status") in ACTIVE_STATUSES
+
+crawl_scheduler = CrawlScheduler(
+    schedule_store,
+    submit=lambda crawler_type, params: submit_crawl(crawler_type, params)[0],
+    is_active=_schedule_is_active,
+    stagger=SCHEDULE_STAGGER,
+    tick=SCHEDULE_TICK,
+    log=lambda msg: print(msg, flush=True)
+)
+
+def start_scheduler():
+    if not SCHEDULER_ENABLED:
+        return
+    if SCHEDULE_FILE:
+        try:
+            loaded = crawl_scheduler.load_file(SCHEDULE_FILE)
+            print(f"Scheduler: {loaded} schedule(s) loaded from {SCHEDULE_FILE}", flush=True)
+        except Exception as e:
+            print(f"Scheduler: failed to load {SCHEDULE_FILE}: {e}", flush=True)
+    crawl_scheduler.start()
 
+def stop_scheduler():
+    crawl_scheduler.stop()
+    schedule_store.close()
@@ -31,15 +31,179 @@ if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
 
 # import tkinter removed for headless environment
 import asyncio
+from contextlib import asynccontextmanager
 from playwright.async_api import async_playwright
-import pandas as pd
 from datetime import datetime
 import threading
+import time
+
+# 공용 페이지 유틸 (crawlers/page_utils.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "crawlers"))
+from excel_export import write_excel
+from page_utils import (
+    CancelToken, CrawlCancelled, JsonCapture, RequestBlocker, StepTimer, counts_agree, format_price, pick_field,
+    record_url, ResponseWatcher, wait_for_dom_quiet, wait_for_stable_count
+)
+
+# 랭킹 API 응답 캡처 설정 (랭킹 엔드포인트만, JSON 필드명 후보 - id/name 같은 일반 키는 제외)
+MUSINSA_LIST_API_PATTERN = r"api\.musinsa\.com/api2/hm/web/v\d+/pans/ranking"
+MUSINSA_ID_KEYS = ("goodsNo", "productId")
+MUSINSA_NAME_KEYS = ("goodsName", "productName")
+
+# 목록의 상품 링크 (중복 제거, 절대 URL) - JSON 목록 개수 검증과 상품 URL 확인에 사용
+MUSINSA_LINK_URLS_JS = """
+() => Array.from(new Set(Array.from(document.querySelectorAll('a.gtm-select-item')).map((a) => a.href).filter(Boolean)))
+"""
+MUSINSA_BRAND_ID_KEYS = ("brandId", "brandCode", "brand")
+
+# 목록 페이지에서 상품 요소 탐색 + 기본 정보 추출을 한 번에 수행 (요소별 CDP 왕복 제거)
+# 탐색 우선순위: 정보 컨테이너 셀렉터 → UIProductColumn → 링크의 부모 컨테이너 → 링크 자체 → /products/ 링크
+LIST_EXTRACT_JS = """
+(limit) => {
+    const text = (el) => el ? (el.innerText || el.textContent || '').trim() : '';
+    const absUrl = (href) => !href ? '' : (href.startsWith('http') ? href : 'https://www.musinsa.com' + href);
+    const firstMatch = (root, selectors) => {
+        for (const sel of selectors) {
+            const el = root.querySelector(sel);
+            if (el) return el;
+        }
+        return null;
+    };
+    const firstText = (root, selectors) => {
+        for (const sel of selectors) {
+            const t = text(root.querySelector(sel));
+            if (t) return t;
+        }
+        return '';
+    };
+    const findUp = (el, fn, maxDepth) => {
+        let current = el.parentElement;
+        let depth = 0;
+        while (current && depth < maxDepth) {
+            const found = fn(current);
+            if (found) return found;
+            current = current.parentElement;
+            depth++;
+        }
+        return null;
+    };
+    
+    const PRICE_SELECTORS = ['div.UIProductColumn__Price-sc-1t5ihy5-10', 'div[class*="Price"]', 'span[class*="price"]', 'p[class*="price"]'];
+    const DISCOUNT_SELECTORS = ['span.text-red', 'span[class*="red"]', 'span[class*="discount"]'];
+    const PRICE_TEXT_SELECTORS = ['span.text-black', 'span[class*="black"]', 'span', 'p'];
+    
+    // 1. 상품 단위 요소 찾기
+    let strategy = 'info-item';
+    let items = Array.from(document.querySelectorAll('div.UIProductColumn__InfoItem-sc-1t5ihy5-7'));
+    if (!items.length) {
+        strategy = 'product-column';
+        items = Array.from(document.querySelectorAll('div[class*="UIProductColumn"]'));
+    }
+    if (!items.length) {
+        strategy = 'link-container';
+        const seen = new Set();
+        document.querySelectorAll('a.gtm-select-item').forEach((link) => {
+            const container = findUp(link, (c) => {
+                const classList = c.classList ? c.classList.toString() : '';
+                if (classList.includes('UIProductColumn') || classList.includes('ProductColumn') ||
+                    (classList.includes('product') && c.tagName === 'DIV')) return c;
+                return null;
+            }, 15);
+            if (container && !seen.has(container)) {
+                seen.add(container);
+                items.push(container);
+            }
+        });
+    }
+    if (!items.length) {
+        strategy = 'link';
+        items = Array.from(document.querySelectorAll('a.gtm-select-item'));
+    }
+    if (!items.length) {
+        strategy = 'products-link';
+        const seen = new Set();
+        items = Array.from(document.querySelectorAll('a[href*="/products/"]')).filter((a) => {
+            const href = a.getAttribute('href');
+            if (!href || seen.has(href)) return false;
+            seen.add(href);
+            return true;
+        });
+    }
+    
+    // 2. 요소별 브랜드/상품명/URL/가격 추출
+    const records = items.slice(0, limit).map((item) => {
+        const isLink = item.tagName === 'A';
+        let brand = '';
+        let name = '';
+        let url = '';
+        let priceRoot = null;
+        
+        if (isLink) {
+            // 링크인 경우: 부모에서 브랜드/가격 찾기
+            brand = findUp(item, (c) => {
+                const brandLink = c.querySelector('a.gtm-click-brand');
+                if (brandLink) return text(brandLink.querySelector('p') || brandLink) || null;
+                return text(firstMatch(c, ['p[class*="brand"]', 'span[class*="brand"]'])) || null;
+            }, 10) || '';
+            name = firstText(item, ['p', 'span', 'div']);
+            url = absUrl(item.getAttribute('href'));
+            priceRoot = findUp(item, (c) => firstMatch(c, PRICE_SELECTORS), 10);
+        } else {
+            // 컨테이너인 경우
+            brand = firstText(item, ['a.gtm-click-brand p', 'a.gtm-click-brand', 'p[class*="brand"]', 'span[class*="brand"]']);
+            const link = firstMatch(item, ['a.gtm-select-item', 'a[href*="/products/"]', 'a[class*="product"]']);
+            if (link) {
+                name = firstText(link, ['p', 'span', 'div']);
+                url = absUrl(link.getAttribute('href'));
+            }
+            priceRoot = firstMatch(item, PRICE_SELECTORS);
+        }
+        
+        let discount = '';
+        let price = '';
+        if (priceRoot) {
+            discount = firstText(priceRoot, DISCOUNT_SELECTORS);
+            // 숫자가 포함된 경우만 가격으로 인식
+            for (const sel of PRICE_TEXT_SELECTORS) {
+                const t = text(priceRoot.querySelector(sel));
+                if (/[0-9]/.test(t)) {
+                    price = t;
+                    break;
+                }
+            }
+            if (!price) {
+                for (const el of priceRoot.querySelectorAll('span, p')) {
+                    const t = text(el);
+                    if (/[0-9]/.test(t)) {
+                        price = t;
+                        break;
+                    }
+                }
+            }
+        }
+        
+        return {brand: brand, name: name, url: url, discount: discount, price: price};
+    });
+    
+    const bodyText = document.body ? document.body.innerText : '';
+    return {
+        strategy: strategy,
+        found: items.length,
+        records: records,
+        hasProductText: bodyText.includes('상품') || bodyText.toLowerCase().includes('product')
+    };
+}
+"""
 
 
 class MusinsaCrawler:
+    # 브라우저 풀에서 컨텍스트를 빌릴 때 사용할 옵션
+    CONTEXT_OPTIONS = {}
+
     def __init__(self):
         self.stop_flag = False
+        self.timer = StepTimer()
+        self.brand_ids = {}  # 상품URL -> 브랜드 ID (랭킹 API 응답에 있을 때만, 판매자 캐시 키로 사용)
         self.categories = {
             "전체": "https://www.musinsa.com/main/musinsa/ranking?skip_bf=Y&gf=A&storeCode=musinsa&sectionId=200&contentsId=&categoryCode=000&ageBand=AGE_BAND_ALL",
             "뷰티": "https://www.musinsa.com/main/musinsa/ranking?skip_bf=Y&gf=A&storeCode=musinsa&sectionId=200&contentsId=&categoryCode=104000&ageBand=AGE_BAND_ALL&subPan=product",
@@ -72,15 +236,15 @@ class MusinsaCrawler:
             except Exception as e:
                 self.log(f"페이지 로드 타임아웃 (무시): {e}")
 
-            await page.wait_for_timeout(2000)
+            self.timer.note_wait("상세 로딩", await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000), 2000, verbose=False)
 
             # 2. 판매자 정보 섹션 열기 (모든 가능성 시도)
             try:
                 # 스크롤을 맨 아래로 내렸다가 다시 올려서 lazy loading 유도
                 await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(500)
+                self.timer.note_wait("상세 스크롤", await wait_for_dom_quiet(page, quiet_ms=150, timeout=500), 500, verbose=False)
                 await page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-                await page.wait_for_timeout(500)
+                self.timer.note_wait("상세 스크롤", await wait_for_dom_quiet(page, quiet_ms=150, timeout=500), 500, verbose=False)
                 
                 # '판매자 정보', '상품 정보 고시' 등이 포함된 버튼/요소 찾아서 클릭
                 await page.evaluate("""() => {
@@ -94,7 +258,7 @@ class MusinsaCrawler:
                         }
                     }
                 }""")
-                await page.wait_for_timeout(1500)
+                self.timer.note_wait("아코디언 열기", await wait_for_dom_quiet(page, quiet_ms=300, timeout=1500), 1500, verbose=False)
             except Exception as e:
                 self.log(f"아코디언 클릭 시도 중 오류: {e}")
 
@@ -174,9 +338,12 @@ class MusinsaCrawler:
             self.log(f"판매자 정보 로직 오류: {str(e)}")
             return { "상호": "", "사업자번호": "", "연락처": "", "영업소재지": "" }
     
-    async def crawl_products(self, category, url, num_products, progress_callback=None):
-        """상품 크롤링 실행"""
-        products = []
+    @asynccontextmanager
+    async def _open_context(self, context=None):
+        """외부(브라우저 풀)에서 받은 컨텍스트를 쓰거나, 없으면 직접 브라우저를 띄움"""
+        if context is not None:
+            yield context
+            return
         
         async with async_playwright() as p:
             self.log("브라우저 실행 중...")
@@ -184,643 +351,298 @@ class MusinsaCrawler:
                 headless=True,
                 args=["--no-sandbox", "--disable-dev-shm-usage"]
             )
+            blocker = RequestBlocker()
+            try:
+                own_context = await browser.new_context(**self.CONTEXT_OPTIONS)
+                await blocker.attach(own_context)
+                yield own_context
+            finally:
+                self.log(blocker.summary())
+                await browser.close()
+    
+    def _basic_info_from_json(self, capture, category, num_products, dom_urls):
+        """캡처한 랭킹 API 응답에서 상품 기본 정보 구성
+        
+        DOM 상품 개수와 맞지 않거나 상품 URL을 확인하지 못하면 믿지 않고 빈 리스트 반환 (DOM으로 폴백)
+        반환: (basic_info_list, product_urls)
+        """
+        records = capture.records(MUSINSA_ID_KEYS, MUSINSA_NAME_KEYS)
+        if not records:
+            return [], []
+        if not counts_agree(len(records), len(dom_urls), num_products):
+            self.log(f"랭킹 API 응답 상품 수({len(records)})가 목록 상품 수({len(dom_urls)})와 달라 사용하지 않음")
+            return [], []
+        basic_info_list = []
+        product_urls = []
+        for idx, record in enumerate(records[:num_products]):
+            product_url = record_url(record, pick_field(record, MUSINSA_ID_KEYS), dom_urls, "https://www.musinsa.com")
+            if not product_url:
+                self.log("랭킹 API 응답에서 상품 URL을 확인하지 못해 사용하지 않음")
+                return [], []
+            discount = pick_field(record, ("discountRatio", "discountRate", "saleRate"))
+            brand_id = pick_field(record, MUSINSA_BRAND_ID_KEYS)
+            if isinstance(brand_id, (str, int)) and brand_id != "":
+                self.brand_ids[product_url] = str(brand_id)
+            basic_info_list.append({
+                "카테고리": category,
+                "랭킹": idx + 1,
+                "브랜드": str(pick_field(record, ("brandName", "brandNameKr", "brand"))).strip(),
+                "상품명": str(pick_field(record, MUSINSA_NAME_KEYS)).strip(),
+                "할인율": f"{discount}%" if isinstance(discount, (int, float)) and discount else str(discount or ""),
+                "가격": format_price(pick_field(record, ("finalPrice", "salePrice", "price", "normalPrice"))),
+                "상품URL": product_url
+            })
+            product_urls.append(product_url)
+        return basic_info_list, product_urls
+    
+    async def _extract_basic_info_from_dom(self, page, category, num_products, list_ready=None):
+        """목록 페이지 DOM에서 상품 기본 정보 수집 (랭킹 API 응답을 못 잡았을 때의 폴백)
+        
+        list_ready: 랭킹 API 응답 감시 (ResponseWatcher) - 응답이 이미 왔으면 load 이벤트를 기다리지 않음
+        반환: (basic_info_list, product_urls)
+        """
+        self.log("JavaScript 실행 완료 대기 중...")
+        with self.timer.step("목록 렌더링 대기"):
+            started = time.perf_counter()
+            if list_ready is not None and list_ready.count:
+                # 목록 데이터(랭킹 API)가 도착했으면 그 렌더링이 끝날 때까지만 대기
+                await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
+            else:
+                # 응답을 못 봤으면 페이지 로드 완료 + DOM 변경이 멈출 때까지 대기
+                # (기존: 고정 8초 + load 후 3초 + 고정 5초)
+                try:
+                    await page.wait_for_load_state("load", timeout=16000)
+                except Exception as e:
+                    self.log(f"load 이벤트 대기 중 오류 (무시): {str(e)}")
+                remaining = max(1000, 16000 - int((time.perf_counter() - started) * 1000))
+                await wait_for_dom_quiet(page, quiet_ms=700, timeout=remaining)
+            self.timer.note_wait("목록 렌더링", {"waited": (time.perf_counter() - started) * 1000}, 16000)
+            self.log("JavaScript 실행 완료")
+        
+        # 한 번의 evaluate로 상품 요소 탐색 + 브랜드/상품명/가격/URL 추출
+        with self.timer.step("목록 추출"):
+            extracted = await page.evaluate(LIST_EXTRACT_JS, num_products)
+        
+        if extracted["hasProductText"]:
+            self.log("페이지에 상품 관련 텍스트 발견")
+        else:
+            self.log("경고: 페이지에 상품 관련 텍스트를 찾지 못했습니다")
+        self.log(f"상품 요소 탐색 결과 ({extracted['strategy']}): {extracted['found']}개 상품 발견")
+        
+        records = extracted["records"]
+        self.log(f"총 {len(records)}개 상품 크롤링 시작...")
+        
+        if not records:
+            self.log("경고: 상품을 찾을 수 없습니다. 페이지 구조를 확인하세요.")
+            # 페이지 스크린샷 저장 (디버깅용)
+            try:
+                await page.screenshot(path="debug_page.png")
+                self.log("디버깅용 스크린샷 저장: debug_page.png")
+            except:
+                pass
+            return [], []  # 빈 리스트 반환
+        
+        basic_info_list = []
+        product_urls = []
+        for idx, record in enumerate(records):
+            basic_info_list.append({
+                "카테고리": category,
+                "랭킹": idx + 1,
+                "브랜드": record["brand"].strip(),
+                "상품명": record["name"].strip(),
+                "할인율": record["discount"].strip(),
+                "가격": record["price"].strip(),
+                "상품URL": record["url"]
+            })
+            product_urls.append(record["url"])
+            self.log(f"상품 {idx + 1} 정보 수집 완료: {record['brand'].strip()} - {record['name'].strip()}")
+        
+        return basic_info_list, product_urls
+    
+    async def crawl_products(self, category, url, num_products, progress_callback=None, context=None,
+                             concurrency=1, rate_limiter=None, capture_json=True, cancel_token=None, on_item=None,
+                             seller_cache=None):
+        """상품 크롤링 실행
+        
+        concurrency: 판매자 정보 수집 시 동시에 사용할 페이지 수
+        rate_limiter: HostRateLimiter (호스트별 요청 간격 제한, 없으면 제한 없음)
+        capture_json: 랭킹 API 응답(JSON)에서 목록을 파싱 (응답이 없으면 DOM 스크래핑으로 폴백)
+        cancel_token: CancelToken (취소되면 진행 중인 이동을 끊고 그때까지 수집한 결과를 반환)
+        on_item: 상품 하나의 판매자 정보까지 수집될 때마다 호출되는 콜백 (수집 완료 순서)
+        seller_cache: 판매자 정보 창구 (resolve - 캐시나 같은 브랜드 상품에서 찾으면 상세 페이지를 열지 않음)
+        """
+        products = []
+        self.timer = StepTimer(self.log)
+        self.brand_ids = {}
+        token = cancel_token or CancelToken()
+        stopped = lambda: self.stop_flag or token.cancelled
+        
+        async with self._open_context(context) as context:
             # 타임아웃 증가
-            page = await browser.new_page()
+            page = await context.new_page()
             page.set_default_timeout(60000)
+            capture = JsonCapture(page, MUSINSA_LIST_API_PATTERN) if capture_json else None
+            # 랭킹 API 응답 도착 여부 - DOM 폴백에서 목록 준비 신호로 사용 (capture_json과 무관)
+            list_ready = ResponseWatcher(page, MUSINSA_LIST_API_PATTERN)
             
             try:
                 self.log(f"{category} 카테고리 페이지 로딩 중...")
-                # 페이지 로드 전략 간소화: domcontentloaded만 기다리고 바로 시작 (속도 향상)
-                try:
-                    await page.goto(url, wait_until="domcontentloaded", timeout=90000)
-                except Exception as e:
-                    self.log(f"초기 로딩 타임아웃 (계속 진행): {e}")
+                with self.timer.step("목록 페이지 로딩"):
+                    # 페이지 로드 전략 간소화: domcontentloaded만 기다리고 바로 시작 (속도 향상)
+                    try:
+                        await token.run(page.goto(url, wait_until="domcontentloaded", timeout=90000))
+                    except CrawlCancelled:
+                        pass
+                    except Exception as e:
+                        self.log(f"초기 로딩 타임아웃 (계속 진행): {e}")
 
-                # 상품이 로드될 때까지 잠시 대기
-                try:
-                    await page.wait_for_selector('a.gtm-select-item', timeout=20000)
-                except:
-                    self.log("상품 목록 선택자 대기 실패, 스크롤 시도")
+                    # 상품이 로드될 때까지 잠시 대기
+                    try:
+                        await token.run(page.wait_for_selector('a.gtm-select-item', timeout=20000))
+                    except CrawlCancelled:
+                        pass
+                    except:
+                        self.log("상품 목록 선택자 대기 실패, 스크롤 시도")
+                if stopped():
+                    self.log("크롤링 중지됨")
+                    return products
 
                 # 스크롤 최적화
                 self.log("상품 목록 로딩 중...")
-                for i in range(10):  # 최대 횟수 줄임
-                    if self.stop_flag:
-                        break
-                    
-                    # 현재 개수 체크 - 충분하면 즉시 중단 (속도 핵심)
-                    current_items = await page.query_selector_all('a.gtm-select-item')
-                    current_count = len(current_items)
-                    self.log(f"스크롤 {i+1}/10 - 현재 발견된 상품: {current_count}개 (목표: {num_products}개)")
-                    
-                    if current_count >= num_products:
-                        self.log("충분한 상품을 찾았습니다. 스크롤 중단.")
-                        break
+                with self.timer.step("목록 스크롤"):
+                    for i in range(10):  # 최대 횟수 줄임
+                        if stopped():
+                            break
+                        
+                        # 현재 개수 체크 - 충분하면 즉시 중단 (속도 핵심)
+                        current_count = await page.locator('a.gtm-select-item').count()
+                        self.log(f"스크롤 {i+1}/10 - 현재 발견된 상품: {current_count}개 (목표: {num_products}개)")
+                        
+                        if current_count >= num_products:
+                            self.log("충분한 상품을 찾았습니다. 스크롤 중단.")
+                            break
 
-                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await page.wait_for_timeout(2000) # 대기 시간 조금 늘림 안정성 확보
-                    
-                    # 스크롤 후 상품 개수 확인
-                    new_count = len(await page.query_selector_all('a.gtm-select-item'))
-                    if new_count == current_count and i > 5:
-                        self.log("더 이상 새로운 상품이 로드되지 않습니다.")
-                        break
-                
-                # 페이지가 완전히 로드될 때까지 추가 대기
-                await page.wait_for_timeout(8000)
-                
-                # JavaScript 실행 완료 대기 - 상품이 동적으로 로드될 수 있음
-                self.log("JavaScript 실행 완료 대기 중...")
-                try:
-                    # 페이지의 JavaScript가 완료될 때까지 대기
-                    await page.evaluate('''() => {
-                        return new Promise((resolve) => {
-                            if (document.readyState === 'complete') {
-                                setTimeout(resolve, 3000);
-                            } else {
-                                window.addEventListener('load', () => {
-                                    setTimeout(resolve, 3000);
-                                });
-                            }
-                        });
-                    }''')
-                    self.log("JavaScript 실행 완료")
-                except Exception as e:
-                    self.log(f"JavaScript 대기 중 오류 (무시): {str(e)}")
-                
-                # 추가 대기
-                await page.wait_for_timeout(5000)
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        # 새 상품이 붙고 개수가 안정될 때까지만 대기 (최대 2초)
+                        try:
+                            loaded = await token.run(wait_for_stable_count(
+                                page, 'a.gtm-select-item', min_count=current_count + 1, stable_ms=300, timeout=2000
+                            ))
+                        except CrawlCancelled:
+                            break
+                        self.timer.note_wait(f"스크롤 {i+1} 로딩", loaded, 2000)
+                        
+                        # 스크롤 후 상품 개수 확인
+                        new_count = loaded.get("count", 0)
+                        if new_count == current_count and i > 5:
+                            self.log("더 이상 새로운 상품이 로드되지 않습니다.")
+                            break
                 
-                # 실제 페이지에 상품이 있는지 확인
-                self.log("페이지 내용 확인 중...")
-                page_text = await page.evaluate('() => document.body.innerText')
-                if '상품' in page_text or 'product' in page_text.lower():
-                    self.log("페이지에 상품 관련 텍스트 발견")
+                # 1단계: 랭킹 API 응답(JSON)이 DOM 목록과 맞으면 기본 정보를 바로 추출, 아니면 DOM 스크래핑
+                basic_info_list, product_urls = [], []
+                if capture:
+                    await capture.settle()
+                    dom_urls = await page.evaluate(MUSINSA_LINK_URLS_JS)
+                    basic_info_list, product_urls = self._basic_info_from_json(capture, category, num_products, dom_urls)
+                if basic_info_list:
+                    self.log(f"랭킹 API 응답에서 {len(basic_info_list)}개 상품 정보 추출 (DOM 스크래핑 생략)")
                 else:
-                    self.log("경고: 페이지에 상품 관련 텍스트를 찾지 못했습니다")
-                
-                # 상품 정보 추출 - 여러 셀렉터 시도
-                product_items = []
+                    if capture:
+                        self.log("랭킹 API 응답을 사용할 수 없어 DOM 스크래핑으로 진행")
+                    basic_info_list, product_urls = await self._extract_basic_info_from_dom(page, category, num_products, list_ready)
+                    if not basic_info_list:
+                        return products
+                if stopped():
+                    self.log("크롤링 중지됨")
+                    return products
+                total_items = len(basic_info_list)
                 
-                # 방법 1: 기존 셀렉터
-                product_items = await page.query_selector_all('div.UIProductColumn__InfoItem-sc-1t5ihy5-7')
-                self.log(f"셀렉터 1 결과: {len(product_items)}개 상품 발견")
                 
-                # 방법 2: 더 일반적인 셀렉터 시도
-                if len(product_items) == 0:
-                    product_items = await page.query_selector_all('div[class*="UIProductColumn"]')
-                    self.log(f"셀렉터 2 결과: {len(product_items)}개 상품 발견")
+                # 2단계: 각 상품의 판매자 정보 수집 (페이지 여러 개로 병렬 수집, 결과는 인덱스로 병합)
+                workers = max(1, min(int(concurrency or 1), len(basic_info_list) or 1))
+                self.log(f"판매자 정보 수집 시작... (동시 {workers}개)")
+                empty_seller = {"상호": "", "사업자번호": "", "연락처": "", "영업소재지": ""}
+                seller_results = [None] * len(basic_info_list)
+                completed = 0
                 
-                # 방법 3: 상품 링크로 찾기 - 링크를 기준으로 부모 컨테이너 찾기
-                if len(product_items) == 0:
-                    product_links = await page.query_selector_all('a.gtm-select-item')
-                    self.log(f"셀렉터 3 (링크) 결과: {len(product_links)}개 상품 링크 발견")
-                    # 링크의 부모 요소 찾기
-                    if product_links:
-                        product_items = []
-                        for link in product_links:
-                            try:
-                                # JavaScript로 부모 컨테이너의 선택자 찾기
-                                parent_selector = await link.evaluate('''el => {
-                                    let current = el.parentElement;
-                                    let depth = 0;
-                                    while (current && depth < 10) {
-                                        if (current.classList && current.classList.toString().includes('UIProductColumn')) {
-                                            // 클래스명으로 선택자 생성
-                                            const classes = Array.from(current.classList).join('.');
-                                            return `div.${classes}`;
-                                        }
-                                        current = current.parentElement;
-                                        depth++;
-                                    }
-                                    return null;
-                                }''')
-                                if parent_selector:
-                                    # 찾은 선택자로 요소 찾기
-                                    parent_elements = await page.query_selector_all(parent_selector)
-                                    # 같은 링크를 포함하는 부모 찾기
-                                    for parent in parent_elements:
-                                        try:
-                                            link_in_parent = await parent.query_selector('a.gtm-select-item')
-                                            if link_in_parent:
-                                                link_href = await link.get_attribute('href')
-                                                parent_link_href = await link_in_parent.get_attribute('href')
-                                                if link_href == parent_link_href:
-                                                    product_items.append(parent)
-                                                    break
-                                        except:
-                                            continue
-                            except Exception as e:
-                                self.log(f"부모 요소 찾기 오류: {str(e)}")
-                                continue
-                        # 중복 제거
-                        seen = set()
-                        unique_items = []
-                        for item in product_items:
-                            try:
-                                item_id = await item.evaluate('el => el.outerHTML.substring(0, 100)')
-                                if item_id not in seen:
-                                    seen.add(item_id)
-                                    unique_items.append(item)
-                            except:
-                                unique_items.append(item)
-                        product_items = unique_items
-                        self.log(f"부모 요소 찾기 결과: {len(product_items)}개 상품 발견")
+                page_pool = asyncio.Queue()
+                page_pool.put_nowait(page)
+                extra_pages = []
+                for _ in range(workers - 1):
+                    extra_page = await context.new_page()
+                    extra_page.set_default_timeout(60000)
+                    extra_pages.append(extra_page)
+                    page_pool.put_nowait(extra_page)
                 
-                # 방법 4: 랭킹 페이지의 일반적인 상품 컨테이너 찾기
-                if len(product_items) == 0:
-                    # 페이지 구조 디버깅 - 더 자세한 정보 수집
-                    self.log("페이지 구조 분석 중...")
-                    all_divs = await page.query_selector_all('div')
-                    self.log(f"전체 div 개수: {len(all_divs)}")
-                    
-                    # 다양한 링크 패턴 확인
-                    all_links = await page.query_selector_all('a[href*="/products/"]')
-                    self.log(f"/products/ 링크 개수: {len(all_links)}")
-                    
-                    # 다른 링크 패턴도 확인
-                    ranking_links = await page.query_selector_all('a[href*="ranking"]')
-                    self.log(f"ranking 링크 개수: {len(ranking_links)}")
+                async def collect(idx, basic_info, product_url):
+                    nonlocal completed
+                    if stopped():
+                        return
                     
-                    # 클래스명에 product가 포함된 요소 찾기 (대소문자 구분)
-                    product_divs = await page.query_selector_all('[class*="product"], [class*="Product"]')
-                    self.log(f"product/Product 클래스 포함 요소: {len(product_divs)}개")
+                    seller_info = dict(empty_seller)
                     
-                    # gtm 관련 요소 찾기
-                    gtm_elements = await page.query_selector_all('[class*="gtm"]')
-                    self.log(f"gtm 클래스 포함 요소: {len(gtm_elements)}개")
-                    
-                    # 실제 페이지의 모든 링크 클래스 확인
-                    all_a_tags = await page.query_selector_all('a')
-                    self.log(f"전체 링크(a 태그) 개수: {len(all_a_tags)}")
-                    
-                    # 링크의 클래스명 샘플 수집
-                    link_classes = set()
-                    for link in all_a_tags[:20]:
+                    async def visit():
+                        worker_page = await page_pool.get()
                         try:
-                            classes = await link.get_attribute('class')
-                            if classes:
-                                link_classes.add(classes)
-                        except:
-                            pass
-                    if link_classes:
-                        self.log(f"링크 클래스 샘플 (최대 10개): {list(link_classes)[:10]}")
-                    
-                    # 실제 링크 URL 샘플 확인
-                    if all_links:
-                        sample_urls = []
-                        for link in all_links[:5]:
-                            try:
-                                href = await link.get_attribute('href')
-                                if href:
-                                    sample_urls.append(href)
-                            except:
-                                pass
-                        self.log(f"샘플 링크 URL: {sample_urls}")
-                    else:
-                        # /products/ 링크가 없으면 다른 패턴 확인
-                        sample_hrefs = []
-                        for link in all_a_tags[:10]:
-                            try:
-                                href = await link.get_attribute('href')
-                                if href and ('product' in href.lower() or 'item' in href.lower()):
-                                    sample_hrefs.append(href[:100])  # 처음 100자만
-                            except:
-                                pass
-                        if sample_hrefs:
-                            self.log(f"상품 관련 링크 샘플: {sample_hrefs}")
+                            if stopped():
+                                raise CrawlCancelled()
+                            if rate_limiter:
+                                await token.run(rate_limiter.wait(product_url))
+                            self.log(f"[{idx + 1}/{total_items}] {basic_info['브랜드']} - {basic_info['상품명']} 판매자 정보 수집 중...")
+                            # 취소되면 진행 중인 상세 페이지 이동을 바로 끊음
+                            info = await token.run(self.get_seller_info(worker_page, product_url))
+                            return {key: info.get(key, "") for key in empty_seller}
+                        finally:
+                            page_pool.put_nowait(worker_page)
                     
-                    # 페이지의 실제 HTML 구조 일부 확인 (디버깅용)
-                    try:
-                        html_sample = await page.evaluate('''() => {
-                            const body = document.body;
-                            if (!body) return "body 없음";
-                            const html = body.innerHTML.substring(0, 2000);
-                            return html;
-                        }''')
-                        # HTML에서 상품 관련 키워드 찾기
-                        if 'product' in html_sample.lower() or '상품' in html_sample:
-                            self.log("HTML에 상품 관련 내용 발견")
-                        else:
-                            self.log("경고: HTML에 상품 관련 내용을 찾지 못했습니다")
-                    except Exception as e:
-                        self.log(f"HTML 샘플 확인 중 오류: {str(e)}")
+                    if product_url:
+                        try:
+                            # 판매자 캐시 → 같은 브랜드의 앞 상품 → 상세 페이지 순으로 판매자 정보 확보
+                            if seller_cache:
+                                info = await seller_cache.resolve(
+                                    product_url, visit, brand=basic_info['브랜드'], brand_id=self.brand_ids.get(product_url)
+                                )
+                            else:
+                                info = await visit()
+                            seller_info.update({key: info.get(key, "") for key in empty_seller})
+                        except CrawlCancelled:
+                            return
+                        except Exception as e:
+                            self.log(f"상품 {idx + 1} 판매자 정보 수집 중 오류: {str(e)}")
                     
-                    # gtm-select-item 클래스를 가진 링크의 부모 찾기
-                    product_links = await page.query_selector_all('a.gtm-select-item')
-                    if product_links:
-                        self.log(f"gtm-select-item 링크 {len(product_links)}개 발견")
-                        # 각 링크를 직접 사용 (링크 자체에서 정보 추출 가능)
-                        # 링크 주변의 정보를 추출할 수 있도록 링크를 기준으로 작업
-                        product_items = []
-                        for link in product_links[:num_products]:
-                            try:
-                                # 링크의 부모 컨테이너 선택자 찾기
-                                container_selector = await link.evaluate('''el => {
-                                    let current = el.parentElement;
-                                    let depth = 0;
-                                    while (current && depth < 15) {
-                                        const classList = current.classList ? current.classList.toString() : '';
-                                        if (classList.includes('UIProductColumn') || 
-                                            classList.includes('ProductColumn') ||
-                                            (classList.includes('product') && current.tagName === 'DIV')) {
-                                            const classes = Array.from(current.classList).filter(c => c.length > 0);
-                                            if (classes.length > 0) {
-                                                return `div.${classes.join('.')}`;
-                                            }
-                                            return `div[class*="${classList.substring(0, 20)}"]`;
-                                        }
-                                        current = current.parentElement;
-                                        depth++;
-                                    }
-                                    return null;
-                                }''')
-                                if container_selector:
-                                    # 선택자로 요소 찾기
-                                    try:
-                                        containers = await page.query_selector_all(container_selector)
-                                        # 링크를 포함하는 컨테이너 찾기
-                                        for container in containers:
-                                            try:
-                                                link_in_container = await container.query_selector('a.gtm-select-item')
-                                                if link_in_container:
-                                                    link_href = await link.get_attribute('href')
-                                                    container_link_href = await link_in_container.get_attribute('href')
-                                                    if link_href and container_link_href and link_href == container_link_href:
-                                                        product_items.append(container)
-                                                        break
-                                            except:
-                                                continue
-                                    except:
-                                        pass
-                            except Exception as e:
-                                self.log(f"컨테이너 찾기 오류: {str(e)}")
-                                continue
-                        # 중복 제거
-                        seen_urls = set()
-                        unique_items = []
-                        for item in product_items:
-                            try:
-                                link_elem = await item.query_selector('a.gtm-select-item')
-                                if link_elem:
-                                    url = await link_elem.get_attribute('href')
-                                    if url and url not in seen_urls:
-                                        seen_urls.add(url)
-                                        unique_items.append(item)
-                                else:
-                                    unique_items.append(item)
-                            except:
-                                unique_items.append(item)
-                        product_items = unique_items
-                        self.log(f"부모 컨테이너 찾기 결과: {len(product_items)}개 상품 발견")
-                
-                # 최종 방법: 링크를 직접 사용 (컨테이너를 찾지 못한 경우)
-                if len(product_items) == 0:
-                    # gtm-select-item 링크 시도
-                    product_links = await page.query_selector_all('a.gtm-select-item')
-                    if product_links:
-                        self.log(f"최종 방법 1: gtm-select-item 링크 사용 ({len(product_links)}개 링크 발견)")
-                        product_items = product_links
-                    else:
-                        # /products/ 링크 직접 사용
-                        product_links = await page.query_selector_all('a[href*="/products/"]')
-                        if product_links:
-                            self.log(f"최종 방법 2: /products/ 링크 사용 ({len(product_links)}개 링크 발견)")
-                            # 중복 제거
-                            seen_urls = set()
-                            unique_links = []
-                            for link in product_links:
-                                try:
-                                    href = await link.get_attribute('href')
-                                    if href and href not in seen_urls:
-                                        seen_urls.add(href)
-                                        unique_links.append(link)
-                                except:
-                                    continue
-                            product_items = unique_links
-                            self.log(f"중복 제거 후: {len(product_items)}개 링크")
-                
-                total_items = min(len(product_items), num_products)
-                self.log(f"총 {total_items}개 상품 크롤링 시작...")
-                
-                if total_items == 0:
-                    self.log("경고: 상품을 찾을 수 없습니다. 페이지 구조를 확인하세요.")
-                    # 페이지 스크린샷 저장 (디버깅용)
-                    try:
-                        await page.screenshot(path="debug_page.png")
-                        self.log("디버깅용 스크린샷 저장: debug_page.png")
-                    except:
-                        pass
-                    return products  # 빈 리스트 반환
+                    seller_results[idx] = seller_info
+                    completed += 1
+                    if on_item:
+                        on_item(dict(basic_info, **seller_info))
+                    if progress_callback:
+                        progress_callback(completed, total_items)
                 
-                # 1단계: 먼저 모든 상품의 기본 정보 수집
-                product_urls = []
-                basic_info_list = []
+                try:
+                    with self.timer.step("판매자 정보 수집"):
+                        await asyncio.gather(*(
+                            collect(idx, basic_info, product_url)
+                            for idx, (basic_info, product_url) in enumerate(zip(basic_info_list, product_urls))
+                        ))
+                finally:
+                    for extra_page in extra_pages:
+                        await extra_page.close()
                 
-                for idx, item in enumerate(product_items[:num_products]):
-                    if self.stop_flag:
-                        self.log("크롤링 중지됨")
-                        break
-                    
-                    try:
-                        # 랭킹
-                        rank = idx + 1
-                        
-                        # item이 링크인지 컨테이너인지 확인
-                        item_tag = await item.evaluate('el => el.tagName')
-                        is_link = (item_tag == 'A')
-                        
-                        # 브랜드명 - 여러 방법 시도
-                        brand = ""
-                        if is_link:
-                            # 링크인 경우: 부모에서 브랜드 찾기
-                            try:
-                                # 링크의 부모 컨테이너에서 브랜드 찾기
-                                brand_text = await item.evaluate('''el => {
-                                    let current = el.parentElement;
-                                    let depth = 0;
-                                    while (current && depth < 10) {
-                                        // 브랜드 링크 찾기
-                                        const brandLink = current.querySelector('a.gtm-click-brand');
-                                        if (brandLink) {
-                                            const brandP = brandLink.querySelector('p');
-                                            if (brandP) return brandP.textContent.trim();
-                                            return brandLink.textContent.trim();
-                                        }
-                                        // 브랜드 텍스트 찾기
-                                        const brandP = current.querySelector('p[class*="brand"]');
-                                        if (brandP) return brandP.textContent.trim();
-                                        const brandSpan = current.querySelector('span[class*="brand"]');
-                                        if (brandSpan) return brandSpan.textContent.trim();
-                                        current = current.parentElement;
-                                        depth++;
-                                    }
-                                    return "";
-                                }''')
-                                if brand_text:
-                                    brand = brand_text
-                            except:
-                                pass
-                        else:
-                            # 컨테이너인 경우: 기존 방법
-                            brand_selectors = [
-                                'a.gtm-click-brand p',
-                                'a.gtm-click-brand',
-                                'p[class*="brand"]',
-                                'span[class*="brand"]'
-                            ]
-                            for selector in brand_selectors:
-                                try:
-                                    brand_element = await item.query_selector(selector)
-                                    if brand_element:
-                                        brand = await brand_element.inner_text()
-                                        if brand.strip():
-                                            break
-                                except:
-                                    continue
-                        
-                        # 상품명 및 URL - 여러 방법 시도
-                        product_name = ""
-                        product_url = ""
-                        
-                        if is_link:
-                            # 링크인 경우: 직접 사용
-                            product_element = item
-                            # 상품명 추출
-                            name_selectors = ['p', 'span', 'div']
-                            for name_sel in name_selectors:
-                                try:
-                                    name_element = await product_element.query_selector(name_sel)
-                                    if name_element:
-                                        product_name = await name_element.inner_text()
-                                        if product_name.strip():
-                                            break
-                                except:
-                                    continue
-                            
-                            # URL 추출
-                            product_url = await product_element.get_attribute('href')
-                            if product_url and not product_url.startswith('http'):
-                                product_url = f"https://www.musinsa.com{product_url}"
-                        else:
-                            # 컨테이너인 경우: 기존 방법
-                            product_selectors = [
-                                'a.gtm-select-item',
-                                'a[href*="/products/"]',
-                                'a[class*="product"]'
-                            ]
-                            for selector in product_selectors:
-                                try:
-                                    product_element = await item.query_selector(selector)
-                                    if product_element:
-                                        # 상품명 추출
-                                        name_selectors = ['p', 'span', 'div']
-                                        for name_sel in name_selectors:
-                                            try:
-                                                name_element = await product_element.query_selector(name_sel)
-                                                if name_element:
-                                                    product_name = await name_element.inner_text()
-                                                    if product_name.strip():
-                                                        break
-                                            except:
-                                                continue
-                                        
-                                        # URL 추출
-                                        product_url = await product_element.get_attribute('href')
-                                        if product_url:
-                                            if not product_url.startswith('http'):
-                                                product_url = f"https://www.musinsa.com{product_url}"
-                                            break
-                                except:
-                                    continue
-                        
-                        # 가격 정보 - 여러 방법 시도
-                        discount_rate = ""
-                        price = ""
-                        
-                        if is_link:
-                            # 링크인 경우: 부모에서 가격 찾기
-                            try:
-                                # JavaScript로 부모에서 가격 정보 추출
-                                price_info = await item.evaluate('''el => {
-                                    let current = el.parentElement;
-                                    let depth = 0;
-                                    while (current && depth < 10) {
-                                        // 가격 컨테이너 찾기
-                                        const priceDiv = current.querySelector('div.UIProductColumn__Price-sc-1t5ihy5-10') ||
-                                                         current.querySelector('div[class*="Price"]') ||
-                                                         current.querySelector('span[class*="price"]') ||
-                                                         current.querySelector('p[class*="price"]');
-                                        if (priceDiv) {
-                                            // 할인율
-                                            const discountSpan = priceDiv.querySelector('span.text-red') ||
-                                                                 priceDiv.querySelector('span[class*="red"]') ||
-                                                                 priceDiv.querySelector('span[class*="discount"]');
-                                            const discount = discountSpan ? discountSpan.textContent.trim() : "";
-                                            
-                                            // 가격
-                                            const priceSpan = priceDiv.querySelector('span.text-black') ||
-                                                              priceDiv.querySelector('span[class*="black"]') ||
-                                                              priceDiv.querySelector('span') ||
-                                                              priceDiv.querySelector('p');
-                                            let price = priceSpan ? priceSpan.textContent.trim() : "";
-                                            
-                                            // 숫자가 포함된 경우만 가격으로 인식
-                                            if (price && !/[0-9]/.test(price)) {
-                                                // span이나 p의 모든 자식 요소 확인
-                                                const allSpans = priceDiv.querySelectorAll('span, p');
-                                                for (let sp of allSpans) {
-                                                    const text = sp.textContent.trim();
-                                                    if (/[0-9]/.test(text)) {
-                                                        price = text;
-                                                        break;
-                                                    }
-                                                }
-                                            }
-                                            
-                                            return { discount: discount, price: price };
-                                        }
-                                        current = current.parentElement;
-                                        depth++;
-                                    }
-                                    return { discount: "", price: "" };
-                                }''')
-                                if price_info:
-                                    discount_rate = price_info.get('discount', '')
-                                    price = price_info.get('price', '')
-                            except Exception as e:
-                                self.log(f"가격 정보 추출 오류: {str(e)}")
-                                pass
-                        else:
-                            # 컨테이너인 경우: 기존 방법
-                            price_selectors = [
-                                'div.UIProductColumn__Price-sc-1t5ihy5-10',
-                                'div[class*="Price"]',
-                                'span[class*="price"]',
-                                'p[class*="price"]'
-                            ]
-                            for selector in price_selectors:
-                                try:
-                                    price_element = await item.query_selector(selector)
-                                    if price_element:
-                                        # 할인율
-                                        discount_selectors = ['span.text-red', 'span[class*="red"]', 'span[class*="discount"]']
-                                        for disc_sel in discount_selectors:
-                                            try:
-                                                discount_element = await price_element.query_selector(disc_sel)
-                                                if discount_element:
-                                                    discount_rate = await discount_element.inner_text()
-                                                    if discount_rate.strip():
-                                                        break
-                                            except:
-                                                continue
-                                        
-                                        # 가격
-                                        price_selectors_inner = ['span.text-black', 'span[class*="black"]', 'span', 'p']
-                                        for price_sel in price_selectors_inner:
-                                            try:
-                                                price_element_text = await price_element.query_selector(price_sel)
-                                                if price_element_text:
-                                                    price_text = await price_element_text.inner_text()
-                                                    # 숫자만 포함된 경우만 가격으로 인식
-                                                    if any(c.isdigit() for c in price_text):
-                                                        price = price_text
-                                                        if price.strip():
-                                                            break
-                                            except:
-                                                continue
-                                        
-                                        if price.strip():
-                                            break
-                                except:
-                                    continue
-                        
-                        # 기본 정보 저장
-                        basic_info_list.append({
-                            "카테고리": category,
-                            "랭킹": rank,
-                            "브랜드": brand.strip(),
-                            "상품명": product_name.strip(),
-                            "할인율": discount_rate.strip(),
-                            "가격": price.strip(),
-                            "상품URL": product_url
-                        })
-                        product_urls.append(product_url)
-                        
-                        self.log(f"상품 {idx + 1} 정보 수집 완료: {brand.strip()} - {product_name.strip()}")
-                        
-                    except Exception as e:
-                        self.log(f"상품 {idx + 1} 기본 정보 수집 중 오류: {str(e)}")
-                        import traceback
-                        self.log(f"상세 오류: {traceback.format_exc()}")
-                        # 오류 발생 시 빈 정보 추가
-                        basic_info_list.append({
-                            "카테고리": category,
-                            "랭킹": idx + 1,
-                            "브랜드": "",
-                            "상품명": "",
-                            "할인율": "",
-                            "가격": "",
-                            "상품URL": ""
-                        })
-                        product_urls.append("")
-                        continue
+                if stopped():
+                    self.log("크롤링 중지됨 - 지금까지 수집한 결과만 반환")
                 
-                # 2단계: 각 상품의 판매자 정보 수집
-                self.log("판매자 정보 수집 시작...")
-                for idx, (basic_info, product_url) in enumerate(zip(basic_info_list, product_urls)):
-                    if self.stop_flag:
-                        self.log("크롤링 중지됨")
-                        break
-                    
-                    if not product_url:
-                        # URL이 없는 경우 빈 판매자 정보 추가
-                        basic_info.update({
-                            "상호": "",
-                            "사업자번호": "",
-                            "연락처": "",
-                            "영업소재지": ""
-                        })
-                        products.append(basic_info)
-                        if progress_callback:
-                            progress_callback(idx + 1, total_items)
-                        continue
-                    
-                    try:
-                        self.log(f"[{idx + 1}/{total_items}] {basic_info['브랜드']} - {basic_info['상품명']} 판매자 정보 수집 중...")
-                        seller_info = await self.get_seller_info(page, product_url)
-                        
-                        basic_info.update({
-                            "상호": seller_info["상호"],
-                            "사업자번호": seller_info["사업자번호"],
-                            "연락처": seller_info["연락처"],
-                            "영업소재지": seller_info["영업소재지"]
-                        })
-                        
-                        products.append(basic_info)
-                        
-                        if progress_callback:
-                            progress_callback(idx + 1, total_items)
-                        
-                    except Exception as e:
-                        self.log(f"상품 {idx + 1} 판매자 정보 수집 중 오류: {str(e)}")
-                        # 오류 발생 시 빈 판매자 정보 추가
-                        basic_info.update({
-                            "상호": "",
-                            "사업자번호": "",
-                            "연락처": "",
-                            "영업소재지": ""
-                        })
-                        products.append(basic_info)
-                        if progress_callback:
-                            progress_callback(idx + 1, total_items)
+                # 수집이 끝난 상품만 원래 순서대로 결과에 추가
+                for basic_info, seller_info in zip(basic_info_list, seller_results):
+                    if seller_info is None:
                         continue
+                    basic_info.update(seller_info)
+                    products.append(basic_info)
                 
             except Exception as e:
                 self.log(f"크롤링 중 오류 발생: {str(e)}")
             
             finally:
-                await browser.close()
+                await page.close()
+                self.log(self.timer.summary())
         
         return products
     
@@ -830,7 +652,6 @@ class MusinsaCrawler:
             self.log("저장할 데이터가 없습니다.")
             return None
         
-        df = pd.DataFrame(products)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"musinsa_{category}_{timestamp}.xlsx"
         
@@ -849,7 +670,7 @@ class MusinsaCrawler:
 
         filepath = os.path.join(output_dir, filename)
         
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        write_excel(filepath, products)
         self.log(f"파일 저장 완료: {filepath}")
         return filepath
 
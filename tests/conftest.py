@@ -0,0 +1,5 @@
+import os
+import sys
+
+# crawlers/ 모듈은 서로를 최상위 모듈로 import하므로 경로에 추가 (wrapper.py와 같은 방식)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "crawlers"))
@@ -0,0 +1,47 @@
+from crawl_diff import (
+    PREVIOUS_RANK_COLUMN, RANK_CHANGE_COLUMN, dropped_products, rank_changes, summary_line
+)
+
+
+def product(rank, number):
+    return {"순위": rank, "상품URL": f"https://www.musinsa.com/products/{number}"}
+
+
+def test_rank_changes():
+    previous = [product(1, 10), product(2, 20), product(3, 30), product(4, 40)]
+    # 20 상승, 10 하락, 30 유지, 50 신규, 40 이탈
+    current = [product(1, 20), product(2, 10), product(3, 30), product(4, 50)]
+    summary = rank_changes(current, previous)
+
+    assert [item[RANK_CHANGE_COLUMN] for item in current] == ["▲1", "▼1", "-", "신규"]
+    assert [item[PREVIOUS_RANK_COLUMN] for item in current] == [2, 1, 3, ""]
+    assert (summary["new"], summary["up"], summary["down"], summary["same"]) == (1, 1, 1, 1)
+    assert summary["dropped"] == [dict(product(4, 40), **{PREVIOUS_RANK_COLUMN: 4})]
+    assert summary_line(summary) == "이전 실행 대비: 신규 1개, 이탈 1개, 상승 1개, 하락 1개, 유지 1개"
+
+
+def test_urls_are_compared_normalized():
+    previous = [{"순위": 1, "상품URL": "https://www.musinsa.com/app/goods/10?utm=x"}]
+    current = [product(1, 10)]
+    summary = rank_changes(current, previous)
+    assert current[0][RANK_CHANGE_COLUMN] == "-"
+    assert summary["dropped"] == []
+
+
+def test_dropped_sorted_by_previous_rank_without_diff_columns():
+    previous = [dict(product(3, 30), **{RANK_CHANGE_COLUMN: "▲1"}), product(1, 10), product(2, 20)]
+    summary = rank_changes([], previous)
+    assert [item[PREVIOUS_RANK_COLUMN] for item in summary["dropped"]] == [1, 2, 3]
+    assert all(RANK_CHANGE_COLUMN not in item for item in summary["dropped"])
+
+
+def test_dropped_products_merges_batch_categories():
+    single = rank_changes([], [product(1, 10)])
+    batch = {"categories": {
+        "상의": {"diff": rank_changes([], [product(1, 20)])},
+        "아우터": {"diff": None},
+    }}
+    assert dropped_products({"diff": single}) == single["dropped"]
+    merged = dropped_products(batch)
+    assert len(merged) == 1 and merged[0]["카테고리"] == "상의"
+    assert dropped_products({"products": []}) == []
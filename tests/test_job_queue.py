@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from job_queue import JobQueue, QueueFullError
+
+
+class Runner:
+    """실행 순서를 기록하고, release할 때까지 작업을 붙잡아 두는 runner"""
+
+    def __init__(self):
+        self.started = []
+        self.gates = {}
+
+    async def __call__(self, crawler_type, params, request_id):
+        self.started.append(request_id)
+        gate = self.gates.setdefault(request_id, asyncio.Event())
+        await gate.wait()
+
+    def release(self, request_id):
+        self.gates.setdefault(request_id, asyncio.Event()).set()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_max_queued_raises_queue_full():
+    async def scenario():
+        runner = Runner()
+        queue = JobQueue(runner, max_concurrent=1, max_queued=2)
+        assert queue.submit("a", "musinsa", {}) == 0  # 바로 실행
+        assert queue.submit("b", "musinsa", {}) == 1
+        assert queue.submit("c", "musinsa", {}) == 2
+        with pytest.raises(QueueFullError):
+            queue.submit("d", "musinsa", {})
+        assert queue.stats()["rejected"] == 1
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_per_type_limit_lets_other_types_pass():
+    async def scenario():
+        runner = Runner()
+        queue = JobQueue(runner, max_concurrent=3, per_type_limits={"musinsa": 1})
+        queue.submit("m1", "musinsa", {})
+        queue.submit("m2", "musinsa", {})
+        queue.submit("w1", "wconcept", {})
+        await settle()
+        # musinsa는 하나만 실행, 뒤에 들어온 wconcept이 먼저 시작
+        assert runner.started == ["m1", "w1"]
+        assert queue.position("m2") == 1
+        runner.release("m1")
+        await settle()
+        assert runner.started == ["m1", "w1", "m2"]
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_priority_then_fifo_order():
+    async def scenario():
+        runner = Runner()
+        queue = JobQueue(runner, max_concurrent=1)
+        queue.submit("first", "musinsa", {})
+        queue.submit("low", "musinsa", {}, priority=0)
+        queue.submit("high", "musinsa", {}, priority=5)
+        queue.submit("low2", "musinsa", {}, priority=0)
+        assert [queue.position(rid) for rid in ("high", "low", "low2")] == [1, 2, 3]
+        for request_id in ("first", "high", "low", "low2"):
+            await settle()
+            runner.release(request_id)
+        await settle()
+        assert runner.started == ["first", "high", "low", "low2"]
+        assert queue.stats()["completed"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_cancel_removes_pending_job():
+    async def scenario():
+        runner = Runner()
+        queue = JobQueue(runner, max_concurrent=1)
+        queue.submit("a", "musinsa", {})
+        queue.submit("b", "musinsa", {})
+        assert queue.cancel("b")
+        assert not queue.cancel("a")  # 이미 실행 중
+        assert queue.position("b") == 0
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_coordinator_starts_without_a_slot():
+    async def scenario():
+        runner = Runner()
+        queue = JobQueue(runner, max_concurrent=1, coordinator_types=("unified",))
+        queue.submit("a", "musinsa", {})
+        assert queue.submit("u", "unified", {}) == 0
+        await settle()
+        assert runner.started == ["a", "u"]
+        assert queue.stats()["running"] == 1 and queue.stats()["coordinating"] == 1
+        await queue.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import pytest
+
+from result_store import ResultStore, normalize_business_number
+
+PRODUCTS = [
+    {"순위": 2, "상품명": "바지", "상품URL": "https://www.musinsa.com/products/2", "사업자번호": "123-45-67890"},
+    {"순위": 1, "상품명": "셔츠", "상품URL": "https://www.musinsa.com/products/1", "사업자번호": "098-76-54321"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+
+def save(store, request_id, category="전체", products=PRODUCTS, status="succeeded", partial=False,
+         crawled_at=None, source="musinsa"):
+    store.save_run(request_id, source, category, products, params={"count": len(products)}, partial=partial)
+    store.mark_status(request_id, status)
+    if crawled_at is not None:
+        store._conn.execute("UPDATE runs SET crawled_at = ? WHERE request_id = ?", (crawled_at, request_id))
+
+
+def test_round_trip(store):
+    save(store, "run-1")
+    loaded = store.load_run("run-1")
+    assert loaded["crawler_type"] == "musinsa"
+    assert loaded["status"] == "succeeded"
+    assert loaded["params"] == {"count": 2}
+    data = loaded["data"]
+    assert data["category"] == "전체" and data["count"] == 2 and "partial" not in data
+    # 순위 순서로 복원
+    assert [item["상품명"] for item in data["products"]] == ["셔츠", "바지"]
+    assert store.load_run("missing") is None
+
+
+def test_save_run_overwrites_same_request(store):
+    save(store, "run-1")
+    save(store, "run-1", products=PRODUCTS[:1], partial=True)
+    data = store.load_run("run-1")["data"]
+    assert data["count"] == 1 and data["partial"] is True
+    assert store.stats()["products"] == 1
+
+
+def test_find_products_by_url_and_business_number(store):
+    save(store, "run-1")
+    rows = store.find_products(business_number="1234567890")
+    assert len(rows) == 1 and rows[0]["data"]["상품명"] == "바지"
+    assert store.find_products(product_url="https://www.musinsa.com/products/1")[0]["rank"] == 1
+    assert normalize_business_number("123-45-67890") == "1234567890"
+
+
+def test_find_previous_run_filters(store):
+    save(store, "old", crawled_at=100)
+    save(store, "newer", crawled_at=200)
+    save(store, "partial", partial=True, crawled_at=300)
+    save(store, "failed", status="failed", crawled_at=400)
+    save(store, "other-category", category="상의", crawled_at=500)
+    save(store, "other-source", source="wconcept", crawled_at=600)
+    # 부분 결과 / 실패 / 다른 카테고리 / 다른 사이트는 제외하고 가장 최근 실행
+    assert store.find_previous_run("musinsa", "전체") == "newer"
+    assert store.find_previous_run("musinsa", "전체", exclude="newer") == "old"
+    assert store.find_previous_run("musinsa", "아우터") is None
+
+
+def test_find_previous_run_matches_batch_rows(store):
+    batch_products = [dict(PRODUCTS[0], 카테고리="상의"), dict(PRODUCTS[1], 카테고리="아우터")]
+    save(store, "batch", category="배치: 상의, 아우터", products=batch_products)
+    # 배치 실행은 상품 행의 카테고리로도 찾음
+    assert store.find_previous_run("musinsa", "아우터") == "batch"
+
+
+def test_purge_removes_expired_runs(store):
+    save(store, "old", crawled_at=0)
+    save(store, "new")
+    assert store.purge(retention_days=1) == 1
+    assert store.load_run("old") is None and store.load_run("new") is not None
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from scheduler import CronError, CronExpression, CrawlScheduler, ScheduleStore
+
+
+def next_after(expression, *start):
+    return CronExpression(expression).next_after(datetime(*start))
+
+
+def test_basic_fields():
+    assert next_after("30 9 * * *", 2024, 1, 1, 9, 30) == datetime(2024, 1, 2, 9, 30)
+    assert next_after("*/15 * * * *", 2024, 1, 1, 0, 7) == datetime(2024, 1, 1, 0, 15)
+    assert next_after("0 9-17/4 * * *", 2024, 1, 1, 10, 0) == datetime(2024, 1, 1, 13, 0)
+    assert next_after("@monthly", 2024, 1, 15) == datetime(2024, 2, 1, 0, 0)
+
+
+def test_sunday_as_zero_or_seven():
+    # 2024-01-07은 일요일
+    assert next_after("0 0 * * 0", 2024, 1, 1) == datetime(2024, 1, 7)
+    assert next_after("0 0 * * 7", 2024, 1, 1) == datetime(2024, 1, 7)
+
+
+def test_day_or_weekday_when_both_given():
+    # 일/요일이 둘 다 지정되면 둘 중 하나만 맞아도 실행: 15일 또는 월요일(2024-01-08)
+    assert next_after("0 0 15 * 1", 2024, 1, 2) == datetime(2024, 1, 8)
+
+
+def test_february_29_waits_for_leap_year():
+    assert next_after("0 0 29 2 *", 2024, 3, 1) == datetime(2028, 2, 29)
+    assert next_after("0 0 29 2 *", 2024, 1, 1) == datetime(2024, 2, 29)
+
+
+def test_february_30_never_fires():
+    assert next_after("0 0 30 2 *", 2024, 1, 1) is None
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "0 24 * * *", "0 0 0 * *", "0 0 * 13 *", "a * * * *",
+                                        "5-1 * * * *", "*/0 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(CronError):
+        CronExpression(expression)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedules.db"))
+    yield store
+    store.close()
+
+
+def test_upsert_rejects_expression_that_never_fires(store):
+    with pytest.raises(CronError):
+        store.upsert("feb30", "0 0 30 2 *", "musinsa")
+    assert store.get("feb30") is None
+
+
+def test_upsert_keeps_next_run_unless_cron_changes(store):
+    first = store.upsert("daily", "@daily", "musinsa", {"count": 10})
+    again = store.upsert("daily", "@daily", "musinsa", {"count": 20})
+    assert again["next_run_at"] == first["next_run_at"] and again["params"] == {"count": 20}
+    changed = store.upsert("daily", "0 * * * *", "musinsa")
+    assert changed["next_run_at"] <= first["next_run_at"]
+
+
+class Submitter:
+    def __init__(self):
+        self.submitted = []
+
+    def __call__(self, crawler_type, params):
+        self.submitted.append((crawler_type, params))
+        return f"req-{len(self.submitted)}"
+
+
+def test_fire_submits_then_skips_while_active(store):
+    async def scenario():
+        submit = Submitter()
+        active = set()
+        scheduler = CrawlScheduler(store, submit, lambda request_id: request_id in active, log=lambda msg: None)
+        store.upsert("daily", "@daily", "musinsa", {"count": 10})
+
+        request_id = await scheduler.fire(store.get("daily"))
+        assert request_id == "req-1"
+        assert submit.submitted == [("musinsa", {"count": 10, "schedule": "daily"})]
+        schedule = store.get("daily")
+        assert schedule["last_request_id"] == "req-1" and schedule["run_count"] == 1
+
+        # 직전 실행이 진행 중이면 이번 회차는 건너뜀
+        active.add("req-1")
+        assert await scheduler.fire(store.get("daily")) is None
+        schedule = store.get("daily")
+        assert len(submit.submitted) == 1
+        assert schedule["skip_count"] == 1 and schedule["last_status"].startswith("skipped")
+
+        # 끝나면 다시 제출
+        active.clear()
+        assert await scheduler.fire(store.get("daily")) == "req-2"
+
+    asyncio.run(scenario())
+
+
+def test_fire_records_submit_failure(store):
+    async def scenario():
+        def submit(crawler_type, params):
+            raise RuntimeError("queue full")
+
+        scheduler = CrawlScheduler(store, submit, lambda request_id: False, log=lambda msg: None)
+        store.upsert("daily", "@daily", "musinsa")
+        assert await scheduler.fire(store.get("daily")) is None
+        schedule = store.get("daily")
+        assert schedule["skip_count"] == 1 and "queue full" in schedule["last_status"]
+
+    asyncio.run(scenario())
+
+
+def test_due_returns_enabled_schedules_past_next_run(store):
+    store.upsert("on", "@daily", "musinsa")
+    store.upsert("off", "@daily", "musinsa", enabled=False)
+    far_future = store.get("on")["next_run_at"] + 1
+    assert [schedule["name"] for schedule in store.due(far_future)] == ["on"]
+    assert store.due(0) == []
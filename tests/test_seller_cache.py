@@ -0,0 +1,129 @@
+import asyncio
+
+from seller_cache import SellerCache, normalize_product_url
+
+SELLER = {"상호": "(주)테스트", "사업자번호": "123-45-67890", "연락처": "02-000-0000", "영업소재지": "서울"}
+
+
+class Fetcher:
+    """상세 페이지 방문 대신 호출 횟수를 세는 fetch (results 순서대로 반환)"""
+
+    def __init__(self, *results, delay=0.01):
+        self.results = list(results)
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        async def fetch():
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            return dict(self.results.pop(0) if self.results else SELLER)
+        return fetch
+
+
+def make_cache(tmp_path, **kwargs):
+    return SellerCache(str(tmp_path / "seller_cache.db"), **kwargs)
+
+
+def test_normalize_product_url():
+    assert normalize_product_url("https://www.musinsa.com/app/goods/123/?a=1#x") == "musinsa.com/products/123"
+    assert normalize_product_url("") == ""
+
+
+def test_same_brand_products_fetch_once(tmp_path):
+    async def scenario():
+        session = make_cache(tmp_path).session("musinsa")
+        fetcher = Fetcher()
+        results = await asyncio.gather(*(
+            session.resolve(f"https://musinsa.com/products/{index}", fetcher(), brand="브랜드 A")
+            for index in range(4)
+        ))
+        assert fetcher.calls == 1
+        assert all(result == SELLER for result in results)
+        assert session.brand_reused == 3
+
+    asyncio.run(scenario())
+
+
+def test_brand_dedup_off_fetches_every_product(tmp_path):
+    async def scenario():
+        session = make_cache(tmp_path).session("musinsa", brand_dedup=False)
+        fetcher = Fetcher()
+        await asyncio.gather(*(
+            session.resolve(f"https://musinsa.com/products/{index}", fetcher(), brand="브랜드 A")
+            for index in range(3)
+        ))
+        assert fetcher.calls == 3
+
+    asyncio.run(scenario())
+
+
+def test_failed_first_fetch_hands_off_to_waiting_product(tmp_path):
+    async def scenario():
+        session = make_cache(tmp_path).session("musinsa")
+        fetcher = Fetcher({}, SELLER)  # 첫 상품은 수집 실패
+        results = await asyncio.gather(*(
+            session.resolve(f"https://musinsa.com/products/{index}", fetcher(), brand="브랜드 A")
+            for index in range(3)
+        ))
+        # 실패한 결과는 공유하지 않고, 기다리던 상품 하나가 다시 수집해 나머지에 공유
+        assert fetcher.calls == 2
+        assert results[0] == {}
+        assert results[1] == SELLER and results[2] == SELLER
+
+    asyncio.run(scenario())
+
+
+def test_persistent_cache_hit_across_sessions(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        first = cache.session("musinsa")
+        await first.resolve("https://musinsa.com/products/1", Fetcher()(), brand_id="b1")
+        # 저장은 executor 스레드에서 진행되므로 기록될 때까지 대기
+        for _ in range(100):
+            if cache.get("musinsa", "brand:b1"):
+                break
+            await asyncio.sleep(0.02)
+
+        fetcher = Fetcher()
+        second = cache.session("musinsa")
+        assert await second.resolve("https://www.musinsa.com/products/1/", fetcher()) == SELLER
+        # 같은 브랜드 ID의 다른 상품도 캐시에서 찾음
+        assert await second.resolve("https://musinsa.com/products/2", fetcher(), brand_id="b1") == SELLER
+        assert fetcher.calls == 0
+        assert second.stats()["brand_hits"] == 1
+
+        # brand_dedup을 끄면 브랜드 ID 키는 읽지 않음
+        third = cache.session("musinsa", brand_dedup=False)
+        await third.resolve("https://musinsa.com/products/3", fetcher(), brand_id="b1")
+        assert fetcher.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_force_refresh_skips_lookup(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        cache.put("musinsa", ["url:musinsa.com/products/1"], SELLER)
+        fetcher = Fetcher()
+        session = cache.session("musinsa", force_refresh=True)
+        await session.resolve("https://musinsa.com/products/1", fetcher())
+        assert fetcher.calls == 1 and session.stats()["hits"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_seeded_previous_run_is_used_first(tmp_path):
+    async def scenario():
+        session = make_cache(tmp_path).session("29cm")
+        previous = [{"상세페이지URL": "https://www.29cm.co.kr/product/1", "상품명": "셔츠", "브랜드명": "A", "가격": "10,000원",
+                     "판매자 상호": "(주)A", "판매자 주소": "서울", "연락처": "", "사업자등록번호": "1234567890"}]
+        assert session.seed(previous, ("상세페이지URL",)) == 1
+        fetcher = Fetcher()
+        info = await session.resolve("https://29cm.co.kr/product/1", fetcher())
+        assert fetcher.calls == 0
+        # 29CM은 DOM 링크 목록용으로 상품 정보도 함께 재사용
+        assert info["판매자 상호"] == "(주)A" and info["상품명"] == "셔츠"
+        assert session.stats()["previous_hits"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,97 @@
+from task_registry import TaskRegistry
+
+
+def finish(registry, request_id, status="succeeded"):
+    registry.transition(request_id, "queued")
+    registry.transition(request_id, "running")
+    registry.transition(request_id, status)
+
+
+def test_transition_records_timing():
+    registry = TaskRegistry()
+    assert registry.transition("a", "queued")
+    assert registry.transition("a", "running")
+    assert registry.transition("a", "succeeded", error=None)
+    info = registry.info("a")
+    assert info["status"] == "succeeded"
+    assert "queue_wait_sec" in info and "duration_sec" in info
+    assert info["error"] is None
+
+
+def test_invalid_transitions_are_ignored():
+    registry = TaskRegistry()
+    assert not registry.transition("a", "running")  # queued를 거치지 않음
+    assert registry.transition("a", "queued")
+    assert not registry.transition("a", "succeeded")
+    assert registry.transition("a", "cancelled")
+    assert not registry.transition("a", "running")  # 끝난 작업은 다시 시작하지 않음
+    assert registry.info("a")["status"] == "cancelled"
+
+
+def test_stopping_then_final():
+    registry = TaskRegistry()
+    registry.transition("a", "queued")
+    registry.transition("a", "running")
+    assert registry.transition("a", "stopping")
+    assert registry.transition("a", "cancelled")
+    assert "stop_requested_at" in registry.info("a")
+
+
+def test_info_of_missing_entry_is_empty():
+    registry = TaskRegistry()
+    assert registry.info("missing") == {}
+    assert not registry.exists("missing")
+
+
+def test_lru_evicts_least_recently_used_finished_entry():
+    registry = TaskRegistry(max_entries=2)
+    finish(registry, "a")
+    finish(registry, "b")
+    registry.info("a")  # a를 최근 접근으로
+    finish(registry, "c")
+    assert registry.exists("a") and registry.exists("c")
+    assert not registry.exists("b")
+    assert registry.stats()["evicted"]["lru"] == 1
+
+
+def test_lru_keeps_active_entries():
+    registry = TaskRegistry(max_entries=2)
+    registry.transition("a", "queued")
+    registry.transition("b", "queued")
+    registry.transition("c", "queued")
+    # 진행 중인 작업은 상한을 넘어도 정리하지 않음
+    assert all(registry.exists(rid) for rid in ("a", "b", "c"))
+
+
+def test_sweep_removes_expired_finished_entries():
+    registry = TaskRegistry(ttl=60)
+    finish(registry, "old")
+    finish(registry, "new")
+    registry.transition("running", "queued")
+    for rid in ("old", "running"):
+        registry._entries[rid].last_access -= 120
+    assert registry.sweep() == 1
+    assert not registry.exists("old")
+    assert registry.exists("new") and registry.exists("running")
+    assert registry.stats()["evicted"]["ttl"] == 1
+
+
+def test_result_bytes_limit_evicts_oldest_result():
+    registry = TaskRegistry(max_result_bytes=100)
+    finish(registry, "a")
+    registry.store_result("a", {"data": "x" * 60})
+    finish(registry, "b")
+    registry.store_result("b", {"data": "y" * 60})
+    assert not registry.exists("a")
+    assert registry.get_result("b") == {"data": "y" * 60}
+    assert registry.stats()["evicted"]["bytes"] == 1
+
+
+def test_items_are_paged_by_cursor():
+    registry = TaskRegistry()
+    for index in range(5):
+        assert registry.append_item("a", {"순위": index}) == index
+    items, total = registry.get_items("a", cursor=3)
+    assert total == 5 and [item["순위"] for item in items] == [3, 4]
+    items, _ = registry.get_items("a", cursor=1, limit=2)
+    assert [item["순위"] for item in items] == [1, 2]
@@ -0,0 +1,42 @@
+from unified_schema import UNIFIED_COLUMNS, dedupe_sellers, normalize_product, summary_line
+
+
+def test_normalize_product_maps_site_columns():
+    row = normalize_product("wconcept", {
+        "브랜드명": "A", "상품명": "셔츠", "판매자명": "(주)에이", "사업자등록번호": "1234567890",
+        "주소": "서울", "상세페이지URL": "https://www.wconcept.co.kr/Product/1", "연락처": "수집 실패",
+    })
+    assert tuple(row) == UNIFIED_COLUMNS
+    assert row["사이트"] == "W컨셉"
+    assert row["브랜드"] == "A" and row["상호"] == "(주)에이"
+    assert row["사업자등록번호"] == "123-45-67890"
+    assert row["상품URL"] == "https://www.wconcept.co.kr/Product/1"
+    assert row["연락처"] == ""  # 자리표시 값은 빈 값
+
+
+def test_dedupe_sellers_merges_across_sites():
+    rows = [
+        normalize_product("musinsa", {"브랜드": "A", "상호": "(주)에이", "사업자번호": "123-45-67890", "연락처": ""}),
+        normalize_product("musinsa", {"브랜드": "A", "상호": "(주)에이", "사업자번호": "1234567890"}),
+        normalize_product("29cm", {"브랜드명": "A2", "판매자 상호": "", "사업자등록번호": "123 45 67890",
+                                   "연락처": "02-000-0000"}),
+        normalize_product("wconcept", {"브랜드명": "B", "판매자명": "(주)비", "사업자등록번호": "2222222222"}),
+        normalize_product("wconcept", {"브랜드명": "C", "판매자명": "번호 없음"}),
+    ]
+    sellers = dedupe_sellers(rows)
+
+    # 사업자등록번호 없는 행은 제외, 여러 사이트 입점 판매자가 먼저
+    assert [seller["사업자등록번호"] for seller in sellers] == ["123-45-67890", "222-22-22222"]
+    merged = sellers[0]
+    assert merged["사이트"] == "무신사, 29CM" and merged["사이트수"] == 2
+    assert merged["상품수"] == 3
+    assert merged["브랜드"] == "A, A2"
+    # 먼저 나온 값을 쓰고 빈 필드는 다른 사이트 값으로 채움
+    assert merged["상호"] == "(주)에이" and merged["연락처"] == "02-000-0000"
+    assert summary_line(rows, sellers) == "통합 결과: 상품 5개, 판매자 2곳 (여러 사이트 입점 1곳)"
+
+
+def test_dedupe_sellers_orders_by_product_count():
+    rows = [normalize_product("musinsa", {"사업자번호": "1111111111"})] + \
+           [normalize_product("musinsa", {"사업자번호": "2222222222"})] * 2
+    assert [seller["상품수"] for seller in dedupe_sellers(rows)] == [2, 1]
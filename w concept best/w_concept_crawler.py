@@ -1,6 +1,6 @@
 """
 W Concept 크롤러 - 헤드리스 모듈
-웹 인터페이스 통합을 위한 GUI 없는 크롤러
+웹 인터페이스 통합을 위한 GUI 없는 크롤러 (Playwright async API)
 """
 
 import sys
@@ -9,11 +9,19 @@ try:
     sys.stdout.reconfigure(encoding='utf-8')
 except AttributeError:
     pass
-import time
-import pandas as pd
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from urllib.parse import urljoin
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+
+# 공용 페이지 유틸 (crawlers/page_utils.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "crawlers"))
+from excel_export import write_excel
+from page_utils import (
+    CancelToken, CrawlCancelled, JsonCapture, RequestBlocker, StepTimer, counts_agree, format_price, pick_field,
+    record_url, wait_for_dom_quiet, wait_for_stable_count
+)
 
 # 카테고리 URL 매핑
 CATEGORY_URLS = {
@@ -26,11 +34,125 @@ CATEGORY_URLS = {
     "뷰티": "https://display.wconcept.co.kr/rn/best?displayCategoryType=10107&displaySubCategoryType=ALL&gnbType=Y",
     "키즈": "https://display.wconcept.co.kr/rn/best?displayCategoryType=10109&displaySubCategoryType=ALL&gnbType=Y"
 }
+# 베스트 API 응답 캡처 설정 (베스트 목록 엔드포인트만, JSON 필드명 후보)
+LIST_API_PATTERN = r"gapi\.wconcept\.co\.kr/display/api/best/"
+ID_KEYS = ("itemCd", "itemCode", "productNo")
+NAME_KEYS = ("itemName", "itemNm", "productName")
+BRAND_ID_KEYS = ("brandCd", "brandCode", "brandId")
+
+# 목록 페이지 상품 버튼 전체에서 기본 정보 + 상세 URL을 한 번에 추출
+LIST_EXTRACT_JS = """
+    (elements, limit) => {
+        const clean = (text) => text ? text.trim() : null;
+        const toUrl = (id) => 'https://www.wconcept.co.kr/Product/' + id;
+        
+        return elements.slice(0, limit).map((element) => {
+            const data = {
+                brand: null,
+                title: null,
+                price: null,
+                review_count: null,
+                like_count: null,
+                detail_url: null
+            };
+            
+            // 브랜드 추출 시도
+            // 1. 명시적 클래스
+            const brandEl = element.querySelector('.text.title');
+            if (brandEl) data.brand = clean(brandEl.textContent);
+            
+            // 2. 'brand' 클래스 포함 요소
+            if (!data.brand) {
+                const b = element.querySelector('[class*="brand"], [class*="Brand"]');
+                if (b) data.brand = clean(b.textContent);
+            }
+            
+            // 상품명 추출 시도
+            // 1. 명시적 클래스
+            const titleEl = element.querySelector('.text.detail');
+            if (titleEl) data.title = clean(titleEl.textContent);
+            
+            // 2. 'product' 나 'info' 관련 클래스
+            if (!data.title) {
+                const t = element.querySelector('[class*="product"], [class*="name"], [class*="ellips"]');
+                if (t) data.title = clean(t.textContent);
+            }
+            
+            // 가격 추출 (할인가 -> 정가 순)
+            const finalPriceEl = element.querySelector('.text.final-price strong');
+            if (finalPriceEl) data.price = clean(finalPriceEl.textContent);
+            
+            if (!data.price) {
+                const priceEl = element.querySelector('[class*="price"] strong, strong[class*="price"]');
+                if (priceEl) data.price = clean(priceEl.textContent);
+            }
+            
+            if (!data.price) {
+                // 텍스트에서 숫자+원/comma 패턴 찾기
+                const text = element.textContent;
+                const priceMatch = text.match(/([0-9,]+)\\s*원?/);
+                if (priceMatch) data.price = priceMatch[1];
+            }
+            
+            // 리뷰 수
+            const reviewSpan = element.querySelector('span.review');
+            if (reviewSpan) {
+                const cntSpan = reviewSpan.querySelector('span.cnt, span[class*="cnt"]');
+                if (cntSpan) {
+                    const reviewText = clean(cntSpan.textContent);
+                    const match = reviewText?.match(/\\d+/);
+                    if (match) data.review_count = match[0];
+                }
+            }
+            
+            // 좋아요 수
+            const likeSpan = element.querySelector('span.like');
+            if (likeSpan) {
+                const cntSpan = likeSpan.querySelector('span.cnt, span[class*="cnt"]');
+                if (cntSpan) {
+                    data.like_count = clean(cntSpan.textContent);
+                }
+            }
+            
+            // 상세 페이지 URL - 상품 정보에서 ItemCD(상품 ID) 찾기
+            // 1. GA4 클릭 이벤트나 커스텀 속성에서 찾기
+            const card = element.closest('.product-item') || element;
+            const itemCdMatch = card.outerHTML.match(/item[Cc]d['"]?\\s*[:=]\\s*['"]?(\\d{9})/);
+            if (itemCdMatch && itemCdMatch[1]) {
+                data.detail_url = toUrl(itemCdMatch[1]);
+                return data;
+            }
+            
+            // 2. 이미지 주소에서 추출 (lazy 로딩 전이면 data-src 확인)
+            const img = element.querySelector('img') || card.querySelector('img');
+            const src = img ? (img.src || img.getAttribute('data-src') || '') : '';
+            const imgMatch = src.match(/\\/(\\d{9})(_|\\.jpg)/);
+            if (imgMatch && imgMatch[1]) {
+                data.detail_url = toUrl(imgMatch[1]);
+                return data;
+            }
+            
+            // 3. 버튼의 onclick 속성 등에서 9자리 숫자 찾기
+            const numMatch = element.outerHTML.match(/\\d{9}/);
+            if (numMatch) data.detail_url = toUrl(numMatch[0]);
+            
+            return data;
+        });
+    }
+"""
 
 
 class WConceptCrawler:
+    # 브라우저 컨텍스트 옵션 (브라우저 풀에서 컨텍스트를 빌릴 때도 사용)
+    CONTEXT_OPTIONS = {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+        "viewport": {"width": 1920, "height": 1080},
+        "permissions": []
+    }
+
     def __init__(self):
         self.log_callback = None
+        self.timer = StepTimer()
         
     def log(self, message):
         """로그 출력"""
@@ -39,8 +161,91 @@ class WConceptCrawler:
         else:
             print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
     
-    def crawl_products(self, category, count=10, headless=True):
-        """상품 크롤링 실행"""
+    @asynccontextmanager
+    async def _open_context(self, context=None, headless=True):
+        """외부(브라우저 풀)에서 받은 컨텍스트를 쓰거나, 없으면 직접 브라우저 실행"""
+        if context is not None:
+            yield context
+            return
+        
+        async with async_playwright() as p:
+            self.log("Launching browser...")
+            browser = await p.chromium.launch(
+                headless=headless, 
+                timeout=60000,
+                args=["--no-sandbox", "--disable-dev-shm-usage"]
+            )
+            self.log("✅ Browser launched successfully")
+            blocker = RequestBlocker()
+            try:
+                own_context = await browser.new_context(**self.CONTEXT_OPTIONS)
+                await blocker.attach(own_context)
+                yield own_context
+            finally:
+                self.log(blocker.summary())
+                try:
+                    await browser.close()
+                except:
+                    pass
+    
+    @staticmethod
+    async def prepare_context(context):
+        """컨텍스트 공통 설정 - 기본 타임아웃, 알림 권한 자동 거부 (상세 페이지용 탭에도 적용)
+        
+        init script는 컨텍스트에 계속 쌓이므로 컨텍스트마다 한 번만 호출
+        """
+        context.set_default_timeout(60000)
+        await context.add_init_script("""
+            if (navigator.permissions) {
+                navigator.permissions.query({name: 'notifications'}).then(function(result) {});
+            }
+            const originalRequestPermission = Notification.requestPermission;
+            Notification.requestPermission = function() {
+                return Promise.resolve('denied');
+            };
+        """)
+    
+    def _listed_from_json(self, capture, count, dom_count, dom_urls):
+        """캡처한 베스트 API 응답을 LIST_EXTRACT_JS와 같은 형태의 목록으로 변환
+        
+        DOM 상품 개수와 맞지 않거나 상세 URL을 확인하지 못하면 빈 리스트 반환 (DOM으로 폴백)
+        """
+        records = capture.records(ID_KEYS, NAME_KEYS)
+        if not records:
+            return []
+        if not counts_agree(len(records), dom_count, count):
+            self.log(f"Best-list API returned {len(records)} products but the page shows {dom_count}, ignoring it")
+            return []
+        listed = []
+        for record in records[:count]:
+            detail_url = record_url(record, pick_field(record, ID_KEYS), dom_urls, "https://www.wconcept.co.kr")
+            if not detail_url:
+                self.log("Could not confirm product URLs from best-list API response, ignoring it")
+                return []
+            listed.append({
+                "brand": str(pick_field(record, ("brandNameKr", "brandName", "brandNm", "brandNameEn"))).strip(),
+                "title": str(pick_field(record, NAME_KEYS)).strip(),
+                "price": format_price(pick_field(record, ("finalPrice", "salePrice", "customerPrice", "price"))),
+                "review_count": str(pick_field(record, ("reviewCnt", "reviewCount"), "0")),
+                "like_count": str(pick_field(record, ("heartCnt", "likeCnt", "likeCount"), "0")),
+                "detail_url": detail_url,
+                "brand_id": str(pick_field(record, BRAND_ID_KEYS))
+            })
+        return listed
+    
+    async def crawl_products(self, category, count=10, headless=True, context=None, concurrency=1, rate_limiter=None,
+                             capture_json=True, cancel_token=None, on_item=None, seller_cache=None, shared_context=False):
+        """상품 크롤링 실행
+        
+        concurrency: 상세 페이지를 동시에 수집할 페이지 수
+        rate_limiter: HostRateLimiter (호스트별 요청 간격 제한, 없으면 제한 없음)
+        capture_json: 베스트 API 응답(JSON)에서 목록을 파싱 (응답이 없으면 DOM 스크래핑으로 폴백)
+        cancel_token: CancelToken (취소되면 진행 중인 이동을 끊고 그때까지 수집한 결과를 반환)
+        on_item: 상품 하나의 판매자 정보까지 수집될 때마다 호출되는 콜백 (수집 완료 순서)
+        seller_cache: 판매자 정보 창구 (resolve - 캐시나 같은 브랜드 상품에서 찾으면 상세 페이지를 열지 않음)
+        shared_context: 여러 실행이 함께 쓰는 컨텍스트 (만든 쪽에서 prepare_context를 이미 호출함)
+        """
+        token = cancel_token or CancelToken()
         url = CATEGORY_URLS.get(category)
         if not url:
             self.log(f"Error: Unknown category '{category}'")
@@ -50,285 +255,201 @@ class WConceptCrawler:
         self.log(f"Headless mode: {headless}")
         
         results = []
-        browser = None
+        self.timer = StepTimer(self.log)
         
         try:
-            with sync_playwright() as p:
-                self.log("Launching browser...")
-                browser = p.chromium.launch(
-                    headless=headless, 
-                    timeout=60000,
-                    args=["--no-sandbox", "--disable-dev-shm-usage"]
-                )
-                self.log("✅ Browser launched successfully")
-                
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-                    viewport={"width": 1920, "height": 1080},
-                    permissions=[]
-                )
-                context.set_default_timeout(60000)
+            async with self._open_context(context, headless) as context:
+                if not shared_context:
+                    await self.prepare_context(context)
                 
-                page = context.new_page()
+                page = await context.new_page()
                 page.set_default_timeout(60000)
+                capture = JsonCapture(page, LIST_API_PATTERN) if capture_json else None
                 
-                # 알림 권한 자동 거부
-                page.add_init_script("""
-                    if (navigator.permissions) {
-                        navigator.permissions.query({name: 'notifications'}).then(function(result) {});
-                    }
-                    const originalRequestPermission = Notification.requestPermission;
-                    Notification.requestPermission = function() {
-                        return Promise.resolve('denied');
-                    };
-                """)
-                
-                self.log("Navigating to best products page...")
-                page.goto(url, timeout=120000, wait_until="domcontentloaded")
-                
-                try:
-                    page.wait_for_load_state("networkidle", timeout=30000)
-                except:
-                    self.log("networkidle wait failed, continuing...")
-                
-                time.sleep(2)
-                
-                # 팝업 닫기
-                self._close_popups(page)
-                
-                # 상품 버튼 찾기
-                self.log("Finding product elements...")
                 button_selectors = [
                     "button.sc-d9bca83f-7.area-click[type='button']",
                     "button.area-click[type='button']",
                     "button.sc-d9bca83f-7[type='button']"
                 ]
                 
+                self.log("Navigating to best products page...")
+                with self.timer.step("list page load"):
+                    try:
+                        await token.run(page.goto(url, timeout=120000, wait_until="domcontentloaded"))
+                        
+                        # networkidle(최대 30초) + 고정 2초 대신 상품 버튼 개수가 안정될 때까지 대기
+                        loaded = await token.run(wait_for_stable_count(
+                            page, ", ".join(button_selectors), min_count=1, stable_ms=700, timeout=30000
+                        ))
+                    except CrawlCancelled:
+                        self.log("Crawling stopped")
+                        return []
+                    self.timer.note_wait("product buttons", loaded, 2000)
+                    
+                    # 팝업 닫기
+                    await self._close_popups(page)
+                
+                # 상품 버튼 찾기 (JSON 목록 검증과 DOM 추출에 모두 사용)
+                self.log("Finding product elements...")
                 product_items = None
                 for selector in button_selectors:
                     try:
                         test_buttons = page.locator(selector)
-                        if test_buttons.count() > 0:
+                        if await test_buttons.count() > 0:
                             product_items = test_buttons
-                            self.log(f"Found {product_items.count()} products with selector: {selector}")
+                            self.log(f"Found {await product_items.count()} products with selector: {selector}")
                             break
                     except:
                         continue
                 
-                if not product_items or product_items.count() == 0:
+                if not product_items or await product_items.count() == 0:
                     self.log("Error: No products found")
                     return []
                 
-                # 유효한 상품만 필터링 (검증 로직 완화)
-                valid_indices = []
-                total_count = product_items.count()
-                self.log(f"Processing {total_count} items...")
+                total_count = await product_items.count()
+                actual_count = min(total_count, count)
                 
-                # 모든 발견된 항목을 유효한 것으로 간주하고 추출 시도
-                for idx in range(min(total_count, count + 20)):
-                    valid_indices.append(idx)
+                # 베스트 API 응답(JSON)이 화면 목록과 맞으면 스크롤 / DOM 추출 없이 바로 사용
+                listed = []
+                if capture:
+                    await capture.settle()
+                    dom_urls = [item.get("detail_url") for item in
+                                await product_items.evaluate_all(LIST_EXTRACT_JS, actual_count)]
+                    listed = self._listed_from_json(capture, count, total_count, dom_urls)
+                    if listed:
+                        self.log(f"Parsed {len(listed)} products from best-list API response (DOM scraping skipped)")
+                    else:
+                        self.log("Best-list API response not usable, falling back to DOM scraping")
                 
-                actual_count = min(len(valid_indices), count)
-                self.log(f"Attempting to collect {actual_count} products")
+                if not listed:
+                    self.log(f"Processing {total_count} items, attempting to collect {actual_count} products")
                 
-                # 상품 정보 수집
-                for i in range(actual_count):
-                    try:
-                        valid_idx = valid_indices[i]
-                        item = product_items.nth(valid_idx)
-                        
-                        item.scroll_into_view_if_needed(timeout=5000)
-                        time.sleep(0.3)
-                        
-                        # JavaScript로 상품 정보 추출 (로직 개선)
-                        product_data = item.evaluate("""
-                            (element) => {
-                                const data = {
-                                    brand: null,
-                                    title: null,
-                                    price: null,
-                                    review_count: null,
-                                    like_count: null
-                                };
-                                
-                                // Helper to clean text
-                                const clean = (text) => text ? text.trim() : null;
-                                
-                                // 브랜드 추출 시도
-                                // 1. 명시적 클래스
-                                const brandEl = element.querySelector('.text.title');
-                                if (brandEl) data.brand = clean(brandEl.textContent);
-                                
-                                // 2. 'brand' 클래스 포함 요소
-                                if (!data.brand) {
-                                    const b = element.querySelector('[class*="brand"], [class*="Brand"]');
-                                    if (b) data.brand = clean(b.textContent);
-                                }
-                                
-                                // 상품명 추출 시도
-                                // 1. 명시적 클래스
-                                const titleEl = element.querySelector('.text.detail');
-                                if (titleEl) data.title = clean(titleEl.textContent);
-                                
-                                // 2. 'product' 나 'info' 관련 클래스
-                                if (!data.title) {
-                                    const t = element.querySelector('[class*="product"], [class*="name"], [class*="ellips"]');
-                                    if (t) data.title = clean(t.textContent);
-                                }
-                                
-                                // 가격 추출 (할인가 -> 정가 순)
-                                const finalPriceEl = element.querySelector('.text.final-price strong');
-                                if (finalPriceEl) data.price = clean(finalPriceEl.textContent);
-                                
-                                if (!data.price) {
-                                    const priceEl = element.querySelector('[class*="price"] strong, strong[class*="price"]');
-                                    if (priceEl) data.price = clean(priceEl.textContent);
-                                }
-                                
-                                if (!data.price) {
-                                    // 텍스트에서 숫자+원/comma 패턴 찾기
-                                    const text = element.textContent;
-                                    const priceMatch = text.match(/([0-9,]+)\s*원?/);
-                                    if (priceMatch) data.price = priceMatch[1];
-                                }
-                                
-                                // 리뷰 수
-                                const reviewSpan = element.querySelector('span.review');
-                                if (reviewSpan) {
-                                    const cntSpan = reviewSpan.querySelector('span.cnt, span[class*="cnt"]');
-                                    if (cntSpan) {
-                                        const reviewText = clean(cntSpan.textContent);
-                                        const match = reviewText?.match(/\\d+/);
-                                        if (match) data.review_count = match[0];
-                                    }
-                                }
-                                
-                                // 좋아요 수
-                                const likeSpan = element.querySelector('span.like');
-                                if (likeSpan) {
-                                    const cntSpan = likeSpan.querySelector('span.cnt, span[class*="cnt"]');
-                                    if (cntSpan) {
-                                        data.like_count = clean(cntSpan.textContent);
-                                    }
-                                }
-                                
-                                return data;
-                            }
-                        """)
-                        
-                        brand = product_data.get("brand") or ""
-                        title = product_data.get("title") or ""
-                        price = product_data.get("price") or "가격 정보 없음"
-                        review_count = product_data.get("review_count") or "0"
-                        like_count = product_data.get("like_count") or "0"
-                        
-                        # 필수 정보 없어도 우선 수집하고 로그 남김 (빈 값 허용)
-                        if not brand and not title:
-                            self.log(f"[{i+1}] Warning: Empty brand/title inferred. HTML might have changed.")
-                        
-                        self.log(f"[{i+1}/{actual_count}] {brand} - {title[:30]}...")
-                        
-                        # 상세 페이지 URL 추출 - 상품 정보에서 ItemCD(상품 ID) 찾기
-                        detail_url = ""
+                    # 1단계: 목록을 한 번 훑어 내려 lazy 이미지(src)를 채운 뒤,
+                    # 한 번의 evaluate로 모든 상품의 기본 정보와 상세 URL을 수집
+                    with self.timer.step("list extract"):
+                        for i in range(0, actual_count, 10):
+                            if token.cancelled:
+                                break
+                            try:
+                                await product_items.nth(i).scroll_into_view_if_needed(timeout=5000)
+                                await wait_for_dom_quiet(page, quiet_ms=100, timeout=300)
+                            except:
+                                continue
+                    
+                        listed = await product_items.evaluate_all(LIST_EXTRACT_JS, actual_count)
+                    self.log(f"Extracted {len(listed)} products from list in one pass")
+                
+                actual_count = len(listed)
+                if token.cancelled:
+                    self.log("Crawling stopped")
+                    return []
+                
+                # 2단계: 목록 페이지는 그대로 두고 별도 페이지들에서 상세 페이지를 병렬 순회
+                workers = max(1, min(int(concurrency or 1), len(listed) or 1))
+                self.log(f"Collecting seller info with {workers} page(s)")
+                page_pool = asyncio.Queue()
+                detail_pages = []
+                for _ in range(workers):
+                    detail_page = await context.new_page()
+                    detail_page.set_default_timeout(60000)
+                    detail_pages.append(detail_page)
+                    page_pool.put_nowait(detail_page)
+                
+                async def collect(i, product_data):
+                    if token.cancelled:
+                        return None
+                    brand = product_data.get("brand") or ""
+                    title = product_data.get("title") or ""
+                    price = product_data.get("price") or "가격 정보 없음"
+                    review_count = product_data.get("review_count") or "0"
+                    like_count = product_data.get("like_count") or "0"
+                    detail_url = product_data.get("detail_url") or ""
+                    
+                    # 필수 정보 없어도 우선 수집하고 로그 남김 (빈 값 허용)
+                    if not brand and not title:
+                        self.log(f"[{i+1}] Warning: Empty brand/title inferred. HTML might have changed.")
+                    
+                    self.log(f"[{i+1}/{actual_count}] {brand} - {title[:30]}...")
+                    
+                    # 판매자 정보 추출
+                    seller_info = {"판매자명": "", "사업자등록번호": "", "통신판매업신고": "", 
+                                 "대표자명": "", "주소": "", "연락처": "", "이메일": ""}
+                    
+                    async def visit():
+                        detail_page = await page_pool.get()
                         try:
-                            detail_url = item.evaluate("""
-                                (button) => {
-                                    // 1. GA4 클릭 이벤트나 커스텀 속성에서 찾기
-                                    const card = button.closest('.product-item') || button;
-                                    if (card) {
-                                        const html = card.outerHTML;
-                                        const itemCdMatch = html.match(/item[Cc]d['"]?\\s*[:=]\\s*['"]?(\\d{9})/);
-                                        if (itemCdMatch && itemCdMatch[1]) return 'https://www.wconcept.co.kr/Product/' + itemCdMatch[1];
-                                    }
-                                    
-                                    // 2. 이미지 주소에서 추출 (매우 신뢰도 높음)
-                                    let img = button.querySelector('img') || (card ? card.querySelector('img') : null);
-                                    if (img && img.src) {
-                                        const matches = img.src.match(/\\/(\\d{9})(_|\\.jpg)/);
-                                        if (matches && matches[1]) {
-                                            return 'https://www.wconcept.co.kr/Product/' + matches[1];
-                                        }
-                                    }
-                                    
-                                    // 3. 버튼의 onclick 속성 등에서 9자리 숫자 찾기
-                                    const allAttr = button.outerHTML;
-                                    const numMatch = allAttr.match(/\\d{9}/);
-                                    if (numMatch) return 'https://www.wconcept.co.kr/Product/' + numMatch[0];
-                                    
-                                    return null;
-                                }
-                            """)
-                            
-                            if detail_url:
-                                self.log(f"  → Detail URL: {detail_url}")
+                            if rate_limiter:
+                                await token.run(rate_limiter.wait(detail_url))
+                            self.log(f"  → [{i+1}] Detail URL: {detail_url}")
+                            # 취소되면 진행 중인 상세 페이지 이동을 바로 끊음
+                            info = await token.run(self._extract_seller_info(detail_page, detail_url))
+                            self.log(f"  → [{i+1}] Seller: {info.get('판매자명', 'N/A')}")
+                            return info
+                        finally:
+                            page_pool.put_nowait(detail_page)
+                    
+                    if detail_url:
+                        try:
+                            # 판매자 캐시 → 같은 브랜드의 앞 상품 → 상세 페이지 순으로 판매자 정보 확보
+                            if seller_cache:
+                                seller_info.update(await seller_cache.resolve(
+                                    detail_url, visit, brand=brand, brand_id=product_data.get("brand_id") or None
+                                ))
                             else:
-                                self.log(f"  → No itemCd found for this product")
-                        except Exception as e:
-                            self.log(f"  → URL extraction error: {e}")
-                        
-                        # 판매자 정보 추출
-                        seller_info = {"판매자명": "", "사업자등록번호": "", "통신판매업신고": "", 
-                                     "대표자명": "", "주소": "", "연락처": "", "이메일": ""}
-                        
-                        if detail_url and detail_url != "URL 수집 실패":
-                            self.log(f"  → Extracting seller info...")
-                            seller_info = self._extract_seller_info(page, detail_url)
-                            self.log(f"  → Seller: {seller_info.get('판매자명', 'N/A')}")
-                            
-                            # 목록 페이지로 돌아가기
-                            try:
-                                page.goto(url, timeout=30000, wait_until="domcontentloaded")
-                                time.sleep(1)
-                                self._close_popups(page)
-                                
-                                # 상품 목록 다시 찾기
-                                for selector in button_selectors:
-                                    try:
-                                        test_buttons = page.locator(selector)
-                                        if test_buttons.count() > 0:
-                                            product_items = test_buttons
-                                            break
-                                    except:
-                                        continue
-                            except Exception as e:
-                                self.log(f"  → Error returning to list: {e}")
-                        else:
-                            self.log(f"  → Skipping seller info (no URL)")
-                        
-                        results.append({
-                            "순위": i + 1,
-                            "브랜드": brand,
-                            "상품명": title,
-                            "가격": price,
-                            "리뷰수": review_count,
-                            "좋아요수": like_count,
-                            "상세페이지URL": detail_url or "URL 수집 실패",
-                            "판매자명": seller_info.get("판매자명", ""),
-                            "사업자등록번호": seller_info.get("사업자등록번호", ""),
-                            "통신판매업신고": seller_info.get("통신판매업신고", ""),
-                            "대표자명": seller_info.get("대표자명", ""),
-                            "주소": seller_info.get("주소", ""),
-                            "연락처": seller_info.get("연락처", ""),
-                            "이메일": seller_info.get("이메일", "")
-                        })
-                        
-                    except Exception as e:
-                        self.log(f"[{i+1}] Error collecting product: {e}")
+                                seller_info.update(await visit())
+                        except CrawlCancelled:
+                            return None
+                    else:
+                        self.log(f"  → [{i+1}] No itemCd found for this product, skipping seller info")
+                    
+                    item = {
+                        "순위": i + 1,
+                        "브랜드": brand,
+                        "상품명": title,
+                        "가격": price,
+                        "리뷰수": review_count,
+                        "좋아요수": like_count,
+                        "상세페이지URL": detail_url or "URL 수집 실패",
+                        "판매자명": seller_info.get("판매자명", ""),
+                        "사업자등록번호": seller_info.get("사업자등록번호", ""),
+                        "통신판매업신고": seller_info.get("통신판매업신고", ""),
+                        "대표자명": seller_info.get("대표자명", ""),
+                        "주소": seller_info.get("주소", ""),
+                        "연락처": seller_info.get("연락처", ""),
+                        "이메일": seller_info.get("이메일", "")
+                    }
+                    if on_item:
+                        on_item(item)
+                    return item
+                
+                try:
+                    with self.timer.step("seller info"):
+                        collected = await asyncio.gather(
+                            *(collect(i, product_data) for i, product_data in enumerate(listed)),
+                            return_exceptions=True
+                        )
+                finally:
+                    for detail_page in detail_pages:
+                        await detail_page.close()
+                
+                # gather는 입력 순서를 유지하므로 순위 순서 그대로 결과 구성 (취소로 건너뛴 항목은 None)
+                if token.cancelled:
+                    self.log("Crawling stopped - returning products collected so far")
+                for i, item in enumerate(collected):
+                    if item is None:
                         continue
-
+                    if isinstance(item, Exception):
+                        self.log(f"[{i+1}] Error collecting product: {item}")
+                        continue
+                    results.append(item)
                 
                 self.log(f"✅ Collected {len(results)} products")
+                self.log(self.timer.summary())
                 
         except Exception as e:
             self.log(f"Crawling error: {e}")
             import traceback
             self.log(f"Traceback: {traceback.format_exc()}")
-        finally:
-            if browser:
-                try:
-                    browser.close()
-                except:
-                    pass
         
         return results
     
@@ -355,15 +476,14 @@ class WConceptCrawler:
         filepath = os.path.join(output_dir, filename)
         
         try:
-            df = pd.DataFrame(products)
-            df.to_excel(filepath, index=False, engine='openpyxl')
+            write_excel(filepath, products)
             self.log(f"✅ Saved to: {filepath}")
             return filepath
         except Exception as e:
             self.log(f"Error saving Excel: {e}")
             return None
     
-    def _extract_seller_info(self, page, detail_url):
+    async def _extract_seller_info(self, page, detail_url):
         """상세 페이지에서 판매자 정보 추출"""
         seller_info = {
             "판매자명": "",
@@ -377,11 +497,11 @@ class WConceptCrawler:
         
         try:
             # 상세 페이지로 이동
-            page.goto(detail_url, timeout=60000, wait_until="domcontentloaded")
-            time.sleep(1.5)
+            await page.goto(detail_url, timeout=60000, wait_until="domcontentloaded")
+            self.timer.note_wait("detail load", await wait_for_dom_quiet(page, quiet_ms=300, timeout=1500), 1500, verbose=False)
             
             # 팝업 닫기
-            self._close_popups(page)
+            await self._close_popups(page)
             
             # 판매자 정보 아코디언 찾기 및 클릭
             accordion_clicked = False
@@ -395,15 +515,18 @@ class WConceptCrawler:
             for selector in accordion_selectors:
                 try:
                     accordion = page.locator(selector).first
-                    if accordion.count() > 0:
-                        accordion.scroll_into_view_if_needed(timeout=3000)
-                        time.sleep(0.3)
+                    if await accordion.count() > 0:
+                        await accordion.scroll_into_view_if_needed(timeout=3000)
                         
                         # 이미 열려있는지 확인 (class에 'on'이 있으면 열린 상태)
-                        is_open = accordion.evaluate("el => el.classList.contains('on')")
+                        is_open = await accordion.evaluate("el => el.classList.contains('on')")
                         if not is_open:
-                            accordion.click(timeout=3000)
-                            time.sleep(0.5)
+                            await accordion.click(timeout=3000)
+                            # 판매자 정보 테이블이 열릴 때까지만 대기
+                            try:
+                                await page.wait_for_selector('.noti_prod_info table, .seller_info_table', timeout=1000)
+                            except:
+                                pass
                         
                         accordion_clicked = True
                         break
@@ -415,7 +538,7 @@ class WConceptCrawler:
                 return seller_info
             
             # 판매자 정보 추출
-            seller_data = page.evaluate("""
+            seller_data = await page.evaluate("""
                 () => {
                     const data = {};
                     
@@ -474,20 +597,19 @@ class WConceptCrawler:
         
         return seller_info
     
-    def _close_popups(self, page):
+    async def _close_popups(self, page):
         """팝업 닫기"""
         try:
             # ESC 키로 팝업 닫기
             for _ in range(2):
                 try:
-                    page.keyboard.press("Escape")
-                    time.sleep(0.2)
+                    await page.keyboard.press("Escape")
                 except:
                     pass
             
             # JavaScript로 팝업 제거
             try:
-                page.evaluate("""
+                await page.evaluate("""
                     () => {
                         const popupSelectors = [
                             '[class*="popup"]',